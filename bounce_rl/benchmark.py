@@ -0,0 +1,350 @@
+"""
+Benchmark suite for BounceRL's input and step pipelines.
+
+Runs micro benchmarks of each stage of the input pipeline and a macro benchmark of
+a full AppEnvironment.step() against a fake app, session and desktop. Reports
+per-call latency percentiles, optionally as JSON, and can compare the results to a
+saved baseline to catch per-step overhead regressions.
+
+Usage:
+    python -m bounce_rl.benchmark --json results.json
+    python -m bounce_rl.benchmark --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+import numpy as np
+import yaml
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.fake_app import FakeApp, fake_app_bounce_config
+from bounce_rl.core.fake_app_session import FakeAppSession
+from bounce_rl.input.allowed_inputs import AllowKeys, DisallowKeys
+from bounce_rl.input.benchmark import (
+    FakeDesktop,
+    benchmark_action_a,
+    benchmark_action_b,
+)
+from bounce_rl.input.event_buffer import EventBuffer
+from bounce_rl.input.event_dispatch import Dispatcher
+from bounce_rl.input.flat_actions import FlatActionTable
+from bounce_rl.input.gym_input import (
+    compile_action_mask,
+    mask_action,
+    process_action_record_into,
+    process_gym_action,
+    process_gym_action_into,
+    to_action_record,
+)
+from bounce_rl.input.input_processor import InputProcessor
+from bounce_rl.input.keys import Letters, Modifiers
+from bounce_rl.template_matching import TemplateMatcher
+
+# A benchmark's setup function returns the function to time and a cleanup function.
+BenchmarkSetup = Callable[[], tuple[Callable[[], None], Callable[[], None]]]
+
+
+@dataclass
+class BenchmarkResult:
+    """Per-call latencies of one benchmark in microseconds."""
+
+    name: str
+    iterations: int
+    mean_us: float
+    p50_us: float
+    p90_us: float
+    p99_us: float
+    max_us: float
+
+
+def run_benchmark(
+    name: str, fn: Callable[[], None], iterations: int, warmup: int = 10
+) -> BenchmarkResult:
+    """Times `iterations` calls of fn, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    durations = np.empty(iterations, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        start = clock()
+        fn()
+        durations[i] = clock() - start
+
+    micros = durations / 1000
+    p50, p90, p99 = np.percentile(micros, (50, 90, 99))
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        mean_us=float(micros.mean()),
+        p50_us=float(p50),
+        p90_us=float(p90),
+        p99_us=float(p99),
+        max_us=float(micros.max()),
+    )
+
+
+def _alternating(fn_a: Callable[[], None], fn_b: Callable[[], None]):
+    """Returns a function that alternates between calling fn_a and fn_b."""
+    calls = [fn_a, fn_b]
+    state = [0]
+
+    def fn():
+        state[0] ^= 1
+        calls[state[0]]()
+
+    return fn
+
+
+def _no_cleanup() -> None:
+    pass
+
+
+def _setup_mask_action():
+    mask = compile_action_mask(DisallowKeys([Modifiers]).to_allow_list())
+    fn = _alternating(
+        lambda: mask_action(benchmark_action_a, mask),
+        lambda: mask_action(benchmark_action_b, mask),
+    )
+    return fn, _no_cleanup
+
+
+def _setup_process_gym_action():
+    fn = _alternating(
+        lambda: process_gym_action(benchmark_action_a, 800, 600),
+        lambda: process_gym_action(benchmark_action_b, 800, 600),
+    )
+    return fn, _no_cleanup
+
+
+def _setup_process_gym_action_into():
+    events = EventBuffer()
+    fn = _alternating(
+        lambda: process_gym_action_into(benchmark_action_a, 800, 600, events),
+        lambda: process_gym_action_into(benchmark_action_b, 800, 600, events),
+    )
+    return fn, _no_cleanup
+
+
+def _setup_process_action_record_into():
+    mask = compile_action_mask(DisallowKeys([Modifiers]).to_allow_list())
+    record_a = to_action_record(benchmark_action_a)
+    record_b = to_action_record(benchmark_action_b)
+    events = EventBuffer()
+    fn = _alternating(
+        lambda: process_action_record_into(record_a, 800, 600, events, mask),
+        lambda: process_action_record_into(record_b, 800, 600, events, mask),
+    )
+    return fn, _no_cleanup
+
+
+def _setup_flat_action_to_event_buffer():
+    table = FlatActionTable(800, 600)
+    space = table.action_space()
+    space.seed(0)
+    action_a, action_b = space.sample(), space.sample()
+    events = EventBuffer()
+    fn = _alternating(
+        lambda: table.to_event_buffer(action_a, events),
+        lambda: table.to_event_buffer(action_b, events),
+    )
+    return fn, _no_cleanup
+
+
+def _setup_input_processor():
+    processor = InputProcessor(800, 600)
+    actions = process_gym_action(benchmark_action_a, 800, 600)
+    return lambda: processor.process_input_actions(actions), _no_cleanup
+
+
+def _setup_input_processor_event_buffer():
+    processor = InputProcessor(800, 600)
+    actions = process_gym_action_into(benchmark_action_a, 800, 600, EventBuffer())
+    immediate, delayed = EventBuffer(), EventBuffer()
+    return (
+        lambda: processor.process_event_buffer(actions, immediate, delayed),
+        _no_cleanup,
+    )
+
+
+def _setup_dispatch():
+    immediate, delayed = InputProcessor(800, 600).process_input_actions(
+        process_gym_action(benchmark_action_a, 800, 600)
+    )
+    events = immediate + delayed
+    dispatcher = Dispatcher(FakeDesktop(), validate=False)
+    return lambda: dispatcher.dispatch(events), _no_cleanup
+
+
+def _setup_dispatch_event_buffer():
+    immediate, delayed = EventBuffer(), EventBuffer()
+    InputProcessor(800, 600).process_event_buffer(
+        process_gym_action_into(benchmark_action_a, 800, 600, EventBuffer()),
+        immediate,
+        delayed,
+    )
+    dispatcher = Dispatcher(FakeDesktop(), validate=False)
+    return lambda: dispatcher.dispatch_buffer(immediate), _no_cleanup
+
+
+def _setup_allow_keys_keycodes():
+    allowed = AllowKeys([Letters, Modifiers])
+    return allowed.keycodes, _no_cleanup
+
+
+def _setup_template_matcher():
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 256, (600, 1000, 3))
+    templates = screen + rng.integers(-1, 2, (4, 600, 1000, 3))
+    matcher = TemplateMatcher(templates)
+    image = screen.astype(np.uint8)
+    return lambda: matcher.matches(image), _no_cleanup
+
+
+def _setup_app_environment_step():
+    conf = fake_app_bounce_config()
+    # A zero length step measures only the environment's own per-step overhead.
+    conf["apps"][0]["step_length"] = "0"
+    config_file = tempfile.NamedTemporaryFile(mode="w", suffix=".yaml")
+    yaml.dump(conf, config_file)
+    config_file.flush()
+    env = AppEnvironment(
+        FakeApp, (640, 480), session_cls=FakeAppSession, config_path=config_file.name
+    )
+
+    def cleanup():
+        env.close()
+        config_file.close()
+
+    fn = _alternating(
+        lambda: env.step(benchmark_action_a), lambda: env.step(benchmark_action_b)
+    )
+    return fn, cleanup
+
+
+# Each benchmark's setup function and its default number of iterations.
+BENCHMARKS: dict[str, tuple[BenchmarkSetup, int]] = {
+    "mask_action": (_setup_mask_action, 20_000),
+    "process_gym_action": (_setup_process_gym_action, 20_000),
+    "process_gym_action_into": (_setup_process_gym_action_into, 20_000),
+    "process_action_record_into": (_setup_process_action_record_into, 20_000),
+    "flat_action_to_event_buffer": (_setup_flat_action_to_event_buffer, 20_000),
+    "input_processor": (_setup_input_processor, 20_000),
+    "input_processor_event_buffer": (_setup_input_processor_event_buffer, 20_000),
+    "dispatch": (_setup_dispatch, 20_000),
+    "dispatch_event_buffer": (_setup_dispatch_event_buffer, 20_000),
+    "allow_keys_keycodes": (_setup_allow_keys_keycodes, 20_000),
+    "template_matcher_matches": (_setup_template_matcher, 500),
+    "app_environment_step": (_setup_app_environment_step, 2_000),
+}
+
+
+def run_suite(
+    names: list[str] | None = None, iterations_scale: float = 1.0
+) -> list[BenchmarkResult]:
+    """Runs the named benchmarks, or all of them, and returns their results.
+
+    Args:
+        names: Names of the benchmarks in BENCHMARKS to run. Runs all of them if
+               not given.
+        iterations_scale: Factor to scale each benchmark's number of iterations by.
+    """
+    results = []
+    for name in names or list(BENCHMARKS):
+        setup, iterations = BENCHMARKS[name]
+        fn, cleanup = setup()
+        try:
+            results.append(
+                run_benchmark(name, fn, max(1, int(iterations * iterations_scale)))
+            )
+        finally:
+            cleanup()
+    return results
+
+
+def compare_to_baseline(
+    results: list[BenchmarkResult],
+    baseline: list[dict],
+    tolerance: float = 0.25,
+) -> list[str]:
+    """Compares results to baseline results loaded from a JSON report.
+
+    Returns a description of each benchmark whose median latency regressed by more
+    than `tolerance`, as a fraction of the baseline's median. Benchmarks missing
+    from the baseline are skipped."""
+    baseline_by_name = {b["name"]: b for b in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_name.get(result.name)
+        if base is None:
+            continue
+        limit = base["p50_us"] * (1 + tolerance)
+        if result.p50_us > limit:
+            regressions.append(
+                f"{result.name}: p50 {result.p50_us:.2f}us vs baseline "
+                f"{base['p50_us']:.2f}us (+{result.p50_us / base['p50_us'] - 1:.0%})"
+            )
+    return regressions
+
+
+def format_results(results: list[BenchmarkResult]) -> str:
+    """Formats results as a human readable table."""
+    header = f"{'benchmark':<32}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}"
+    lines = [header + "  (us)"]
+    for r in results:
+        lines.append(
+            f"{r.name:<32}{r.mean_us:>10.2f}{r.p50_us:>10.2f}"
+            f"{r.p90_us:>10.2f}{r.p99_us:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "benchmarks", nargs="*", help="Benchmarks to run. Defaults to all of them."
+    )
+    parser.add_argument("--json", help="Path to write the results to as JSON.")
+    parser.add_argument("--baseline", help="Path of a JSON report to compare to.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed fractional p50 regression over the baseline.",
+    )
+    parser.add_argument(
+        "--iterations-scale",
+        type=float,
+        default=1.0,
+        help="Factor to scale each benchmark's iterations by.",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {unknown}. Known: {list(BENCHMARKS)}")
+
+    results = run_suite(args.benchmarks, args.iterations_scale)
+    print(format_results(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
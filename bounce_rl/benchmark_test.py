@@ -0,0 +1,51 @@
+import json
+import tempfile
+import unittest
+from dataclasses import asdict
+
+from bounce_rl import benchmark
+from bounce_rl.benchmark import BenchmarkResult, compare_to_baseline, run_benchmark
+
+
+def _result(name: str, p50_us: float) -> BenchmarkResult:
+    return BenchmarkResult(name, 10, p50_us, p50_us, p50_us, p50_us, p50_us)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmark_times_each_call(self):
+        calls = []
+        result = run_benchmark("noop", lambda: calls.append(1), 50, warmup=5)
+
+        self.assertEqual(len(calls), 55)
+        self.assertEqual(result.iterations, 50)
+        self.assertLessEqual(result.p50_us, result.p90_us)
+        self.assertLessEqual(result.p90_us, result.p99_us)
+        self.assertLessEqual(result.p99_us, result.max_us)
+
+    def test_compare_to_baseline_reports_regressions_over_tolerance(self):
+        baseline = [asdict(_result("a", 10.0)), asdict(_result("b", 10.0))]
+        results = [_result("a", 12.0), _result("b", 13.0), _result("c", 100.0)]
+
+        regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b:"))
+
+    def test_main_writes_json_and_compares_to_baseline(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as f:
+            args = ["mask_action", "--iterations-scale", "0.001", "--json", f.name]
+            self.assertEqual(benchmark.main(args), 0)
+            with open(f.name) as results_file:
+                results = json.load(results_file)
+            self.assertEqual([r["name"] for r in results], ["mask_action"])
+
+            # Comparing against a much faster baseline flags a regression.
+            results[0]["p50_us"] /= 1000
+            with open(f.name, "w") as results_file:
+                json.dump(results, results_file)
+            args = ["mask_action", "--iterations-scale", "0.001", "--baseline", f.name]
+            self.assertEqual(benchmark.main(args), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
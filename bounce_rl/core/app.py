@@ -46,3 +46,20 @@ class App(ABC):
     def supported_resolutions(self) -> list[tuple[int, int]]:
         """Returns a list of resolutions supported by this app."""
         ...
+
+    def is_healthy(self, session: AppSession) -> bool:
+        """Returns whether the app running in the given session can be warm reset.
+
+        By default, an app is healthy as long as its process is still running."""
+        process = session.process()
+        return process is not None and process.poll() is None
+
+    def soft_reset(self, session: AppSession) -> bool:
+        """Returns the app running in the given session to its start state.
+
+        Called by AppEnvironment.reset() on healthy apps in place of tearing down and
+        relaunching the whole session, with the app running at normal speed. Returns
+        whether the warm reset succeeded. Apps that don't support warm resets return
+        False, which makes the environment fall back to a full relaunch, as does a
+        MacroError raised by the app's reset macro."""
+        return False
@@ -1,19 +1,38 @@
 # AppEnvironment's take BounceRL App instances and expose them as Gym environments.
 
+import hashlib
+import os
 import shlex
 import shutil
+import stat
+import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import gymnasium as gym
 import numpy as np
 import yaml
+from gymnasium.error import AlreadyPendingCallError, NoAsyncCallError
 
 from bounce_rl.core.app import App
 from bounce_rl.core.app_session import AppSession, default_sessions_folder
 from bounce_rl.core.gym_types import GymAction, GymInfo, GymObservation
+from bounce_rl.core.macro import MacroError
+from bounce_rl.core.observation import ObservationConfig, ObservationPipeline
+from bounce_rl.core.timing import PhaseTimers
+from bounce_rl.core.virtual_time import VirtualTimeStepper, sleep_until
 from bounce_rl.input import event_dispatch, gym_input
+from bounce_rl.input.event_buffer import EventBuffer
+from bounce_rl.input.event_schedule import ScheduledEvents
+from bounce_rl.input.flat_actions import FlatActionTable
+
+if TYPE_CHECKING:
+    from bounce_rl.core.session_pool import SessionPool
+
+_WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
 
 
 def load_app_config(
@@ -48,16 +67,40 @@ def load_app_config(
     raise KeyError(f"App '{app_name}' not found in config")
 
 
-def install_app_from_config(session: AppSession, config: dict[str, Any]) -> None:
+def default_base_installs_folder() -> str:
+    """Get the folder holding the shared base installs used by "link" mode installs.
+
+    Returns:
+        Path to the base installs folder
+    """
+    return str(Path(default_sessions_folder()) / "base_installs")
+
+
+def install_app_from_config(
+    session: AppSession,
+    config: dict[str, Any],
+    base_installs_folder: str | None = None,
+) -> None:
     """Copy files and folders specified in app's install config to session folder.
 
     Args:
         session: AppSession with data_folder() to copy files into
         config: App configuration with optional 'install' key
+        base_installs_folder: Where to keep the shared base installs of "link" mode
+                              items. Defaults to default_base_installs_folder().
 
     The install config should be a dict or list of dicts with 'from' and 'to' keys.
     'from' paths are absolute or relative to current directory.
     'to' paths are relative to session.data_folder()
+
+    Folder items may also set 'mode: link'. Instead of copying the whole folder into
+    every session, link mode copies it once into a read-only base install that's
+    shared by all sessions, and gives each session a tree of hard links into the
+    base install. The session's folders are its own, so apps can still create files
+    in them. Files the app modifies in place must be listed, relative to 'to', in the
+    item's 'writable' list, which gives the session private copies of them. Base
+    installs are keyed on their 'from' path and aren't refreshed when the source
+    changes, so delete the base install after updating an app.
     """
     # Handle both single dict and list of dicts
     install_spec = config.get("install", [])
@@ -66,10 +109,16 @@ def install_app_from_config(session: AppSession, config: dict[str, Any]) -> None
     else:
         install_items = install_spec
 
+    if base_installs_folder is None:
+        base_installs_folder = default_base_installs_folder()
+
     session_folder = Path(session.data_folder())
     for item in install_items:
         src = Path(item["from"])
         dst = session_folder / item["to"]
+        mode = item.get("mode", "copy")
+        if mode not in ("copy", "link"):
+            raise ValueError(f"Unknown install mode: {mode}")
 
         dst.parent.mkdir(parents=True, exist_ok=True)
         if src.is_file():
@@ -77,11 +126,125 @@ def install_app_from_config(session: AppSession, config: dict[str, Any]) -> None
         elif src.is_dir():
             if dst.exists():
                 shutil.rmtree(dst)
-            shutil.copytree(src, dst)
+            if mode == "link":
+                base = _base_install(src, Path(base_installs_folder))
+                _link_install(base, dst, item.get("writable", []))
+            else:
+                shutil.copytree(src, dst)
         else:
             raise FileNotFoundError(f"Install source not found: {src}")
 
 
+def _base_install(src: Path, base_installs_folder: Path) -> Path:
+    """Returns the read-only base install of the src folder, creating it if needed."""
+    src = src.resolve()
+    key = hashlib.sha256(str(src).encode()).hexdigest()[:16]
+    base = base_installs_folder / f"{src.name}-{key}"
+    if base.exists():
+        return base
+
+    # Build the base install next to its final location and move it into place, so
+    # that concurrently launching sessions never see a partial base install.
+    base_installs_folder.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{base.name}-", dir=base_installs_folder))
+    try:
+        shutil.copytree(src, staging, symlinks=True, dirs_exist_ok=True)
+        for dirpath, _, filenames in os.walk(staging):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if not os.path.islink(path):
+                    os.chmod(path, os.stat(path).st_mode & ~_WRITE_BITS)
+        os.rename(staging, base)
+    except OSError:
+        # Another session finished building the base install first.
+        if not base.exists():
+            raise
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging)
+    return base
+
+
+def _link_install(base: Path, dst: Path, writable: list[str]) -> None:
+    """Creates dst as a tree of hard links into the base install.
+
+    Paths under the `writable` paths get private, writable copies instead. Falls back
+    to copying files that can't be hard linked, e.g. across file systems."""
+    writable_paths = [base / path for path in writable]
+
+    def copy_writable(src: str, dst: str) -> None:
+        shutil.copy2(src, dst)
+        os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)
+
+    def link_or_copy(src: str, dst: str) -> None:
+        if any(Path(src).is_relative_to(path) for path in writable_paths):
+            copy_writable(src, dst)
+            return
+        try:
+            os.link(src, dst)
+        except OSError:
+            copy_writable(src, dst)
+
+    shutil.copytree(base, dst, symlinks=True, copy_function=link_or_copy)
+
+
+@dataclass
+class LaunchedApp:
+    """An installed and running app along with its session and config."""
+
+    config: dict[str, Any]
+    session: AppSession
+    app: App
+
+
+def launch_app(
+    app_cls: type[App],
+    resolution: tuple[int, int],
+    session_cls: type = AppSession,
+    config_path: str | None = None,
+    visible: bool = False,
+    timers: PhaseTimers | None = None,
+) -> LaunchedApp:
+    """Loads the app's config, creates an AppSession, then installs and starts the app.
+
+    Args:
+        app_cls: App subclass to run
+        resolution: Desktop resolution as (width, height) tuple
+        session_cls: An optional alternative AppSession implementation.
+        config_path: An optional alternative bounce config path.
+        visible: Whether to also render the session's desktop on the system's
+                 current desktop.
+        timers: Optional PhaseTimers to record the duration of each "launch.*"
+                phase to.
+
+    Returns:
+        The launched app, paused at its config's pause speed.
+    """
+    if timers is None:
+        timers = PhaseTimers()
+    with timers.phase("launch.load_config"):
+        config = load_app_config(app_cls.name(), config_path)
+    with timers.phase("launch.create_session"):
+        session = session_cls(
+            default_sessions_folder(),
+            shlex.split(config["entrypoint"]),
+            resolution,
+            visible=visible,
+        )
+
+    app = app_cls()
+    with timers.phase("launch.install"):
+        install_app_from_config(session, config)
+    with timers.phase("launch.post_install"):
+        app.post_install(session)
+    with timers.phase("launch.start_process"):
+        session.start_process()
+    with timers.phase("launch.begin"):
+        app.begin(session.desktop())
+    session.time_controller().set_speedup(float(config["pause_speed"]))
+    return LaunchedApp(config, session, app)
+
+
 class AppEnvironment:
     metadata = {"render_modes": ["human"]}
 
@@ -92,6 +255,10 @@ class AppEnvironment:
         session_cls: type = AppSession,
         config_path: str | None = None,
         render_mode: str | None = None,
+        session_pool: "SessionPool | None" = None,
+        observation: ObservationConfig = ObservationConfig(),
+        timings_in_info: bool = False,
+        flat_action_grid: tuple[int, int] | None = None,
     ):
         """Initialize AppEnvironment for the given App class and resolution.
 
@@ -105,6 +272,21 @@ class AppEnvironment:
             render_mode: Pass in "human" to also render this environment on the
                          system's current desktop. This will have a modest performance
                          overhead.
+            session_pool: An optional SessionPool of pre-launched sessions, created
+                          with the same app, resolution, session_cls, config_path
+                          and visibility as the environment. When given, the
+                          environment takes the sessions it launches from the pool.
+            observation: The preprocessing to apply to the desktop's frames. Note
+                         that step() and reset() return observations in a buffer
+                         that's reused across steps.
+            timings_in_info: Whether to add the durations of each of the step's
+                             phases to its info dict as info["timings"]. The
+                             environment's timers are always available from
+                             `self.timers`.
+            flat_action_grid: When given, the environment uses the flat
+                              MultiDiscrete action space from flat_actions with
+                              this (columns, rows) mouse grid, and step() takes
+                              integer arrays instead of Dict actions.
         """
         self.app_cls = app_cls
         self.resolution = resolution
@@ -123,73 +305,329 @@ class AppEnvironment:
             if render_mode == "human":
                 self.render_human = True
 
+        self._session_pool = session_pool
+        if session_pool is not None:
+            mismatched = [
+                name
+                for name, pool_value, env_value in (
+                    ("app_cls", session_pool.app_cls, app_cls),
+                    ("resolution", session_pool.resolution, resolution),
+                    ("session_cls", session_pool.session_cls, session_cls),
+                    ("config_path", session_pool.config_path, config_path),
+                    ("visible", session_pool.visible, self.render_human),
+                )
+                if pool_value != env_value
+            ]
+            if mismatched:
+                raise ValueError(
+                    "AppEnvironment's session pool must launch sessions the same way "
+                    f"as the environment. Mismatched: {', '.join(mismatched)}."
+                )
+
+        self._observation_pipeline = ObservationPipeline(resolution, observation)
+        self._flat_action_grid = flat_action_grid
+        self._flat_actions: FlatActionTable | None = None
+
+        # Records how long each phase of launching, resetting and stepping takes.
+        self.timers = PhaseTimers()
+        self._timings_in_info = timings_in_info
+        self._step_started_ns = 0
+
+        # Event buffers reused by every step's input pipeline.
+        self._action_events = EventBuffer()
+        self._scheduled_events = ScheduledEvents()
+        self._dispatch_events = EventBuffer()
+        self._no_op_action = gym_input.action_buffer()
+
+        # Runs step windows started by step_async() in the background.
+        self._step_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AppEnvironmentStep"
+        )
+        self._pending_step: Future | None = None
+
         self._init()
 
     def _init(self):
         """Initializes or re-initializes the AppEnvironment.
 
         Called from __init__ and reset(). Loads the config and creates an AppSession,
-        then installs and starts the app.
+        then installs and starts the app. If the environment has a session pool, it
+        instead takes an already launched app from the pool and retires the old one
+        in the background.
         """
-        if hasattr(self, "session") and self.session is not None:
-            del self.session
-        if hasattr(self, "app") and self.app is not None:
-            del self.app
+        old_app = None
+        if getattr(self, "session", None) is not None:
+            old_app = LaunchedApp(self.config, self.session, self.app)
+        self.session = None
+        self.app = None
+
+        self.timers.count("launches")
+        if self._session_pool is not None:
+            with self.timers.phase("launch.acquire"):
+                launched = self._session_pool.acquire()
+            if old_app is not None:
+                self._session_pool.retire(old_app)
+        else:
+            del old_app
+            with self.timers.phase("launch"):
+                launched = launch_app(
+                    self.app_cls,
+                    self.resolution,
+                    self.session_cls,
+                    self.config_path,
+                    visible=self.render_human,
+                    timers=self.timers,
+                )
 
-        self.config = load_app_config(self.app_cls.name(), self.config_path)
-        self.session = self.session_cls(
-            default_sessions_folder(),
-            shlex.split(self.config["entrypoint"]),
-            self.resolution,
-            visible=self.render_human,
+        self.config = launched.config
+        self.session = launched.session
+        self.app = launched.app
+        self._action_mask = gym_input.compile_action_mask(self.app.allowed_input())
+        if self._flat_action_grid is not None:
+            # The action mask is compiled into the flat action tables.
+            self._flat_actions = FlatActionTable(
+                self.resolution[0],
+                self.resolution[1],
+                self._flat_action_grid,
+                self._action_mask,
+            )
+        self._release_delay = float(
+            self.config.get("release_delay", float(self.config["step_length"]) / 2)
+        )
+        self._drag_moves = int(self.config.get("drag_moves", 1))
+        # Events come from the session's InputProcessor, so they're always raw.
+        self._dispatcher = event_dispatch.Dispatcher(
+            self.session.desktop(), validate=False
         )
 
-        self.app = self.app_cls()
-        self._allowed_input = self.app.allowed_input()
-        install_app_from_config(self.session, self.config)
-        self.app.post_install(self.session)
-        self.session.start_process()
-        self.app.begin(self.session.desktop())
-        self.session.time_controller().set_speedup(float(self.config["pause_speed"]))
+        self._virtual_time = None
+        if self.config.get("stepping", "wall_clock") == "virtual_time":
+            self._virtual_time = VirtualTimeStepper(
+                self.session.time_controller(),
+                float(self.config["step_length"]),
+                float(self.config["run_speed"]),
+            )
+            self._virtual_time.freeze()
 
     def reset(
         self, seed: int | None = None, options: dict[str, Any] = {}
     ) -> tuple[GymObservation, GymInfo]:
-        self._init()
-        obs, reward, terminated, truncated, info = self.step(
-            gym_input.no_op_gym_action()
-        )
+        """Resets the environment.
+
+        Healthy apps that support it are warm reset in their running session (see
+        App.soft_reset()). If they don't, or if options["hard_reset"] is True, the
+        session is torn down and the app is reinstalled and relaunched, or replaced by
+        a freshly launched session from the environment's session pool.
+        """
+        if self._pending_step is not None:
+            self.step_wait()
+        self.timers.count("resets")
+        if options.get("hard_reset", False) or not self._warm_reset():
+            self._init()
+        if self._flat_actions is not None:
+            no_op = self._flat_actions.no_op()
+        else:
+            no_op = self._no_op_action
+        obs, reward, terminated, truncated, info = self.step(no_op)
         return obs, info
 
+    def _warm_reset(self) -> bool:
+        """Tries to return the running app to its start state without relaunching the
+        session.
+
+        Returns whether the warm reset succeeded. It fails if the app is unhealthy,
+        doesn't support warm resets, or its reset macro fails, in which case callers
+        should fully re-initialize the environment."""
+        if not self.app.is_healthy(self.session):
+            return False
+
+        release_events = self.session.input_processor().release_buttons()
+        self._dispatcher.dispatch(release_events)
+        # Soft resets may rerun the app's launch macro, which expects the app to run
+        # at normal speed like it does on a cold launch, not paused or frozen.
+        self.session.time_controller().set_speedup(1.0)
+        with self.timers.phase("reset.soft_reset"):
+            try:
+                if not self.app.soft_reset(self.session):
+                    return False
+            except MacroError:
+                self.timers.count("failed_warm_resets")
+                return False
+        self.timers.count("warm_resets")
+        if self._virtual_time is not None:
+            self._virtual_time.freeze()
+        else:
+            self.session.time_controller().set_speedup(
+                float(self.config["pause_speed"])
+            )
+        return True
+
     def step(
         self, action: GymAction
     ) -> tuple[GymObservation, float, bool, bool, GymInfo]:
-        # Apply action to the app session's desktop
-        action = gym_input.mask_action(action, self._allowed_input)
-        input_actions = gym_input.process_gym_action(
-            action, self.resolution[0], self.resolution[1]
-        )
-        immediate_events, delayed_events = (
-            self.session.input_processor().process_input_actions(input_actions)
+        self._run_step_window(self._start_step(action))
+        return self._finish_step()
+
+    def step_async(self, action: GymAction) -> None:
+        """Starts a step without waiting for it to finish.
+
+        Dispatches the action's immediate events and lets the app run, then returns.
+        The step's delayed events and the end of its run window are handled in the
+        background, so callers can do other work, e.g. policy inference, while the
+        app runs. Call step_wait() to get the step's result.
+
+        Raises:
+            AlreadyPendingCallError: If a step started by step_async() hasn't been
+                                     waited on yet.
+        """
+        if self._pending_step is not None:
+            raise AlreadyPendingCallError(
+                "Calling step_async while waiting for a pending call to complete.",
+                "step",
+            )
+        delayed_events = self._start_step(action)
+        self._pending_step = self._step_executor.submit(
+            self._run_step_window, delayed_events
         )
-        event_dispatch.apply_events_to_desktop(immediate_events, self.session.desktop())
 
-        # Step the environment
-        self.session.time_controller().set_speedup(self.config["run_speed"])
-        step_time = float(self.config["step_length"]) / float(self.config["run_speed"])
-        time.sleep(step_time / 2)
-        event_dispatch.apply_events_to_desktop(delayed_events, self.session.desktop())
-        time.sleep(step_time / 2)
-        self.session.time_controller().set_speedup(self.config["pause_speed"])
+    def step_wait(self) -> tuple[GymObservation, float, bool, bool, GymInfo]:
+        """Waits for the step started by step_async() and returns its step tuple.
 
-        # Get observation from the desktop and the Gym step tuple from the app.
-        obs = self.session.desktop().get_frame()
-        return self.app.finalize_step(obs)
+        Raises:
+            NoAsyncCallError: If there's no step started by step_async() to wait on.
+        """
+        if self._pending_step is None:
+            raise NoAsyncCallError(
+                "Calling step_wait without any prior call to step_async.", "step"
+            )
+        pending_step, self._pending_step = self._pending_step, None
+        pending_step.result()
+        return self._finish_step()
+
+    def step_duration(self) -> float:
+        """Returns the wall-clock length of a step's run window in seconds."""
+        return float(self.config["step_length"]) / float(self.config["run_speed"])
+
+    def _start_step(self, action: GymAction) -> ScheduledEvents:
+        """Applies the action's events scheduled at the start of the step and sets
+        the app running.
+
+        Returns the step's scheduled events. The events at offset 0 have already
+        been applied, and the rest should be applied during the step's run window.
+
+        Compound actions like key presses are released "release_delay" seconds of
+        game time into the step, which defaults to half the step's length, and
+        drags are interpolated over "drag_moves" mouse moves, which defaults to 1.
+        """
+        timers = self.timers
+        self._step_started_ns = time.perf_counter_ns()
+        if self._flat_actions is not None:
+            with timers.phase("step.process_gym_action"):
+                self._flat_actions.to_event_buffer(action, self._action_events)
+        elif gym_input.is_action_record(action):
+            with timers.phase("step.process_gym_action"):
+                gym_input.process_action_record_into(
+                    action,
+                    self.resolution[0],
+                    self.resolution[1],
+                    self._action_events,
+                    self._action_mask,
+                )
+        else:
+            with timers.phase("step.mask_action"):
+                action = gym_input.mask_action(action, self._action_mask)
+            with timers.phase("step.process_gym_action"):
+                gym_input.process_gym_action_into(
+                    action, self.resolution[0], self.resolution[1], self._action_events
+                )
+        schedule = self._scheduled_events
+        with timers.phase("step.process_input_actions"):
+            self.session.input_processor().schedule_event_buffer(
+                self._action_events,
+                schedule,
+                self._release_delay,
+                self._drag_moves,
+            )
+        with timers.phase("step.dispatch"):
+            for offset, start, stop in schedule.groups():
+                if offset > 0:
+                    break
+                self._dispatcher.dispatch_buffer(
+                    schedule.copy_range(start, stop, self._dispatch_events)
+                )
+        if self._virtual_time is not None:
+            self._virtual_time.start()
+        else:
+            self.session.time_controller().set_speedup(float(self.config["run_speed"]))
+            self._step_wall_start = time.perf_counter()
+        return schedule
+
+    def _run_step_window(self, schedule: ScheduledEvents) -> None:
+        """Lets the app run for the step's length, applying the scheduled events at
+        their offsets, then drops the app back to its pause speed, or freezes it
+        when stepping in virtual time."""
+
+        def fire_scheduled_events(start: float, deadline: float) -> None:
+            run_speed = float(self.config["run_speed"])
+            for offset, first, stop in schedule.groups():
+                if offset <= 0:
+                    continue
+                sleep_until(min(start + offset / run_speed, deadline))
+                with self.timers.phase("step.dispatch_scheduled"):
+                    self._dispatcher.dispatch_buffer(
+                        schedule.copy_range(first, stop, self._dispatch_events)
+                    )
+
+        with self.timers.phase("step.run_window"):
+            if self._virtual_time is not None:
+                self._step_game_time = self._virtual_time.finish(fire_scheduled_events)
+                return
+
+            start = self._step_wall_start
+            deadline = start + self.step_duration()
+            fire_scheduled_events(start, deadline)
+            sleep_until(deadline)
+            self.session.time_controller().set_speedup(
+                float(self.config["pause_speed"])
+            )
+
+    def _finish_step(self) -> tuple[GymObservation, float, bool, bool, GymInfo]:
+        """Gets the observation from the desktop and the Gym step tuple from the app.
+
+        When stepping in virtual time, the step's info also holds the game time the
+        step ran for as "step_game_time" and the game time run since the environment
+        was launched as "game_time".
+
+        If the environment has timings_in_info set, the info also holds the duration
+        of each of the step's phases in seconds as "timings"."""
+        timers = self.timers
+        with timers.phase("step.get_frame"):
+            frame = self.session.desktop().get_frame()
+        with timers.phase("step.process_observation"):
+            obs = self._observation_pipeline.process(frame)
+        with timers.phase("step.finalize_step"):
+            step_tuple = self.app.finalize_step(obs)
+        timers.record("step", time.perf_counter_ns() - self._step_started_ns)
+        timers.count("steps")
+
+        info = step_tuple[4]
+        if self._virtual_time is not None:
+            info["step_game_time"] = self._step_game_time
+            info["game_time"] = self._virtual_time.total_game_time
+        if self._timings_in_info:
+            info["timings"] = {
+                name: duration
+                for name, duration in timers.last.items()
+                if name.startswith("step")
+            }
+        return step_tuple
 
     def render(self) -> None | np.ndarray:
         pass
 
     def close(self) -> None:
+        self._step_executor.shutdown(wait=True)
+        self._pending_step = None
         if hasattr(self, "app") and self.app is not None:
             del self.app
         if hasattr(self, "session") and self.session is not None:
@@ -197,13 +635,22 @@ class AppEnvironment:
 
     @property
     def action_space(self) -> gym.Space:
+        if self._flat_action_grid is not None:
+            return self._flat_actions.action_space()
         return gym_input.action_space(self.resolution[0], self.resolution[1])
 
+    @property
+    def action_mask(self) -> np.ndarray:
+        """A boolean mask over the action space's key indices of the keys the app
+        allows. Disallowed keys' actions are ignored, so policies can use the mask
+        for invalid action masking."""
+        return self._action_mask
+
     @property
     def observation_space(self) -> gym.Space:
         return gym.spaces.Box(
             0,
             255,
-            (3, self.resolution[0], self.resolution[1]),
+            self._observation_pipeline.shape,
             dtype=np.uint8,
         )
@@ -1,19 +1,30 @@
 import tempfile
+import time
 import unittest
 from pathlib import Path
 
 import gymnasium as gym
 import numpy as np
 import yaml
+from gymnasium.error import AlreadyPendingCallError, NoAsyncCallError
 
 from bounce_rl.core.app_environment import (
     AppEnvironment,
     install_app_from_config,
     load_app_config,
 )
-from bounce_rl.core.fake_app import FakeApp, fake_app_bounce_config
+from bounce_rl.core.app_session import AppSession
+from bounce_rl.core.fake_app import (
+    FakeApp,
+    WarmResetFakeApp,
+    fake_app_bounce_config,
+)
 from bounce_rl.core.fake_app_session import FakeAppSession
-from bounce_rl.input import gym_input
+from bounce_rl.core.macro import MacroStep, run_macro
+from bounce_rl.core.observation import ObservationConfig
+from bounce_rl.input import flat_actions, gym_input
+from bounce_rl.input.input_types import KeyActionKind
+from bounce_rl.input.keys import KEY_A
 
 
 class TestLoadAppConfig(unittest.TestCase):
@@ -61,6 +72,58 @@ class TestInstallAppFromConfig(unittest.TestCase):
             config = {"name": "TestApp"}
             install_app_from_config(session, config)
 
+    def _install_linked_app(self, app_dir: Path, sessions_dir: str, base_dir: str):
+        (app_dir / "bin").mkdir()
+        (app_dir / "bin" / "app").write_text("binary")
+        (app_dir / "config").mkdir()
+        (app_dir / "config" / "config.ini").write_text("settings")
+
+        session = FakeAppSession(sessions_dir)
+        config = {
+            "install": {
+                "from": str(app_dir),
+                "to": "app",
+                "mode": "link",
+                "writable": ["config"],
+            }
+        }
+        install_app_from_config(session, config, base_installs_folder=base_dir)
+        return Path(session.data_folder()) / "app", session
+
+    def test_install_app_from_config_link_mode_hard_links_files(self):
+        with tempfile.TemporaryDirectory() as app_dir, tempfile.TemporaryDirectory() as sessions_dir, tempfile.TemporaryDirectory() as base_dir:
+            installed, _ = self._install_linked_app(
+                Path(app_dir), sessions_dir, base_dir
+            )
+
+            self.assertEqual((installed / "bin" / "app").read_text(), "binary")
+            self.assertGreater((installed / "bin" / "app").stat().st_nlink, 1)
+
+    def test_install_app_from_config_link_mode_copies_writable_files(self):
+        with tempfile.TemporaryDirectory() as app_dir, tempfile.TemporaryDirectory() as sessions_dir, tempfile.TemporaryDirectory() as base_dir:
+            installed, _ = self._install_linked_app(
+                Path(app_dir), sessions_dir, base_dir
+            )
+
+            (installed / "config" / "config.ini").write_text("changed")
+            self.assertEqual((installed / "config" / "config.ini").stat().st_nlink, 1)
+
+    def test_install_app_from_config_link_mode_shares_base_install(self):
+        with tempfile.TemporaryDirectory() as app_dir, tempfile.TemporaryDirectory() as sessions_dir, tempfile.TemporaryDirectory() as base_dir:
+            first, _ = self._install_linked_app(Path(app_dir), sessions_dir, base_dir)
+            session = FakeAppSession(sessions_dir)
+            install_app_from_config(
+                session,
+                {"install": {"from": app_dir, "to": "app", "mode": "link"}},
+                base_installs_folder=base_dir,
+            )
+            second = Path(session.data_folder()) / "app"
+
+            self.assertEqual(
+                (first / "bin" / "app").stat().st_ino,
+                (second / "bin" / "app").stat().st_ino,
+            )
+
 
 class TestAppEnvironment(unittest.TestCase):
     def test_action_space(self):
@@ -78,9 +141,253 @@ class TestAppEnvironment(unittest.TestCase):
                 FakeApp, (640, 480), session_cls=FakeAppSession, config_path=f.name
             )
             self.assertEqual(
-                env.observation_space, gym.spaces.Box(0, 255, (3, 640, 480), np.uint8)
+                env.observation_space, gym.spaces.Box(0, 255, (3, 480, 640), np.uint8)
+            )
+
+    def test_observation_space_matches_configured_observation(self):
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(fake_app_bounce_config(), f)
+            env = AppEnvironment(
+                FakeApp,
+                (640, 480),
+                session_cls=FakeAppSession,
+                config_path=f.name,
+                observation=ObservationConfig(downscale=2, grayscale=True),
+            )
+            obs, _, _, _, _ = env.step(gym_input.no_op_gym_action())
+            self.assertTrue(env.observation_space.contains(obs))
+
+    def test_action_mask_allows_app_input(self):
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(fake_app_bounce_config(), f)
+            env = AppEnvironment(
+                FakeApp, (640, 480), session_cls=FakeAppSession, config_path=f.name
+            )
+            np.testing.assert_array_equal(
+                env.action_mask, np.ones(len(gym_input.ACTION_KEYCODES), dtype=bool)
+            )
+
+
+class FailingWarmResetFakeApp(WarmResetFakeApp):
+    """A WarmResetFakeApp whose reset macro never finds its screen."""
+
+    def soft_reset(self, session: AppSession) -> bool:
+        never = MacroStep("main menu", wait_for=lambda frame: False, timeout=0.01)
+        run_macro(session.desktop(), [never])
+        return True
+
+
+class TestAppEnvironmentReset(unittest.TestCase):
+    def setUp(self):
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(fake_app_bounce_config(), self._config_file)
+        self._config_file.flush()
+
+    def tearDown(self):
+        self._config_file.close()
+
+    def _make_env(self, app_cls: type[FakeApp]) -> AppEnvironment:
+        return AppEnvironment(
+            app_cls,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+        )
+
+    def test_reset_reuses_session_of_healthy_app(self):
+        env = self._make_env(WarmResetFakeApp)
+        session = env.session
+        env.reset()
+        self.assertIs(env.session, session)
+
+    def test_reset_relaunches_app_without_soft_reset_support(self):
+        env = self._make_env(FakeApp)
+        session = env.session
+        env.reset()
+        self.assertIsNot(env.session, session)
+
+    def test_soft_reset_runs_at_normal_speed(self):
+        env = self._make_env(WarmResetFakeApp)
+        calls = []
+        env.session.time_controller().set_speedup = calls.append
+        env.app.soft_reset = lambda session: calls.append("soft_reset") or True
+
+        env.reset()
+
+        self.assertEqual(calls[:3], [1.0, "soft_reset", 0.2])
+
+    def test_reset_relaunches_app_whose_soft_reset_fails(self):
+        env = self._make_env(FailingWarmResetFakeApp)
+        session = env.session
+        env.reset()
+        self.assertIsNot(env.session, session)
+        self.assertEqual(env.timers.counters["failed_warm_resets"], 1)
+
+    def test_hard_reset_relaunches_healthy_app(self):
+        env = self._make_env(WarmResetFakeApp)
+        session = env.session
+        env.reset(options={"hard_reset": True})
+        self.assertIsNot(env.session, session)
+
+
+class TestAppEnvironmentAsyncStep(unittest.TestCase):
+    def setUp(self):
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(fake_app_bounce_config(), self._config_file)
+        self._config_file.flush()
+        self.env = AppEnvironment(
+            FakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+        )
+
+    def tearDown(self):
+        self.env.close()
+        self._config_file.close()
+
+    def test_step_async_returns_before_step_window_ends(self):
+        start = time.perf_counter()
+        self.env.step_async(gym_input.no_op_gym_action())
+        self.assertLess(time.perf_counter() - start, self.env.step_duration())
+        self.env.step_wait()
+
+    def test_step_wait_returns_step_tuple(self):
+        self.env.step_async(gym_input.no_op_gym_action())
+        obs, reward, terminated, truncated, info = self.env.step_wait()
+        self.assertEqual(obs.shape, (3, 480, 640))
+
+    def test_step_async_rejects_second_pending_step(self):
+        self.env.step_async(gym_input.no_op_gym_action())
+        with self.assertRaises(AlreadyPendingCallError):
+            self.env.step_async(gym_input.no_op_gym_action())
+        self.env.step_wait()
+
+    def test_step_wait_requires_step_async(self):
+        with self.assertRaises(NoAsyncCallError):
+            self.env.step_wait()
+
+
+class TestAppEnvironmentVirtualTime(unittest.TestCase):
+    def test_step_reports_game_time(self):
+        conf = fake_app_bounce_config()
+        conf["apps"][0]["stepping"] = "virtual_time"
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(conf, f)
+            env = AppEnvironment(
+                FakeApp, (640, 480), session_cls=FakeAppSession, config_path=f.name
+            )
+            _, _, _, _, info = env.step(gym_input.no_op_gym_action())
+
+            self.assertAlmostEqual(info["step_game_time"], 0.25, delta=0.01)
+            self.assertEqual(info["game_time"], info["step_game_time"])
+
+
+class TestAppEnvironmentScheduledInput(unittest.TestCase):
+    def test_key_press_is_released_during_step(self):
+        conf = fake_app_bounce_config()
+        conf["apps"][0]["release_delay"] = "0.05"
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(conf, f)
+            env = AppEnvironment(
+                FakeApp, (640, 480), session_cls=FakeAppSession, config_path=f.name
+            )
+            action = gym_input.no_op_gym_action()
+            action["keys"][0] = [
+                gym_input.ACTION_KEYCODES.index(KEY_A),
+                KeyActionKind.KEY_PRESS,
+            ]
+            desktop = env.session.desktop()
+            desktop.events.clear()
+
+            env.step_async(action)
+            self.assertEqual(desktop.events, [("keycode_down", KEY_A)])
+            env.step_wait()
+
+            self.assertEqual(
+                desktop.events, [("keycode_down", KEY_A), ("keycode_up", KEY_A)]
             )
 
 
+class TestAppEnvironmentActionRecords(unittest.TestCase):
+    def test_step_takes_action_records(self):
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(fake_app_bounce_config(), f)
+            env = AppEnvironment(
+                FakeApp, (640, 480), session_cls=FakeAppSession, config_path=f.name
+            )
+            action = gym_input.action_buffer()
+            action["keys"][0] = [
+                gym_input.ACTION_KEYCODES.index(KEY_A),
+                KeyActionKind.KEY_DOWN,
+            ]
+            desktop = env.session.desktop()
+            desktop.events.clear()
+
+            env.step(action)
+
+            self.assertEqual(desktop.events, [("keycode_down", KEY_A)])
+
+
+class TestAppEnvironmentFlatActions(unittest.TestCase):
+    def test_step_takes_flat_actions(self):
+        with tempfile.NamedTemporaryFile(mode="w") as f:
+            yaml.dump(fake_app_bounce_config(), f)
+            env = AppEnvironment(
+                FakeApp,
+                (640, 480),
+                session_cls=FakeAppSession,
+                config_path=f.name,
+                flat_action_grid=(4, 2),
+            )
+            self.assertIsInstance(env.action_space, gym.spaces.MultiDiscrete)
+            env.reset()
+            action = np.zeros(env.action_space.shape, dtype=np.int64)
+            action[0] = flat_actions.key_index(KEY_A, KeyActionKind.KEY_DOWN)
+            desktop = env.session.desktop()
+            desktop.events.clear()
+
+            env.step(action)
+
+            self.assertEqual(desktop.events, [("keycode_down", KEY_A)])
+
+
+class TestAppEnvironmentTimings(unittest.TestCase):
+    def setUp(self):
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(fake_app_bounce_config(), self._config_file)
+        self._config_file.flush()
+
+    def tearDown(self):
+        self._config_file.close()
+
+    def test_timers_record_launch_and_step_phases(self):
+        env = AppEnvironment(
+            FakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+        )
+        _, _, _, _, info = env.step(gym_input.no_op_gym_action())
+
+        for phase in ("launch.install", "launch.begin", "step.get_frame", "step"):
+            self.assertEqual(env.timers.histograms[phase].count, 1, phase)
+        self.assertEqual(env.timers.counters["steps"], 1)
+        self.assertNotIn("timings", info)
+
+    def test_timings_in_info(self):
+        env = AppEnvironment(
+            FakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+            timings_in_info=True,
+        )
+        _, _, _, _, info = env.step(gym_input.no_op_gym_action())
+
+        self.assertGreaterEqual(info["timings"]["step.run_window"], env.step_duration())
+        self.assertNotIn("launch.install", info["timings"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -55,11 +55,17 @@ class AppSession:
         self._input_processor = InputProcessor(resolution[0], resolution[1])
 
     def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        """Kills the session's process and deletes its data folder."""
         # Only clean up the process if it's actually been started.
         if self._process is not None:
             self._process.kill()
+            self._process = None
         if self._folder is not None:
             self._folder.cleanup()
+            self._folder = None
 
     def _popen(self, *args, **kwargs) -> subprocess.Popen:
         """A wrapper around subprocess.Popen that's used by start_process. We use this
@@ -81,6 +87,16 @@ class AppSession:
         )
         return self._process
 
+    def restart_process(self) -> subprocess.Popen:
+        """Kills the session's process, if any, and launches `run_command` again.
+
+        The session's folder, desktop, and time controller are kept, so this is much
+        cheaper than creating a new session."""
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+        return self.start_process()
+
     def desktop(self) -> Desktop:
         return self._desktop
 
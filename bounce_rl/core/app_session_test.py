@@ -31,6 +31,13 @@ class TestAppSession(unittest.TestCase):
         s.start_process()
         self.assertIsInstance(s._process, subprocess.Popen)
 
+    def test_restart_process_replaces_subprocess(self):
+        s = AppSession(self.sessions_dir, ["sleep", "10"], (640, 480))
+        first = s.start_process()
+        second = s.restart_process()
+        self.assertIsNot(second, first)
+        self.assertIsNotNone(first.returncode)
+
     def test_time_controller(self):
         s = AppSession(self.sessions_dir, [""], (640, 480))
         self.assertIsInstance(s.time_controller(), libtimecontrol.TimeController)
@@ -1,7 +1,13 @@
 from bounce_desktop import Desktop
 
 from bounce_rl.core.app import App
+from bounce_rl.core.app_session import AppSession
 from bounce_rl.core.gym_types import GymObservation, GymStepTuple
+from bounce_rl.input.allowed_inputs import AllowKeys
+from bounce_rl.input.keys import AllKeys
+
+
+_ALLOWED_INPUT = AllowKeys([AllKeys])
 
 
 def fake_app_bounce_config() -> dict:
@@ -26,10 +32,13 @@ class FakeApp(App):
     def name() -> str:
         return "fake_app"
 
+    def allowed_input(self) -> AllowKeys:
+        return _ALLOWED_INPUT
+
     def finalize_step(self, obs: GymObservation) -> GymStepTuple:
-        pass
+        return (obs, 0.0, False, False, {})
 
-    def post_install(self) -> None:
+    def post_install(self, session: AppSession) -> None:
         pass
 
     def begin(self, desktop: Desktop) -> None:
@@ -37,3 +46,13 @@ class FakeApp(App):
 
     def supported_resolutions(self) -> list[tuple[int, int]]:
         return [(640, 480)]
+
+
+class WarmResetFakeApp(FakeApp):
+    """A FakeApp that's always healthy and supports warm resets."""
+
+    def is_healthy(self, session: AppSession) -> bool:
+        return True
+
+    def soft_reset(self, session: AppSession) -> bool:
+        return True
@@ -7,13 +7,16 @@ import tempfile
 from libtimecontrol import TimeController
 
 from bounce_rl.core.app_session import AppSession
+from bounce_rl.core.fake_desktop import FakeDesktop
+from bounce_rl.input.input_processor import InputProcessor
 
 
 class FakeAppSession(AppSession):
-    """Minimal fake AppSession for testing install_app_from_config.
+    """Minimal fake AppSession for testing install_app_from_config and
+    AppEnvironment.
 
-    Provides just enough interface to test file installation without
-    creating real Desktop instances or launching processes.
+    Provides just enough interface to test file installation and environment
+    stepping without creating real Desktop instances or launching processes.
     """
 
     def __init__(
@@ -27,14 +30,24 @@ class FakeAppSession(AppSession):
 
         Args:
             sessions_folder: Parent directory for creating temp session folder
+            resolution: If given, the session gets a FakeDesktop and an
+                        InputProcessor with this resolution.
         """
         self._run_command = run_command
         self._folder = tempfile.TemporaryDirectory(prefix=sessions_folder)
         self._time_controller = TimeController()
         self._process = None
+        self._desktop = None
+        self._input_processor = None
+        if resolution is not None:
+            self._desktop = FakeDesktop(resolution)
+            self._input_processor = InputProcessor(resolution[0], resolution[1])
 
-    def desktop(self) -> None:
-        return None
+    def desktop(self) -> FakeDesktop | None:
+        return self._desktop
+
+    def input_processor(self) -> InputProcessor | None:
+        return self._input_processor
 
     def data_folder(self) -> str:
         return self._folder.name
@@ -0,0 +1,39 @@
+"""Test helper for creating fake Desktop instances in unit tests."""
+
+import numpy as np
+
+
+class FakeDesktop:
+    """Fake desktop backend that records input events and returns blank frames.
+
+    Implements the subset of the Bounce Desktop interface used by AppEnvironment
+    without starting a compositor.
+    """
+
+    def __init__(self, resolution: tuple[int, int] = (640, 480)):
+        self.resolution = resolution
+        self.events = []
+
+    def keycode_down(self, keycode: int) -> None:
+        self.events.append(("keycode_down", keycode))
+
+    def keycode_up(self, keycode: int) -> None:
+        self.events.append(("keycode_up", keycode))
+
+    def move_mouse(self, x: int, y: int) -> None:
+        self.events.append(("move_mouse", x, y))
+
+    def move_mouse_to(self, x: int, y: int) -> None:
+        self.events.append(("move_mouse_to", x, y))
+
+    def mouse_press(self, button: int) -> None:
+        self.events.append(("mouse_press", button))
+
+    def mouse_release(self, button: int) -> None:
+        self.events.append(("mouse_release", button))
+
+    def get_frame(self) -> np.ndarray:
+        return np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+
+    def get_desktop_env(self) -> dict[str, str]:
+        return {}
@@ -0,0 +1,188 @@
+# Macros drive an app through a fixed sequence of inputs, e.g. from its main menu
+# into a new game. Each step sends its inputs and then waits for the screen to
+# show the step's result instead of sleeping for a fixed time.
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+import numpy as np
+from bounce_desktop import Desktop
+
+from bounce_rl.core.screen_wait import (
+    ScreenWait,
+    frame_sample,
+    wait_for_change,
+    wait_for_screen,
+)
+from bounce_rl.core.timing import PhaseTimers
+from bounce_rl.input.event_dispatch import Dispatcher
+from bounce_rl.input.input_types import (
+    InputAction,
+    KeyAction,
+    Keycode,
+    MouseButton,
+    MouseButtonAction,
+    MouseMoveAction,
+)
+from bounce_rl.input.keys import BTN_LEFT
+
+
+@dataclass(frozen=True)
+class MacroStep:
+    """One step of a macro: inputs to send and the screen to wait for after them.
+
+    Attributes:
+        name: Names the step in timings and errors, e.g. "click new game".
+        events: The raw input events to send, in order.
+        wait_for: If set, the step waits until a frame matches, e.g.
+                  FactorioMatcher.check_if_on_main_menu.
+        wait_for_change: If set, the step waits until the screen changes from the
+                         frame shown before its events were sent and settles.
+        hold: How long in seconds to wait after sending the events before waiting
+              on the screen, e.g. to hold a key down long enough to repeat.
+        timeout: How long in seconds to wait on the screen before the macro fails.
+    """
+
+    name: str
+    events: tuple[InputAction, ...] = ()
+    wait_for: Callable[[np.ndarray], bool] | None = None
+    wait_for_change: bool = False
+    hold: float = 0.0
+    timeout: float = 5.0
+
+    def __post_init__(self):
+        if self.wait_for is not None and self.wait_for_change:
+            raise ValueError(
+                f"Macro step {self.name!r} can't set both wait_for and "
+                "wait_for_change."
+            )
+
+
+def click(
+    name: str, x: int, y: int, button: MouseButton = BTN_LEFT, **kwargs
+) -> MacroStep:
+    """Returns a step that moves the mouse to (x, y) and clicks there. kwargs are
+    passed to MacroStep."""
+    events = (
+        MouseMoveAction((x, y)),
+        MouseButtonAction.down(button),
+        MouseButtonAction.up(button),
+    )
+    return MacroStep(name, events, **kwargs)
+
+
+def press(name: str, keycode: Keycode, **kwargs) -> MacroStep:
+    """Returns a step that presses and releases a key. kwargs are passed to
+    MacroStep."""
+    return MacroStep(name, (KeyAction.down(keycode), KeyAction.up(keycode)), **kwargs)
+
+
+@dataclass
+class MacroStepResult:
+    """How a macro step went.
+
+    Attributes:
+        name: The step's name.
+        dispatch: How long sending the step's events took in seconds.
+        wait: The step's wait on the screen, or None if it didn't wait.
+        elapsed: How long the whole step took in seconds.
+    """
+
+    name: str
+    dispatch: float
+    wait: ScreenWait | None
+    elapsed: float
+
+
+@dataclass
+class MacroResult:
+    """The results of a macro's steps, in the order they ran."""
+
+    steps: list[MacroStepResult] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return sum(step.elapsed for step in self.steps)
+
+    def step(self, name: str) -> MacroStepResult:
+        """Returns the first result of the step with the given name."""
+        for step in self.steps:
+            if step.name == name:
+                return step
+        raise KeyError(name)
+
+
+class MacroError(RuntimeError):
+    """Raised when a macro step's screen isn't shown before the step's timeout.
+
+    Attributes:
+        step: The step that failed.
+        result: The results of the steps that ran, including the failed one.
+    """
+
+    def __init__(self, step: MacroStep, result: MacroResult):
+        waited = result.steps[-1].wait.waited
+        condition = "its screen" if step.wait_for is not None else "a screen change"
+        super().__init__(
+            f"Macro step {step.name!r} timed out after {waited:.1f}s waiting for "
+            f"{condition}."
+        )
+        self.step = step
+        self.result = result
+
+
+def run_macro(
+    desktop: Desktop,
+    steps: Sequence[MacroStep],
+    event_interval: float = 0.0,
+    timers: PhaseTimers | None = None,
+) -> MacroResult:
+    """Runs a macro's steps on a desktop.
+
+    Args:
+        desktop: The desktop to send the macro's inputs to.
+        steps: The steps to run, in order.
+        event_interval: How long in seconds to wait between the events of a step,
+                        for apps that miss inputs sent in the same frame.
+        timers: If set, records each step's duration as a "macro.<name>" phase.
+
+    Returns:
+        The results of the macro's steps.
+
+    Raises:
+        MacroError: If a step's screen isn't shown before its timeout.
+    """
+    dispatcher = Dispatcher(desktop)
+    result = MacroResult()
+    for step in steps:
+        start = time.perf_counter()
+        if step.wait_for_change:
+            reference = frame_sample(desktop.get_frame())
+
+        if event_interval > 0:
+            for i, event in enumerate(step.events):
+                if i > 0:
+                    time.sleep(event_interval)
+                dispatcher.dispatch([event])
+        else:
+            dispatcher.dispatch(list(step.events))
+        dispatched = time.perf_counter()
+
+        if step.hold > 0:
+            time.sleep(step.hold)
+        wait = None
+        if step.wait_for is not None:
+            wait = wait_for_screen(desktop, step.wait_for, step.timeout)
+        elif step.wait_for_change:
+            wait = wait_for_change(desktop, reference, step.timeout)
+
+        elapsed = time.perf_counter() - start
+        result.steps.append(
+            MacroStepResult(step.name, dispatched - start, wait, elapsed)
+        )
+        if timers is not None:
+            timers.record(f"macro.{step.name}", int(elapsed * 1e9))
+        if wait is not None and not wait.matched:
+            raise MacroError(step, result)
+    return result
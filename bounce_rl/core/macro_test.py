@@ -0,0 +1,115 @@
+import time
+import unittest
+
+import numpy as np
+
+from bounce_rl.core.fake_desktop import FakeDesktop
+from bounce_rl.core.macro import MacroError, MacroStep, click, press, run_macro
+from bounce_rl.core.timing import PhaseTimers
+from bounce_rl.input.input_types import KeyAction
+from bounce_rl.input.keys import KEY_A, KEY_B
+
+
+class MenuDesktop(FakeDesktop):
+    """A FakeDesktop whose frame brightens by one step on each mouse click."""
+
+    def __init__(self):
+        super().__init__((64, 48))
+        self.screen = 0
+
+    def mouse_release(self, button: int) -> None:
+        super().mouse_release(button)
+        self.screen += 1
+
+    def get_frame(self) -> np.ndarray:
+        frame = super().get_frame()
+        frame[:] = self.screen
+        return frame
+
+
+class TestRunMacro(unittest.TestCase):
+    def test_dispatches_steps_in_order(self):
+        desktop = FakeDesktop()
+
+        run_macro(
+            desktop,
+            [
+                click("click", 10, 20),
+                MacroStep("hold a", (KeyAction.down(KEY_A),)),
+                press("press b", KEY_B),
+                MacroStep("release a", (KeyAction.up(KEY_A),)),
+            ],
+        )
+
+        self.assertEqual(
+            desktop.events,
+            [
+                ("move_mouse_to", 10, 20),
+                ("mouse_press", 1),
+                ("mouse_release", 1),
+                ("keycode_down", KEY_A),
+                ("keycode_down", KEY_B),
+                ("keycode_up", KEY_B),
+                ("keycode_up", KEY_A),
+            ],
+        )
+
+    def test_waits_for_screen_changes(self):
+        desktop = MenuDesktop()
+
+        result = run_macro(
+            desktop,
+            [
+                click("first", 0, 0, wait_for_change=True),
+                click("second", 0, 0, wait_for_change=True),
+                MacroStep("on second screen", wait_for=lambda f: f.max() == 2),
+            ],
+        )
+
+        self.assertEqual(
+            [step.name for step in result.steps],
+            ["first", "second", "on second screen"],
+        )
+        self.assertTrue(all(step.wait.matched for step in result.steps))
+        self.assertLess(result.elapsed, 1)
+
+    def test_records_step_timings(self):
+        timers = PhaseTimers()
+
+        result = run_macro(
+            FakeDesktop(), [press("press a", KEY_A, hold=0.05)], timers=timers
+        )
+
+        self.assertIsNone(result.step("press a").wait)
+        self.assertGreaterEqual(result.step("press a").elapsed, 0.05)
+        self.assertEqual(timers.summary()["macro.press a"]["count"], 1)
+
+    def test_event_interval_spaces_events(self):
+        start = time.perf_counter()
+        run_macro(FakeDesktop(), [click("click", 0, 0)], event_interval=0.02)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_fails_fast_naming_the_step(self):
+        desktop = FakeDesktop()
+        steps = [
+            press("press a", KEY_A),
+            click("dead button", 0, 0, wait_for_change=True, timeout=0.1),
+            press("press b", KEY_B),
+        ]
+
+        with self.assertRaisesRegex(MacroError, "'dead button'"):
+            try:
+                run_macro(desktop, steps)
+            except MacroError as e:
+                self.assertEqual(e.step.name, "dead button")
+                self.assertEqual(len(e.result.steps), 2)
+                raise
+        self.assertNotIn(("keycode_down", KEY_B), desktop.events)
+
+    def test_rejects_steps_with_two_conditions(self):
+        with self.assertRaises(ValueError):
+            MacroStep("step", wait_for=lambda f: True, wait_for_change=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
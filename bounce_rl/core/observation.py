@@ -0,0 +1,115 @@
+# ObservationPipeline turns desktop frames into the observations AppEnvironments
+# return, writing into preallocated buffers so that steps don't allocate frames.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Integer ITU-R BT.601 luma weights, scaled by 256.
+_GRAY_WEIGHTS = (77, 150, 29)
+_GRAY_SHIFT = 8
+
+
+@dataclass(frozen=True)
+class ObservationConfig:
+    """Configures the preprocessing AppEnvironment applies to each frame.
+
+    Attributes:
+        roi: Region of the frame to keep as (x, y, width, height), or None to keep
+             the whole frame.
+        downscale: Integer factor to shrink the region by, averaging each
+                   downscale x downscale block of pixels. Trailing rows and columns
+                   that don't fill a whole block are dropped.
+        grayscale: Whether to convert the observation to a single luma channel.
+        layout: "CHW" for channel-first observations or "HWC" for channel-last.
+    """
+
+    roi: tuple[int, int, int, int] | None = None
+    downscale: int = 1
+    grayscale: bool = False
+    layout: str = "CHW"
+
+
+class ObservationPipeline:
+    """Crops, downscales, grayscales and lays out frames into a reused buffer.
+
+    process() returns the same output buffer on every call, so callers that keep
+    observations across steps must copy them.
+    """
+
+    def __init__(self, resolution: tuple[int, int], config: ObservationConfig):
+        """Creates an ObservationPipeline for frames of the given resolution.
+
+        Args:
+            resolution: Frame resolution as (width, height) tuple
+            config: The preprocessing to apply.
+        """
+        if config.layout not in ("CHW", "HWC"):
+            raise ValueError(f"Unsupported observation layout: {config.layout}")
+        if config.downscale < 1:
+            raise ValueError(f"Downscale must be at least 1, got {config.downscale}")
+
+        x, y, w, h = config.roi or (0, 0, resolution[0], resolution[1])
+        if x < 0 or y < 0 or x + w > resolution[0] or y + h > resolution[1]:
+            raise ValueError(
+                f"Observation roi {config.roi} doesn't fit in resolution {resolution}."
+            )
+
+        self._config = config
+        f = config.downscale
+        out_h, out_w = h // f, w // f
+        self._rows = slice(y, y + out_h * f)
+        self._cols = slice(x, x + out_w * f)
+        channels = 1 if config.grayscale else 3
+
+        # Intermediate buffers for the stages that need them.
+        self._block_sums = None
+        if f > 1:
+            self._block_sums = np.empty((out_h, out_w, 3), dtype=np.uint32)
+        self._gray = None
+        self._gray_term = None
+        if config.grayscale:
+            self._gray = np.empty((out_h, out_w), dtype=np.uint32)
+            self._gray_term = np.empty((out_h, out_w), dtype=np.uint32)
+
+        if config.layout == "CHW":
+            self.shape = (channels, out_h, out_w)
+        else:
+            self.shape = (out_h, out_w, channels)
+        self._out = np.empty(self.shape, dtype=np.uint8)
+        # A view of the output buffer in (H, W, C) order.
+        self._out_hwc = self._out
+        if config.layout == "CHW":
+            self._out_hwc = self._out.transpose(1, 2, 0)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """Processes an (H, W, C) frame and returns the observation.
+
+        Frames with an alpha channel have it dropped."""
+        f = self._config.downscale
+        pixels = frame[self._rows, self._cols, :3]
+
+        if self._block_sums is not None:
+            blocks = pixels.reshape(
+                pixels.shape[0] // f, f, pixels.shape[1] // f, f, 3
+            )
+            np.sum(blocks, axis=(1, 3), dtype=np.uint32, out=self._block_sums)
+            np.floor_divide(self._block_sums, f * f, out=self._block_sums)
+            pixels = self._block_sums
+
+        if self._gray is not None:
+            gray, term = self._gray, self._gray_term
+            np.multiply(pixels[..., 0], _GRAY_WEIGHTS[0], out=gray, dtype=np.uint32)
+            for channel in (1, 2):
+                np.multiply(
+                    pixels[..., channel],
+                    _GRAY_WEIGHTS[channel],
+                    out=term,
+                    dtype=np.uint32,
+                )
+                np.add(gray, term, out=gray)
+            np.right_shift(gray, _GRAY_SHIFT, out=gray)
+            pixels = gray[..., np.newaxis]
+
+        np.copyto(self._out_hwc, pixels, casting="unsafe")
+        return self._out
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from bounce_rl.core.observation import ObservationConfig, ObservationPipeline
+
+RESOLUTION = (8, 6)
+
+
+def make_frame() -> np.ndarray:
+    """Create an (H, W, 3) frame with distinct values in each pixel and channel."""
+    return (
+        np.arange(RESOLUTION[1] * RESOLUTION[0] * 3, dtype=np.uint8)
+        .reshape(RESOLUTION[1], RESOLUTION[0], 3)
+    )
+
+
+class TestObservationPipeline(unittest.TestCase):
+    def test_default_config_returns_chw_frame(self):
+        pipeline = ObservationPipeline(RESOLUTION, ObservationConfig())
+        np.testing.assert_array_equal(
+            pipeline.process(make_frame()), make_frame().transpose(2, 0, 1)
+        )
+
+    def test_hwc_layout_returns_frame(self):
+        pipeline = ObservationPipeline(RESOLUTION, ObservationConfig(layout="HWC"))
+        np.testing.assert_array_equal(pipeline.process(make_frame()), make_frame())
+
+    def test_roi_crops_frame(self):
+        pipeline = ObservationPipeline(
+            RESOLUTION, ObservationConfig(roi=(2, 1, 3, 4), layout="HWC")
+        )
+        np.testing.assert_array_equal(
+            pipeline.process(make_frame()), make_frame()[1:5, 2:5]
+        )
+
+    def test_downscale_averages_blocks(self):
+        pipeline = ObservationPipeline(
+            RESOLUTION, ObservationConfig(downscale=2, layout="HWC")
+        )
+        frame = make_frame()
+        expected = frame.reshape(3, 2, 4, 2, 3).mean(axis=(1, 3)).astype(np.uint8)
+        np.testing.assert_array_equal(pipeline.process(frame), expected)
+
+    def test_grayscale_returns_single_channel(self):
+        pipeline = ObservationPipeline(RESOLUTION, ObservationConfig(grayscale=True))
+        frame = np.full((RESOLUTION[1], RESOLUTION[0], 3), 200, dtype=np.uint8)
+        np.testing.assert_array_equal(
+            pipeline.process(frame), np.full((1, RESOLUTION[1], RESOLUTION[0]), 200)
+        )
+
+    def test_process_drops_alpha_channel(self):
+        pipeline = ObservationPipeline(RESOLUTION, ObservationConfig(layout="HWC"))
+        frame = np.zeros((RESOLUTION[1], RESOLUTION[0], 4), dtype=np.uint8)
+        self.assertEqual(pipeline.process(frame).shape, (6, 8, 3))
+
+    def test_shape_matches_processed_observation(self):
+        pipeline = ObservationPipeline(
+            RESOLUTION, ObservationConfig(roi=(0, 0, 7, 5), downscale=2)
+        )
+        self.assertEqual(pipeline.process(make_frame()).shape, pipeline.shape)
+
+    def test_process_reuses_output_buffer(self):
+        pipeline = ObservationPipeline(RESOLUTION, ObservationConfig())
+        self.assertIs(pipeline.process(make_frame()), pipeline.process(make_frame()))
+
+    def test_rejects_roi_outside_frame(self):
+        with self.assertRaises(ValueError):
+            ObservationPipeline(RESOLUTION, ObservationConfig(roi=(4, 0, 8, 6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
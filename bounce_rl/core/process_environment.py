@@ -0,0 +1,215 @@
+# ProcessAppEnvironment runs an AppEnvironment in a worker process and returns its
+# observations through shared memory, so frames are never pickled.
+
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.error import AlreadyPendingCallError, NoAsyncCallError
+from gymnasium.vector.utils import CloudpickleWrapper
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.gym_types import GymAction, GymInfo, GymObservation
+
+
+class ObservationRing:
+    """A ring buffer of observation slots in shared memory."""
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        dtype: np.dtype,
+        slots: int,
+        name: str | None = None,
+    ):
+        """Creates a new ObservationRing, or attaches to an existing one.
+
+        Args:
+            shape: The shape of one observation.
+            dtype: The dtype of the observations.
+            slots: The number of observations the ring holds.
+            name: The shared memory name of an existing ring to attach to. If not
+                  given, a new ring is created.
+        """
+        self.slots = slots
+        size = slots * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self._owner = name is None
+        self._shm = SharedMemory(name=name, create=self._owner, size=size)
+        self._buffer = np.ndarray((slots, *shape), dtype=dtype, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def slot(self, index: int) -> np.ndarray:
+        """Returns a view of the observation in the given slot."""
+        return self._buffer[index]
+
+    def close(self) -> None:
+        """Detaches from the ring, deleting it if this instance created it."""
+        # Views into the shared memory must be released before it can be closed.
+        self._buffer = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _worker(env_fn: CloudpickleWrapper, pipe: Connection, slots: int) -> None:
+    """Runs an AppEnvironment and serves commands sent over the pipe."""
+    ring = None
+    env = None
+    try:
+        env = env_fn()
+        obs_space = env.observation_space
+        pipe.send(
+            ("ok", (obs_space, env.action_space, env.action_mask, env.metadata))
+        )
+        ring = ObservationRing(obs_space.shape, obs_space.dtype, slots, pipe.recv())
+
+        next_slot = 0
+        while True:
+            command, args = pipe.recv()
+            if command == "reset":
+                obs, info = env.reset(*args)
+                result = (0.0, False, False, info)
+            elif command == "step":
+                obs, *result = env.step(*args)
+            elif command == "close":
+                pipe.send(("ok", None))
+                return
+            else:
+                raise ValueError(f"Unknown ProcessAppEnvironment command: {command}")
+
+            np.copyto(ring.slot(next_slot), obs)
+            pipe.send(("ok", (next_slot, *result)))
+            next_slot = (next_slot + 1) % slots
+    except EOFError:
+        # The parent closed its end of the pipe without sending "close".
+        pass
+    except Exception as e:
+        pipe.send(("error", e))
+    finally:
+        if ring is not None:
+            ring.close()
+        if env is not None:
+            env.close()
+
+
+class ProcessAppEnvironment:
+    """An AppEnvironment running in its own worker process.
+
+    Observations are written by the worker into a shared memory ring buffer and
+    returned as zero-copy NumPy views of their slot. Only the slot index, reward,
+    flags and info are sent over the control pipe. A returned observation stays
+    valid until `slots` more steps or resets have been made, so callers that keep
+    observations longer must copy them.
+
+    Supports the same reset/step/step_async/step_wait interface as AppEnvironment,
+    so it can be used as a VectorAppEnvironment sub-environment.
+    """
+
+    def __init__(
+        self,
+        env_fn: Callable[[], AppEnvironment],
+        slots: int = 2,
+        context: str = "spawn",
+    ):
+        """Starts a worker process running the environment created by env_fn.
+
+        Args:
+            env_fn: Function that creates the environment in the worker process.
+            slots: The number of observations in the shared memory ring buffer.
+            context: The multiprocessing start method used to start the worker.
+        """
+        ctx = multiprocessing.get_context(context)
+        self._pipe, worker_pipe = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker,
+            args=(CloudpickleWrapper(env_fn), worker_pipe, slots),
+            daemon=True,
+        )
+        self._process.start()
+        worker_pipe.close()
+
+        (
+            self.observation_space,
+            self.action_space,
+            self.action_mask,
+            self.metadata,
+        ) = self._receive()
+        self.render_mode = None
+        self._ring = ObservationRing(
+            self.observation_space.shape, self.observation_space.dtype, slots
+        )
+        self._pipe.send(self._ring.name)
+        self._step_pending = False
+
+    def _receive(self) -> Any:
+        status, value = self._pipe.recv()
+        if status == "error":
+            raise value
+        return value
+
+    def reset(
+        self, seed: int | None = None, options: dict[str, Any] = {}
+    ) -> tuple[GymObservation, GymInfo]:
+        if self._step_pending:
+            self.step_wait()
+        self._pipe.send(("reset", (seed, options)))
+        slot, _, _, _, info = self._receive()
+        return self._ring.slot(slot), info
+
+    def step(
+        self, action: GymAction
+    ) -> tuple[GymObservation, float, bool, bool, GymInfo]:
+        self.step_async(action)
+        return self.step_wait()
+
+    def step_async(self, action: GymAction) -> None:
+        """Sends the action to the worker without waiting for the step to finish.
+
+        Raises:
+            AlreadyPendingCallError: If the previous step_async() hasn't been waited
+                                     on yet.
+        """
+        if self._step_pending:
+            raise AlreadyPendingCallError(
+                "Calling step_async while waiting for a pending call to complete.",
+                "step",
+            )
+        self._pipe.send(("step", (action,)))
+        self._step_pending = True
+
+    def step_wait(self) -> tuple[GymObservation, float, bool, bool, GymInfo]:
+        """Waits for the worker's step and returns its step tuple.
+
+        Raises:
+            NoAsyncCallError: If there's no step started by step_async() to wait on.
+        """
+        if not self._step_pending:
+            raise NoAsyncCallError(
+                "Calling step_wait without any prior call to step_async.", "step"
+            )
+        self._step_pending = False
+        slot, reward, terminated, truncated, info = self._receive()
+        return self._ring.slot(slot), reward, terminated, truncated, info
+
+    def render(self) -> None | np.ndarray:
+        pass
+
+    def close(self) -> None:
+        if self._process.is_alive():
+            if self._step_pending:
+                self.step_wait()
+            self._pipe.send(("close", None))
+            self._receive()
+        self._process.join()
+        self._pipe.close()
+        self._ring.close()
+
+    @property
+    def unwrapped_observation_space(self) -> gym.Space:
+        return self.observation_space
@@ -0,0 +1,85 @@
+import functools
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.fake_app import FakeApp, fake_app_bounce_config
+from bounce_rl.core.fake_app_session import FakeAppSession
+from bounce_rl.core.process_environment import ObservationRing, ProcessAppEnvironment
+from bounce_rl.core.vector_app_environment import VectorAppEnvironment
+
+
+def make_env(config_path: str) -> AppEnvironment:
+    return AppEnvironment(
+        FakeApp, (640, 480), session_cls=FakeAppSession, config_path=config_path
+    )
+
+
+def make_failing_env() -> AppEnvironment:
+    raise RuntimeError("env creation failed")
+
+
+class TestObservationRing(unittest.TestCase):
+    def test_attached_ring_sees_writes(self):
+        ring = ObservationRing((2, 3), np.uint8, slots=2)
+        attached = ObservationRing((2, 3), np.uint8, slots=2, name=ring.name)
+
+        attached.slot(1)[:] = 7
+
+        np.testing.assert_array_equal(ring.slot(1), np.full((2, 3), 7))
+        np.testing.assert_array_equal(ring.slot(0), np.zeros((2, 3)))
+        attached.close()
+        ring.close()
+
+
+class TestProcessAppEnvironment(unittest.TestCase):
+    def setUp(self):
+        conf = fake_app_bounce_config()
+        conf["apps"][0]["step_length"] = "0.01"
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(conf, self._config_file)
+        self._config_file.flush()
+        self.env_fn = functools.partial(make_env, self._config_file.name)
+
+    def tearDown(self):
+        self._config_file.close()
+
+    def test_step_returns_shared_memory_view(self):
+        env = ProcessAppEnvironment(self.env_fn)
+        obs, _ = env.reset()
+        self.assertEqual(obs.shape, (3, 480, 640))
+
+        obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+
+        self.assertEqual(obs.shape, env.observation_space.shape)
+        self.assertFalse(obs.flags.owndata)
+        self.assertEqual((reward, terminated, truncated, info), (0.0, False, False, {}))
+        env.close()
+
+    def test_consecutive_observations_use_different_slots(self):
+        env = ProcessAppEnvironment(self.env_fn, slots=2)
+        first, _ = env.reset()
+        second, *_ = env.step(env.action_space.sample())
+        self.assertFalse(np.shares_memory(first, second))
+        env.close()
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaisesRegex(RuntimeError, "env creation failed"):
+            ProcessAppEnvironment(make_failing_env)
+
+    def test_vector_environment_of_process_environments(self):
+        envs = VectorAppEnvironment(
+            [functools.partial(ProcessAppEnvironment, self.env_fn)] * 2
+        )
+        envs.reset()
+        obs, rewards, *_ = envs.step(envs.action_space.sample())
+        self.assertEqual(obs.shape, (2, 3, 480, 640))
+        self.assertEqual(rewards.shape, (2,))
+        envs.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# wait_for_screen() waits for an app to show a screen, e.g. its main menu after it
+# launches, by polling the desktop's frames against a screen matcher.
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import libtimecontrol
+import numpy as np
+from bounce_desktop import Desktop
+
+# Only every _SAMPLE_STRIDE-th row and column of frames are compared to detect
+# whether the screen changed between polls.
+_SAMPLE_STRIDE = 8
+
+
+@dataclass
+class ScreenWait:
+    """The result of a wait_for_screen() call.
+
+    Attributes:
+        matched: Whether the screen was shown before the timeout.
+        waited: How long the wait took in seconds.
+        frames: How many frames were polled.
+        checks: How many of the polled frames were checked with the matcher.
+                Frames identical to the previous one aren't checked again.
+    """
+
+    matched: bool
+    waited: float
+    frames: int
+    checks: int
+
+
+def wait_for_screen(
+    desktop: Desktop,
+    matcher: Callable[[np.ndarray], bool],
+    timeout: float,
+    min_interval: float = 0.01,
+    max_interval: float = 0.25,
+    time_controller: libtimecontrol.TimeController | None = None,
+    speedup: float | None = None,
+    restore_speedup: float = 1.0,
+) -> ScreenWait:
+    """Waits until the desktop's frame matches a screen, or the timeout passes.
+
+    Polls frames starting every min_interval seconds. The interval backs off
+    towards max_interval while the screen stays the same and drops back to
+    min_interval when it changes, so that a wait ends soon after the screen
+    appears without busy polling a static loading screen.
+
+    Args:
+        desktop: The desktop to poll frames from.
+        matcher: Returns whether a frame shows the screen being waited for, e.g.
+                 FactorioMatcher.check_if_on_main_menu.
+        timeout: How long to wait in seconds before giving up.
+        min_interval: The shortest time between polls in seconds.
+        max_interval: The longest time between polls in seconds.
+        time_controller: The app's time controller, to speed up the app while
+                         waiting, e.g. to fast forward through loading.
+        speedup: The speedup to run the app at while waiting. Requires a
+                 time_controller.
+        restore_speedup: The speedup to set once the wait is over.
+
+    Returns:
+        The wait's result. Callers decide whether a timeout is an error.
+    """
+    if speedup is not None:
+        if time_controller is None:
+            raise ValueError("wait_for_screen() needs a time_controller to speedup.")
+        time_controller.set_speedup(speedup)
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    interval = min_interval
+    previous_sample = None
+    frames = 0
+    checks = 0
+    matched = False
+    try:
+        while True:
+            frame = desktop.get_frame()
+            frames += 1
+            sample = frame_sample(frame)
+            if sample != previous_sample:
+                previous_sample = sample
+                interval = min_interval
+                checks += 1
+                if matcher(frame):
+                    matched = True
+                    break
+            else:
+                interval = min(interval * 2, max_interval)
+
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            time.sleep(min(interval, deadline - now))
+    finally:
+        if speedup is not None:
+            time_controller.set_speedup(restore_speedup)
+
+    return ScreenWait(matched, time.perf_counter() - start, frames, checks)
+
+
+def frame_sample(frame: np.ndarray) -> bytes:
+    """Returns a strided sample of the frame, for detecting screen changes."""
+    return frame[::_SAMPLE_STRIDE, ::_SAMPLE_STRIDE].tobytes()
+
+
+def wait_for_change(
+    desktop: Desktop,
+    reference: bytes,
+    timeout: float,
+    settle: float = 0.05,
+    interval: float = 0.01,
+) -> ScreenWait:
+    """Waits until the desktop's screen changes from a reference frame and then
+    stops changing, or the timeout passes.
+
+    Args:
+        desktop: The desktop to poll frames from.
+        reference: A frame_sample() of the frame to wait for a change from.
+        timeout: How long to wait in seconds before giving up.
+        settle: How long in seconds the screen must stay the same after changing,
+                e.g. to let a menu's transition finish.
+        interval: The time between polls in seconds.
+
+    Returns:
+        The wait's result, which matched if the screen changed and settled.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    previous_sample = reference
+    changed_at = None
+    frames = 0
+    while True:
+        sample = frame_sample(desktop.get_frame())
+        frames += 1
+        now = time.perf_counter()
+        if sample != previous_sample:
+            previous_sample = sample
+            changed_at = now
+        elif changed_at is not None and now - changed_at >= settle:
+            return ScreenWait(True, now - start, frames, frames)
+        if now >= deadline:
+            return ScreenWait(False, now - start, frames, frames)
+        time.sleep(min(interval, deadline - now))
@@ -0,0 +1,103 @@
+import time
+import unittest
+
+import numpy as np
+
+from bounce_rl.core.fake_desktop import FakeDesktop
+from bounce_rl.core.screen_wait import frame_sample, wait_for_change, wait_for_screen
+
+
+class FakeTimeController:
+    def __init__(self):
+        self.speedups = []
+
+    def set_speedup(self, speedup: float) -> None:
+        self.speedups.append(speedup)
+
+
+class ScreenChangingDesktop(FakeDesktop):
+    """A FakeDesktop whose frames turn white once `shown_at` has passed."""
+
+    def __init__(self, shown_at: float):
+        super().__init__((64, 48))
+        self.shown_at = shown_at
+
+    def get_frame(self) -> np.ndarray:
+        frame = super().get_frame()
+        if time.perf_counter() >= self.shown_at:
+            frame[:] = 255
+        return frame
+
+
+def is_white(frame: np.ndarray) -> bool:
+    return bool(frame.min() == 255)
+
+
+class TestWaitForScreen(unittest.TestCase):
+    def test_returns_soon_after_screen_is_shown(self):
+        desktop = ScreenChangingDesktop(time.perf_counter() + 0.1)
+
+        result = wait_for_screen(desktop, is_white, timeout=2, max_interval=0.05)
+
+        self.assertTrue(result.matched)
+        self.assertGreaterEqual(result.waited, 0.1)
+        self.assertLess(result.waited, 0.2)
+
+    def test_unchanged_frames_are_not_rechecked(self):
+        checked = []
+
+        def matcher(frame):
+            checked.append(frame)
+            return False
+
+        result = wait_for_screen(FakeDesktop(), matcher, timeout=0.1)
+
+        self.assertFalse(result.matched)
+        self.assertGreaterEqual(result.waited, 0.1)
+        self.assertEqual(result.checks, 1)
+        self.assertEqual(len(checked), 1)
+        self.assertGreater(result.frames, 1)
+
+    def test_speeds_up_app_while_waiting(self):
+        controller = FakeTimeController()
+        desktop = ScreenChangingDesktop(time.perf_counter())
+
+        wait_for_screen(
+            desktop,
+            is_white,
+            timeout=1,
+            time_controller=controller,
+            speedup=4.0,
+            restore_speedup=0.5,
+        )
+
+        self.assertEqual(controller.speedups, [4.0, 0.5])
+
+    def test_speedup_requires_time_controller(self):
+        with self.assertRaises(ValueError):
+            wait_for_screen(FakeDesktop(), is_white, timeout=1, speedup=4.0)
+
+
+class TestWaitForChange(unittest.TestCase):
+    def test_returns_once_changed_screen_settles(self):
+        desktop = ScreenChangingDesktop(time.perf_counter() + 0.05)
+        reference = frame_sample(desktop.get_frame())
+
+        result = wait_for_change(desktop, reference, timeout=2, settle=0.05)
+
+        self.assertTrue(result.matched)
+        self.assertGreaterEqual(result.waited, 0.1)
+        self.assertLess(result.waited, 0.3)
+
+    def test_times_out_on_static_screen(self):
+        desktop = FakeDesktop()
+        reference = frame_sample(desktop.get_frame())
+
+        result = wait_for_change(desktop, reference, timeout=0.1)
+
+        self.assertFalse(result.matched)
+        self.assertGreaterEqual(result.waited, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# SessionPool launches app sessions in the background so that AppEnvironment.reset()
+# can hand out an already running app instead of waiting for one to start.
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bounce_rl.core.app import App
+from bounce_rl.core.app_environment import LaunchedApp, launch_app
+from bounce_rl.core.app_session import AppSession
+from bounce_rl.core.timing import PhaseTimers
+
+
+class SessionPool:
+    """A pool of pre-launched apps.
+
+    A background thread keeps up to `depth` apps created, installed, started and
+    begun. Environments take launched apps from the pool with acquire() and give back
+    the apps they're done with using retire(), which tears them down in the
+    background.
+    """
+
+    def __init__(
+        self,
+        app_cls: type[App],
+        resolution: tuple[int, int],
+        depth: int = 1,
+        session_cls: type = AppSession,
+        config_path: str | None = None,
+        visible: bool = False,
+    ):
+        """Creates a SessionPool and starts filling it.
+
+        Args:
+            app_cls: App subclass to launch
+            resolution: Desktop resolution as (width, height) tuple
+            depth: The number of launched apps to keep ready.
+            session_cls: An optional alternative AppSession implementation.
+            config_path: An optional alternative bounce config path.
+            visible: Whether to also render the pool's desktops on the system's
+                     current desktop.
+        """
+        if depth < 1:
+            raise ValueError(f"SessionPool depth must be at least 1, got {depth}.")
+
+        self.app_cls = app_cls
+        self.resolution = resolution
+        self.session_cls = session_cls
+        self.config_path = config_path
+        self.visible = visible
+        # Records how long each phase of the pool's launches takes.
+        self.timers = PhaseTimers()
+
+        # Holds launched apps, or the exception raised while launching one.
+        self._ready: queue.Queue[LaunchedApp | Exception] = queue.Queue()
+        # Counts the apps that may be launched without exceeding the pool's depth.
+        self._free_slots = threading.Semaphore(depth)
+        self._closed = threading.Event()
+        self._retire_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="SessionPoolRetire"
+        )
+        self._filler = threading.Thread(
+            target=self._fill, name="SessionPoolFill", daemon=True
+        )
+        self._filler.start()
+
+    def _fill(self) -> None:
+        while True:
+            self._free_slots.acquire()
+            if self._closed.is_set():
+                return
+            try:
+                launched = launch_app(
+                    self.app_cls,
+                    self.resolution,
+                    self.session_cls,
+                    self.config_path,
+                    visible=self.visible,
+                    timers=self.timers,
+                )
+            except Exception as e:
+                self._ready.put(e)
+            else:
+                self._ready.put(launched)
+
+    def acquire(self, timeout: float | None = None) -> LaunchedApp:
+        """Takes a launched app from the pool, waiting for one if none are ready.
+
+        Raises:
+            queue.Empty: If no app was ready within `timeout` seconds.
+            Exception: Any exception raised while launching the app.
+        """
+        launched = self._ready.get(timeout=timeout)
+        self._free_slots.release()
+        if isinstance(launched, Exception):
+            raise launched
+        return launched
+
+    def retire(self, launched: LaunchedApp) -> None:
+        """Tears down a launched app in the background."""
+        self._retire_executor.submit(launched.session.close)
+
+    def close(self) -> None:
+        """Stops launching apps and tears down the pool's ready apps."""
+        self._closed.set()
+        # Wake the filler thread in case it's waiting on a free slot.
+        self._free_slots.release()
+        self._filler.join()
+        while not self._ready.empty():
+            launched = self._ready.get_nowait()
+            if isinstance(launched, LaunchedApp):
+                launched.session.close()
+        self._retire_executor.shutdown(wait=True)
@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+
+import yaml
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.fake_app import FakeApp, WarmResetFakeApp, fake_app_bounce_config
+from bounce_rl.core.fake_app_session import FakeAppSession
+from bounce_rl.core.session_pool import SessionPool
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(fake_app_bounce_config(), self._config_file)
+        self._config_file.flush()
+        self.pool = SessionPool(
+            FakeApp,
+            (640, 480),
+            depth=2,
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+        )
+
+    def tearDown(self):
+        self.pool.close()
+        self._config_file.close()
+
+    def test_acquire_returns_launched_app(self):
+        launched = self.pool.acquire(timeout=5)
+        self.assertIsInstance(launched.app, FakeApp)
+        self.assertIsInstance(launched.session, FakeAppSession)
+        self.assertIsNotNone(launched.session.process())
+
+    def test_acquire_returns_distinct_sessions(self):
+        first = self.pool.acquire(timeout=5)
+        second = self.pool.acquire(timeout=5)
+        self.assertIsNot(first.session, second.session)
+
+    def test_retire_closes_session(self):
+        launched = self.pool.acquire(timeout=5)
+        self.pool.retire(launched)
+        self.pool.close()
+        self.assertIsNone(launched.session.process())
+
+    def test_environment_reset_takes_session_from_pool(self):
+        env = AppEnvironment(
+            FakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+            session_pool=self.pool,
+        )
+        session = env.session
+        env.reset()
+        self.assertIsNot(env.session, session)
+
+    def test_environment_warm_resets_before_taking_session_from_pool(self):
+        pool = SessionPool(
+            WarmResetFakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+        )
+        self.addCleanup(pool.close)
+        env = AppEnvironment(
+            WarmResetFakeApp,
+            (640, 480),
+            session_cls=FakeAppSession,
+            config_path=self._config_file.name,
+            session_pool=pool,
+        )
+        session = env.session
+        env.reset()
+        self.assertIs(env.session, session)
+
+    def test_environment_rejects_pool_for_other_resolution(self):
+        with self.assertRaises(ValueError):
+            AppEnvironment(
+                FakeApp,
+                (1000, 600),
+                session_cls=FakeAppSession,
+                config_path=self._config_file.name,
+                session_pool=self.pool,
+            )
+
+    def test_environment_rejects_pool_with_other_visibility(self):
+        with self.assertRaisesRegex(ValueError, "visible"):
+            AppEnvironment(
+                FakeApp,
+                (640, 480),
+                session_cls=FakeAppSession,
+                config_path=self._config_file.name,
+                render_mode="human",
+                session_pool=self.pool,
+            )
+
+    def test_environment_rejects_pool_with_other_config(self):
+        with self.assertRaisesRegex(ValueError, "config_path"):
+            AppEnvironment(
+                FakeApp,
+                (640, 480),
+                session_cls=FakeAppSession,
+                session_pool=self.pool,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
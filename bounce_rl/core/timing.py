@@ -0,0 +1,130 @@
+# PhaseTimers record how long each phase of an environment's steps and launches take,
+# cheaply enough to leave on in production.
+
+import threading
+import time
+
+# Histogram bucket i holds durations d with d.bit_length() == i, i.e. durations in
+# [2^(i-1), 2^i) nanoseconds. 64 buckets cover durations up to ~292 years.
+_NUM_BUCKETS = 64
+
+
+class Histogram:
+    """A histogram of durations with power-of-two nanosecond buckets.
+
+    Recording a duration is O(1) and doesn't allocate. Percentiles are estimated to
+    within a factor of two, which is enough to spot regressions and slow instances.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * _NUM_BUCKETS
+
+    def record(self, duration_ns: int) -> None:
+        if self.count == 0 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        self.buckets[min(duration_ns.bit_length(), _NUM_BUCKETS - 1)] += 1
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile_ns(self, q: float) -> int:
+        """Estimates the q-th percentile duration, for q in [0, 100].
+
+        Returns the upper bound of the bucket the percentile falls in, clamped to the
+        recorded min and max."""
+        if self.count == 0:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return max(self.min_ns, min((1 << i) - 1, self.max_ns))
+        return self.max_ns
+
+
+class _Phase:
+    """Context manager that records the duration of its block to a PhaseTimers."""
+
+    __slots__ = ("_timers", "_name", "_start_ns")
+
+    def __init__(self, timers: "PhaseTimers", name: str):
+        self._timers = timers
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start_ns = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        self._timers.record(self._name, time.perf_counter_ns() - self._start_ns)
+
+
+class PhaseTimers:
+    """Duration histograms and counters for named phases.
+
+    Thread safe, so that e.g. a SessionPool's filler thread can record its launches
+    while another thread reads the pool's summary().
+
+    Usage:
+        timers = PhaseTimers()
+        with timers.phase("get_frame"):
+            frame = desktop.get_frame()
+        timers.count("steps")
+        print(timers.summary())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        # The most recent duration of each phase in seconds.
+        self.last: dict[str, float] = {}
+
+    def phase(self, name: str) -> _Phase:
+        """Returns a context manager that times its block as the named phase."""
+        return _Phase(self, name)
+
+    def record(self, name: str, duration_ns: int) -> None:
+        """Records a duration for the named phase."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(duration_ns)
+            self.last[name] = duration_ns / 1e9
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Adds n to the named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Returns each phase's count and its mean, p50, p99 and max durations in
+        milliseconds."""
+        with self._lock:
+            return {
+                name: {
+                    "count": h.count,
+                    "mean_ms": h.mean_ns / 1e6,
+                    "p50_ms": h.percentile_ns(50) / 1e6,
+                    "p99_ms": h.percentile_ns(99) / 1e6,
+                    "max_ms": h.max_ns / 1e6,
+                }
+                for name, h in self.histograms.items()
+            }
+
+    def clear(self) -> None:
+        """Drops all recorded durations and counts."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.last.clear()
@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from bounce_rl.core.timing import Histogram, PhaseTimers
+
+
+class TestHistogram(unittest.TestCase):
+    def test_record_tracks_count_total_min_and_max(self):
+        h = Histogram()
+        for d in (100, 300, 200):
+            h.record(d)
+
+        self.assertEqual(h.count, 3)
+        self.assertEqual(h.total_ns, 600)
+        self.assertEqual(h.min_ns, 100)
+        self.assertEqual(h.max_ns, 300)
+        self.assertEqual(h.mean_ns, 200)
+
+    def test_percentile_is_within_a_factor_of_two(self):
+        h = Histogram()
+        for d in range(1, 1001):
+            h.record(d * 1000)
+
+        p50 = h.percentile_ns(50)
+        self.assertGreaterEqual(p50, 500_000)
+        self.assertLess(p50, 1_000_000)
+        self.assertEqual(h.percentile_ns(100), 1_000_000)
+
+    def test_empty_histogram_percentile_is_zero(self):
+        self.assertEqual(Histogram().percentile_ns(50), 0)
+
+
+class TestPhaseTimers(unittest.TestCase):
+    def test_phase_records_duration(self):
+        timers = PhaseTimers()
+        with timers.phase("sleep"):
+            time.sleep(0.01)
+
+        self.assertEqual(timers.histograms["sleep"].count, 1)
+        self.assertGreaterEqual(timers.last["sleep"], 0.01)
+        self.assertEqual(timers.summary()["sleep"]["count"], 1)
+
+    def test_count_increments_counter(self):
+        timers = PhaseTimers()
+        timers.count("steps")
+        timers.count("steps", 2)
+        self.assertEqual(timers.counters, {"steps": 3})
+
+    def test_clear_drops_everything(self):
+        timers = PhaseTimers()
+        timers.record("a", 5)
+        timers.count("b")
+        timers.clear()
+        self.assertEqual((timers.histograms, timers.counters, timers.last), ({}, {}, {}))
+
+    def test_summary_while_another_thread_records(self):
+        timers = PhaseTimers()
+
+        def record_new_phases():
+            for i in range(2000):
+                timers.record(f"phase_{i}", 1)
+
+        recorder = threading.Thread(target=record_new_phases)
+        recorder.start()
+        while recorder.is_alive():
+            timers.summary()
+        recorder.join()
+
+        self.assertEqual(len(timers.summary()), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+# VectorAppEnvironment steps several AppEnvironments at once, overlapping their step
+# windows so that N environments take roughly as long to step as one.
+
+import contextlib
+from typing import Any, Callable, Sequence
+
+import numpy as np
+from gymnasium.error import AlreadyPendingCallError, NoAsyncCallError
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space, create_empty_array, iterate
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.gym_types import GymInfo
+from bounce_rl.input import gym_input
+
+
+class VectorAppEnvironment(VectorEnv):
+    """A Gymnasium VectorEnv over N AppEnvironments.
+
+    step() sends every environment its inputs and starts all of their run windows
+    with AppEnvironment.step_async() before waiting on any of them, so the
+    environments' windows overlap. Uses next-step autoreset, like Gymnasium's own
+    vector environments.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self, env_fns: Sequence[Callable[[], AppEnvironment]], copy: bool = True
+    ):
+        """Creates a VectorAppEnvironment.
+
+        Args:
+            env_fns: Functions that each create one of the sub-environments, e.g.
+                     `lambda: AppEnvironment(FactorioApp, (1000, 600))`.
+            copy: Whether reset() and step() return a copy of the batched
+                  observations. If False, they return a buffer that's overwritten
+                  by the next step.
+        """
+        super().__init__()
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+        self.render_mode = None
+
+        self.single_action_space = self.envs[0].action_space
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+        self.single_observation_space = self.envs[0].observation_space
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        self.copy = copy
+
+        self._observations = create_empty_array(
+            self.single_observation_space, n=self.num_envs, fn=np.zeros
+        )
+        self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
+        self._terminations = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._truncations = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._autoreset_envs = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._step_pending = False
+
+    def reset(
+        self,
+        *,
+        seed: int | list[int | None] | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> tuple[np.ndarray, GymInfo]:
+        if seed is None or isinstance(seed, int):
+            seed = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(
+                f"Expected {self.num_envs} seeds, but got {len(seed)} seeds."
+            )
+
+        if self._step_pending:
+            self.step_wait()
+        self._terminations[:] = False
+        self._truncations[:] = False
+        self._autoreset_envs[:] = False
+
+        infos = {}
+        for i, (env, env_seed) in enumerate(zip(self.envs, seed)):
+            obs, env_info = env.reset(seed=env_seed, options=options or {})
+            self._observations[i] = obs
+            infos = self._add_info(infos, env_info, i)
+        return self._batched_observations(), infos
+
+    def step(
+        self, actions: dict | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, GymInfo]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions: dict | np.ndarray) -> None:
+        """Starts a step in every sub-environment without waiting for them to finish.
+
+        Takes either batched actions from the action space or an array of
+        num_envs action records from gym_input.action_buffer(num_envs), which are
+        passed to the sub-environments without copying.
+
+        Raises:
+            AlreadyPendingCallError: If the previous step_async() hasn't been waited
+                                     on yet.
+        """
+        if self._step_pending:
+            raise AlreadyPendingCallError(
+                "Calling step_async while waiting for a pending call to complete.",
+                "step",
+            )
+        if gym_input.is_action_record(actions):
+            env_actions = actions
+        else:
+            env_actions = iterate(self.action_space, actions)
+        started = []
+        try:
+            for i, action in enumerate(env_actions):
+                if not self._autoreset_envs[i]:
+                    self.envs[i].step_async(action)
+                    started.append(self.envs[i])
+        except BaseException:
+            # Wait out the sub-environments that already started stepping, so that
+            # none of them is left with a step that the next step_async() would
+            # collide with.
+            for env in started:
+                with contextlib.suppress(Exception):
+                    env.step_wait()
+            raise
+        self._step_pending = True
+
+    def step_wait(
+        self,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, GymInfo]:
+        """Waits for the step started by step_async() and returns the batched results.
+
+        Raises:
+            NoAsyncCallError: If there's no step started by step_async() to wait on.
+        """
+        if not self._step_pending:
+            raise NoAsyncCallError(
+                "Calling step_wait without any prior call to step_async.", "step"
+            )
+        self._step_pending = False
+
+        infos = {}
+        for i, env in enumerate(self.envs):
+            if self._autoreset_envs[i]:
+                self._observations[i], env_info = env.reset()
+                self._rewards[i] = 0.0
+                self._terminations[i] = False
+                self._truncations[i] = False
+            else:
+                (
+                    self._observations[i],
+                    self._rewards[i],
+                    self._terminations[i],
+                    self._truncations[i],
+                    env_info,
+                ) = env.step_wait()
+            infos = self._add_info(infos, env_info, i)
+        self._autoreset_envs = np.logical_or(self._terminations, self._truncations)
+
+        return (
+            self._batched_observations(),
+            np.copy(self._rewards),
+            np.copy(self._terminations),
+            np.copy(self._truncations),
+            infos,
+        )
+
+    @property
+    def action_mask(self) -> np.ndarray:
+        """The sub-environments' action masks (see AppEnvironment.action_mask),
+        stacked into an (N, len(ACTION_KEYCODES)) array."""
+        return np.stack([env.action_mask for env in self.envs])
+
+    def _batched_observations(self) -> np.ndarray:
+        return np.copy(self._observations) if self.copy else self._observations
+
+    def close_extras(self, **kwargs: Any) -> None:
+        for env in self.envs:
+            env.close()
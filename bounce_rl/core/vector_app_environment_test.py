@@ -0,0 +1,107 @@
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import yaml
+
+from bounce_rl.core.app_environment import AppEnvironment
+from bounce_rl.core.fake_app import FakeApp, fake_app_bounce_config
+from bounce_rl.core.fake_app_session import FakeAppSession
+from bounce_rl.core.vector_app_environment import VectorAppEnvironment
+from bounce_rl.input.gym_input import ACTION_KEYCODES, action_buffer
+from bounce_rl.input.input_types import KeyActionKind
+from bounce_rl.input.keys import KEY_A
+
+NUM_ENVS = 4
+STEP_LENGTH = 0.2
+
+
+class TestVectorAppEnvironment(unittest.TestCase):
+    def setUp(self):
+        conf = fake_app_bounce_config()
+        conf["apps"][0]["step_length"] = str(STEP_LENGTH)
+        self._config_file = tempfile.NamedTemporaryFile(mode="w")
+        yaml.dump(conf, self._config_file)
+        self._config_file.flush()
+
+        def make_env():
+            return AppEnvironment(
+                FakeApp,
+                (640, 480),
+                session_cls=FakeAppSession,
+                config_path=self._config_file.name,
+            )
+
+        self.envs = VectorAppEnvironment([make_env] * NUM_ENVS)
+        self.envs.reset()
+
+    def tearDown(self):
+        self.envs.close()
+        self._config_file.close()
+
+    def test_step_returns_batched_results(self):
+        obs, rewards, terminated, truncated, info = self.envs.step(
+            self.envs.action_space.sample()
+        )
+
+        self.assertEqual(obs.shape, (NUM_ENVS, 3, 480, 640))
+        self.assertEqual(rewards.shape, (NUM_ENVS,))
+        self.assertEqual(terminated.shape, (NUM_ENVS,))
+        self.assertEqual(truncated.shape, (NUM_ENVS,))
+
+    def test_step_windows_overlap(self):
+        start = time.perf_counter()
+        self.envs.step(self.envs.action_space.sample())
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 2 * STEP_LENGTH)
+
+    def test_step_sends_each_env_its_own_action(self):
+        actions = self.envs.action_space.sample()
+        actions["keys"][:] = 0
+        actions["mouse_action"]["action"][:] = 0
+        actions["scroll"][:] = 0
+        actions["keys"][1, 0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_DOWN]
+        for env in self.envs.envs:
+            env.session.desktop().events.clear()
+
+        self.envs.step(actions)
+
+        self.assertEqual(
+            [env.session.desktop().events for env in self.envs.envs],
+            [[], [("keycode_down", KEY_A)], [], []],
+        )
+
+    def test_step_takes_action_records(self):
+        actions = action_buffer(NUM_ENVS)
+        actions["keys"][2, 0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_DOWN]
+        for env in self.envs.envs:
+            env.session.desktop().events.clear()
+
+        self.envs.step(actions)
+
+        self.assertEqual(
+            [env.session.desktop().events for env in self.envs.envs],
+            [[], [], [("keycode_down", KEY_A)], []],
+        )
+
+    def test_failed_step_async_leaves_no_env_pending(self):
+        failing_env = self.envs.envs[2]
+
+        def fail(action):
+            raise RuntimeError("step failed")
+
+        failing_env.step_async = fail
+        with self.assertRaises(RuntimeError):
+            self.envs.step_async(self.envs.action_space.sample())
+        del failing_env.step_async
+
+        obs, rewards, terminated, truncated, info = self.envs.step(
+            self.envs.action_space.sample()
+        )
+        self.assertEqual(rewards.shape, (NUM_ENVS,))
+
+
+if __name__ == "__main__":
+    unittest.main()
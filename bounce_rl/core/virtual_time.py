@@ -0,0 +1,86 @@
+# VirtualTimeStepper runs an app for a fixed amount of game time per step and freezes
+# it between steps, using libtimecontrol to control the app's clock.
+
+import time
+from typing import Callable
+
+import libtimecontrol
+
+# How long before a deadline to stop sleeping and start spinning. OS sleeps
+# regularly overshoot by up to around a millisecond.
+_SPIN_MARGIN = 0.002
+
+
+def sleep_until(deadline: float) -> None:
+    """Sleeps until time.perf_counter() reaches the deadline.
+
+    Sleeps for most of the wait and spins for the rest, which is much more precise
+    than a single time.sleep()."""
+    remaining = deadline - time.perf_counter()
+    if remaining > _SPIN_MARGIN:
+        time.sleep(remaining - _SPIN_MARGIN)
+    while time.perf_counter() < deadline:
+        pass
+
+
+class VirtualTimeStepper:
+    """Steps an app's game time in fixed increments.
+
+    Each step runs the app at `run_speed` for `step_length` seconds of game time and
+    then freezes it with a speedup of 0, so that time spent between steps doesn't
+    advance the game. The game time actually run is measured on every step, and any
+    over- or under-run is paid back on the next step, so that after N steps the
+    app has run for N * step_length seconds of game time up to one step's timing
+    jitter.
+    """
+
+    def __init__(
+        self,
+        time_controller: libtimecontrol.TimeController,
+        step_length: float,
+        run_speed: float,
+    ):
+        self._time_controller = time_controller
+        self._step_length = step_length
+        self._run_speed = run_speed
+
+        # Game time earlier steps ran short by. Negative when they overran.
+        self._game_time_owed = 0.0
+        self._step_game_time = 0.0
+        self._started_at: float | None = None
+        self.total_game_time = 0.0
+
+    def freeze(self) -> None:
+        """Stops the app's clock."""
+        self._time_controller.set_speedup(0.0)
+
+    def start(self) -> None:
+        """Starts the app's clock for a new step."""
+        self._step_game_time = max(0.0, self._step_length + self._game_time_owed)
+        self._time_controller.set_speedup(self._run_speed)
+        self._started_at = time.perf_counter()
+
+    def finish(self, during_step: Callable[[float, float], None]) -> float:
+        """Waits for the step started by start() to run its game time, then freezes
+        the app.
+
+        Args:
+            during_step: Called with the step's start time and deadline in
+                         time.perf_counter() seconds, e.g. to fire the step's
+                         scheduled input events. It should return by the deadline.
+
+        Returns:
+            The game time the app ran for during the step.
+        """
+        assert self._started_at is not None
+        deadline = self._started_at + self._step_game_time / self._run_speed
+        during_step(self._started_at, deadline)
+        sleep_until(deadline)
+        self.freeze()
+        stopped_at = time.perf_counter()
+
+        elapsed = (stopped_at - self._started_at) * self._run_speed
+        self._started_at = None
+        self._game_time_owed += self._step_length - elapsed
+        self.total_game_time += elapsed
+        return elapsed
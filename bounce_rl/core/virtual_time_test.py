@@ -0,0 +1,66 @@
+import time
+import unittest
+
+from bounce_rl.core.virtual_time import VirtualTimeStepper, sleep_until
+
+STEP_LENGTH = 0.05
+RUN_SPEED = 2.0
+
+
+class FakeTimeController:
+    def __init__(self):
+        self.speedups = []
+
+    def set_speedup(self, speedup: float) -> None:
+        self.speedups.append(speedup)
+
+
+class TestSleepUntil(unittest.TestCase):
+    def test_sleep_until_reaches_deadline(self):
+        deadline = time.perf_counter() + 0.01
+        sleep_until(deadline)
+        self.assertGreaterEqual(time.perf_counter(), deadline)
+
+
+class TestVirtualTimeStepper(unittest.TestCase):
+    def test_step_runs_then_freezes_app(self):
+        controller = FakeTimeController()
+        stepper = VirtualTimeStepper(controller, STEP_LENGTH, RUN_SPEED)
+
+        stepper.start()
+        stepper.finish(lambda start, deadline: None)
+
+        self.assertEqual(controller.speedups, [RUN_SPEED, 0.0])
+
+    def test_step_reports_game_time_run(self):
+        stepper = VirtualTimeStepper(FakeTimeController(), STEP_LENGTH, RUN_SPEED)
+
+        stepper.start()
+        elapsed = stepper.finish(lambda start, deadline: None)
+
+        self.assertAlmostEqual(elapsed, STEP_LENGTH, delta=0.005)
+
+    def test_time_between_steps_does_not_count_as_game_time(self):
+        stepper = VirtualTimeStepper(FakeTimeController(), STEP_LENGTH, RUN_SPEED)
+
+        for _ in range(3):
+            stepper.start()
+            stepper.finish(lambda start, deadline: None)
+            time.sleep(STEP_LENGTH)
+
+        self.assertAlmostEqual(stepper.total_game_time, 3 * STEP_LENGTH, delta=0.01)
+
+    def test_during_step_is_called_with_step_window(self):
+        calls = []
+        stepper = VirtualTimeStepper(FakeTimeController(), STEP_LENGTH, RUN_SPEED)
+
+        stepper.start()
+        stepper.finish(lambda start, deadline: calls.append((start, deadline)))
+
+        self.assertEqual(len(calls), 1)
+        start, deadline = calls[0]
+        self.assertAlmostEqual(deadline - start, STEP_LENGTH / RUN_SPEED)
+
+
+if __name__ == "__main__":
+    unittest.main()
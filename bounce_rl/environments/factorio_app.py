@@ -10,10 +10,16 @@ from bounce_desktop import Desktop
 from bounce_rl.core.app import App
 from bounce_rl.core.app_session import AppSession
 from bounce_rl.core.gym_types import GymInfo, GymObservation, GymStepTuple
+from bounce_rl.core.macro import MacroResult
 from bounce_rl.environments.factorio_macro import factorio_start_macro
 from bounce_rl.input.allowed_inputs import AllowKeys, DisallowKeys
 from bounce_rl.input.keys import KEY_ALT_L, KEY_CONTROL_L, KEY_ESCAPE, KEY_GRAVE, FnKeys
 
+# The keys agents are allowed to use in Factorio. See FactorioApp.allowed_input().
+FACTORIO_ALLOWED_INPUT = DisallowKeys(
+    [KEY_CONTROL_L, KEY_ESCAPE, KEY_GRAVE, KEY_ALT_L, FnKeys]
+).to_allow_list()
+
 
 class FactorioApp(App):
     def __init__(self):
@@ -21,6 +27,7 @@ class FactorioApp(App):
         self._state_exporter_verbose = False
 
         self._previous_state: dict[str, Any] = {}
+        self.start_macro: MacroResult | None = None
         self._state_reader = factorio_state_exporter.StateReader(
             self._state_exporter_port
         )
@@ -41,9 +48,7 @@ class FactorioApp(App):
                full screen mode.
         - All Fn Keys: Prevents opening debug menus/views.
         """
-        return DisallowKeys(
-            [KEY_CONTROL_L, KEY_ESCAPE, KEY_GRAVE, KEY_ALT_L, FnKeys]
-        ).to_allow_list()
+        return FACTORIO_ALLOWED_INPUT
 
     def finalize_step(self, obs: GymObservation) -> GymStepTuple:
         """Get app state at the end of a step and calculate the final step tuple's value."""
@@ -86,8 +91,20 @@ class FactorioApp(App):
         )
 
     def begin(self, desktop: Desktop) -> None:
-        """Runs the app's launch macro on the given desktop."""
-        factorio_start_macro(desktop)
+        """Runs the app's launch macro on the given desktop.
+
+        Records the macro's per-step timings in `self.start_macro`."""
+        self.start_macro = factorio_start_macro(desktop)
+
+    def soft_reset(self, session: AppSession) -> bool:
+        """Relaunches Factorio inside its existing session and starts a new game.
+
+        The session's desktop and installed files are reused, which skips the
+        expensive install and desktop start-up of a full reset."""
+        session.restart_process()
+        self._previous_state = {}
+        self.begin(session.desktop())
+        return True
 
     def supported_resolutions(self) -> list[tuple[int, int]]:
         """Returns a list of resolutions supported by this app."""
@@ -1,50 +1,41 @@
-import time
-
 from bounce_desktop import Desktop
 
-from bounce_rl.environments.factorio_matcher import FactorioMatcher
+from bounce_rl.core.macro import MacroResult, MacroStep, click, press, run_macro
+from bounce_rl.environments.factorio_matcher import shared_factorio_matcher
+from bounce_rl.input.input_types import KeyAction
 from bounce_rl.input.keys import KEY_0, KEY_ALT_L, KEY_BACKSPACE, KEY_TAB
 
+# Factorio misses clicks whose press and release land in the same frame.
+_EVENT_INTERVAL = 0.05
 
-def factorio_start_macro(d: Desktop):
-    """Note: Expects that factorio is running around version 2.0.66 and with a
-    resolution of 1000x600."""
 
-    matcher = FactorioMatcher()
-    for i in range(60):
-        print(f"Waiting {i}/60 seconds.")
-        f = d.get_frame()
-        if matcher.check_if_on_main_menu(f):
-            break
-        time.sleep(1)
+def factorio_start_macro(d: Desktop) -> MacroResult:
+    """Note: Expects that factorio is running around version 2.0.66 and with a
+    resolution of 1000x600.
 
-    f = d.get_frame()
-    if not matcher.check_if_on_main_menu(f):
-        raise ValueError("Failed to initialize factorio environment.")
+    Returns the macro's per-step timings, e.g. how long it took Factorio to reach
+    its main menu. Raises a MacroError naming the step that failed if Factorio
+    doesn't show a step's screen in time."""
 
-    def click_at(x: int, y: int):
-        return ((d.move_mouse_to, x, y), (d.mouse_press, 1), (d.mouse_release, 1))
+    matcher = shared_factorio_matcher()
 
-    def press_key(k):
-        return ((d.keycode_down, k), (d.keycode_up, k))
+    def in_game(frame) -> bool:
+        return matcher.classify_screen(frame)[0] is None
 
     macro = [
-        *click_at(500, 185),  # Click single player
-        *click_at(500, 265),  # Click new game
-        *click_at(100, 80),  # Click freeplay
-        *click_at(800, 570),  # Click Next
-        *click_at(650, 40),  # Click Seed
-        (d.keycode_down, KEY_BACKSPACE),  # Delete Seed string
-        (time.sleep, 1),
-        (d.keycode_up, KEY_BACKSPACE),
-        *press_key(KEY_0),  # Type "0" for the seed
-        *click_at(600, 570),  # Click play
-        (time.sleep, 1),
-        *press_key(KEY_TAB),  # Press tab to skip intro pan
-        *press_key(KEY_ALT_L),  # Press alt to enter alt item view mode
+        MacroStep("main menu", wait_for=matcher.check_if_on_main_menu, timeout=60),
+        click("single player", 500, 185, wait_for_change=True),
+        click("new game", 500, 265, wait_for_change=True),
+        click("freeplay", 100, 80, wait_for_change=True),
+        click("next", 800, 570, wait_for_change=True),
+        click("seed", 650, 40, wait_for_change=True),
+        # Hold backspace until key repeat has deleted the seed string.
+        MacroStep("delete seed", (KeyAction.down(KEY_BACKSPACE),), hold=1),
+        MacroStep("release backspace", (KeyAction.up(KEY_BACKSPACE),)),
+        press("type seed", KEY_0, wait_for_change=True),
+        click("play", 600, 570, wait_for_change=True, timeout=60),
+        MacroStep("game loaded", wait_for=in_game, timeout=60),
+        press("skip intro pan", KEY_TAB, wait_for_change=True),
+        press("alt mode", KEY_ALT_L, wait_for_change=True),
     ]
-
-    for action in macro:
-        fn, *args = action
-        fn(*args)
-        time.sleep(0.2)
+    return run_macro(d, macro, event_interval=_EVENT_INTERVAL)
@@ -1,25 +1,57 @@
 # Template match check that factorio is loaded
 
+import functools
 from pathlib import Path
 
 import numpy as np
-from PIL import Image
 
-from bounce_rl.template_matching import TemplateMatcher
+from bounce_rl.template_matching import (
+    TemplateBank,
+    TemplateMatcher,
+    load_compiled_templates,
+)
+
+TEMPLATE_DIR = Path(__file__).parent / "factorio" / "templates"
 
 
 class FactorioMatcher:
     """FactorioMatcher provides visual template matching for the Factorio app,
     allowing the environment to know when the app's made certain state transitions."""
 
-    def __init__(self):
-        template_dir = Path("bounce_rl/environments/factorio/templates/main_menu")
-        images = list(template_dir.glob("**/*.png"))
-        images = np.array([np.array(Image.open(i)) for i in images])
-        self._template_matcher = TemplateMatcher(images)
+    def __init__(self, cache_dir: str | Path | None = None):
+        """
+        Load Factorio's compiled templates, compiling them on first use.
+
+        Args:
+            cache_dir: An optional alternative compiled template cache location.
+        """
+        # Templates are RGBA screenshots, but desktop frames are RGB.
+        templates = load_compiled_templates(TEMPLATE_DIR, "RGB", cache_dir=cache_dir)
+        self._template_matcher = TemplateMatcher(templates["main_menu"])
+        # Every screen's templates are checked on each call, so compare a 4x
+        # downscaled sample of their pixels.
+        self._template_bank = TemplateBank(
+            load_compiled_templates(TEMPLATE_DIR, "RGB", 4, cache_dir=cache_dir)
+        )
 
     def check_if_on_main_menu(self, image: np.ndarray) -> bool:
         """Check whether the given image is on the game's main menu screen.
 
         Image should be (H, W, 3) and be scaled to the range [0, 255]."""
         return self._template_matcher.matches(image, threshold=0.82)
+
+    def classify_screen(self, image: np.ndarray) -> tuple[str | None, dict[str, float]]:
+        """Classify which of the known screens, e.g. "main_menu" or "loading", the
+        image shows, in a single pass over all of their templates.
+
+        Returns the screen's label, or None if no screen matches, and the scores of
+        every screen. Image should be (H, W, 3) and be scaled to the range [0, 255].
+        """
+        return self._template_bank.classify(image, threshold=0.82)
+
+
+@functools.cache
+def shared_factorio_matcher() -> FactorioMatcher:
+    """Returns a FactorioMatcher shared by the whole process, which is created on
+    first use."""
+    return FactorioMatcher()
@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 
 import numpy as np
@@ -7,12 +8,20 @@ from bounce_rl.environments.factorio_matcher import FactorioMatcher
 
 
 class TestFactorioLoaded(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._cache_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._cache_dir.cleanup()
+
     def test_correct_not_loaded(self):
         test_im = np.array(
             Image.open("bounce_rl/environments/factorio/templates/loading/loading.png")
         )
 
-        fl = FactorioMatcher()
+        fl = FactorioMatcher(self._cache_dir.name)
         self.assertEqual(fl.check_if_on_main_menu(test_im), False)
 
     def test_correct_loaded(self):
@@ -22,9 +31,20 @@ class TestFactorioLoaded(unittest.TestCase):
             )
         )
 
-        fl = FactorioMatcher()
+        fl = FactorioMatcher(self._cache_dir.name)
         self.assertEqual(fl.check_if_on_main_menu(test_im), True)
 
+    def test_classify_screen(self):
+        fl = FactorioMatcher(self._cache_dir.name)
+        for screen, path in (
+            ("loading", "loading/loading.png"),
+            ("main_menu", "main_menu/template_0_2_0_66.png"),
+        ):
+            test_im = np.array(
+                Image.open(f"bounce_rl/environments/factorio/templates/{path}")
+            )
+            self.assertEqual(fl.classify_screen(test_im)[0], screen)
+
 
 if __name__ == "__main__":
     unittest.main()
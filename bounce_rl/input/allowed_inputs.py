@@ -3,9 +3,13 @@ Allowed input mappings for the BounceRL input system.
 
 This module provides utilities for defining which keys are allowed in an
 environment using either allow lists or deny lists.
+
+Both are immutable, hashable values backed by a bitset over keycodes, so apps can
+define their input policies once at import time and share them across
+environments. They support O(1) membership tests and set algebra with each other.
 """
 
-from typing import Union
+from typing import Iterable, Union
 
 from bounce_rl.input.keys import AllKeys, Keycode
 
@@ -16,22 +20,60 @@ KeyClass = tuple[Keycode, ...]
 KeyOrKeyClass = Union[Keycode, KeyClass]
 
 
-class AllowKeys:
+def _expand(items: Iterable[KeyOrKeyClass]) -> tuple[Keycode, ...]:
+    """Expands key classes into their keys and removes duplicate keys, preserving
+    the order of first appearance."""
+    expanded = []
+    for item in items:
+        if isinstance(item, tuple):
+            expanded.extend(item)
+        else:
+            expanded.append(item)
+    return tuple(dict.fromkeys(expanded))
+
+
+def _to_bits(keycodes: Iterable[Keycode]) -> int:
+    bits = 0
+    for keycode in keycodes:
+        bits |= 1 << keycode
+    return bits
+
+
+class _Immutable:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class AllowKeys(_Immutable):
     """
     An allow list of keys.
 
     Can be constructed from a mix of individual keys and key classes.
     The keys() method returns the deduplicated, expanded list of allowed keys.
+
+    AllowKeys compare equal, and hash equal, to any AllowKeys or DisallowKeys that
+    allows the same set of keys. `a | b`, `a & b` and `a - b` return the union,
+    intersection and difference of the keys allowed by a and b, where either may
+    be a DisallowKeys, as an AllowKeys in a's key order followed by b's.
     """
 
-    def __init__(self, allowed: list[KeyOrKeyClass]):
+    __slots__ = ("_keycodes", "_bits")
+
+    def __init__(self, allowed: Iterable[KeyOrKeyClass]):
         """
         Create an allow list from a list of keys and/or key classes.
 
         Args:
             allowed: List of keys (int) and/or key classes (tuples of keys)
         """
-        self._allowed = allowed
+        keycodes = _expand(allowed)
+        object.__setattr__(self, "_keycodes", keycodes)
+        object.__setattr__(self, "_bits", _to_bits(keycodes))
 
     def keycodes(self) -> list[Keycode]:
         """
@@ -40,43 +82,73 @@ class AllowKeys:
         Returns:
             Deduplicated list of key values
         """
-        expanded = []
-        for item in self._allowed:
-            if isinstance(item, tuple):
-                # It's a key class - expand it
-                expanded.extend(item)
-            else:
-                # It's a single key
-                expanded.append(item)
-
-        # Deduplicate while preserving order
-        seen = set()
-        result = []
-        for key in expanded:
-            if key not in seen:
-                seen.add(key)
-                result.append(key)
-
-        return result
-
-
-class DisallowKeys:
+        return list(self._keycodes)
+
+    def to_allow_list(self) -> "AllowKeys":
+        """Returns this allow list, so AllowKeys and DisallowKeys are interchangeable."""
+        return self
+
+    def __contains__(self, keycode: Keycode) -> bool:
+        return keycode >= 0 and (self._bits >> keycode) & 1 == 1
+
+    def __len__(self) -> int:
+        return len(self._keycodes)
+
+    def __iter__(self):
+        return iter(self._keycodes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (AllowKeys, DisallowKeys)):
+            return self._bits == other.to_allow_list()._bits
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._bits)
+
+    def __repr__(self) -> str:
+        return f"AllowKeys({list(self._keycodes)})"
+
+    def __or__(self, other: "AllowKeys | DisallowKeys") -> "AllowKeys":
+        return AllowKeys(self._keycodes + other.to_allow_list()._keycodes)
+
+    def __and__(self, other: "AllowKeys | DisallowKeys") -> "AllowKeys":
+        bits = other.to_allow_list()._bits
+        return AllowKeys([k for k in self._keycodes if (bits >> k) & 1])
+
+    def __sub__(self, other: "AllowKeys | DisallowKeys") -> "AllowKeys":
+        bits = other.to_allow_list()._bits
+        return AllowKeys([k for k in self._keycodes if not (bits >> k) & 1])
+
+
+class DisallowKeys(_Immutable):
     """
     A deny list of keys.
 
     Can be constructed from a mix of individual keys and key classes.
     The to_allow_list() method converts this to an allow list containing
     all keys except the denied ones.
+
+    Membership tests, equality, hashing and set algebra treat a DisallowKeys as the
+    set of keys it allows, i.e. as its allow list.
     """
 
-    def __init__(self, disallowed: list[KeyOrKeyClass]):
+    __slots__ = ("_disallowed", "_allow_list")
+
+    def __init__(self, disallowed: Iterable[KeyOrKeyClass]):
         """
         Create a deny list from a list of keys and/or key classes.
 
         Args:
             disallowed: List of keys (int) and/or key classes (tuples of keys)
         """
-        self._disallowed = disallowed
+        disallowed = _expand(disallowed)
+        disallowed_bits = _to_bits(disallowed)
+        object.__setattr__(self, "_disallowed", disallowed)
+        object.__setattr__(
+            self,
+            "_allow_list",
+            AllowKeys([k for k in AllKeys if not (disallowed_bits >> k) & 1]),
+        )
 
     def to_allow_list(self) -> AllowKeys:
         """
@@ -87,18 +159,25 @@ class DisallowKeys:
         Returns:
             AllowKeys instance containing all non-denied keys
         """
-        # First, expand the disallow list
-        disallowed_expanded = []
-        for item in self._disallowed:
-            if isinstance(item, tuple):
-                disallowed_expanded.extend(item)
-            else:
-                disallowed_expanded.append(item)
+        return self._allow_list
+
+    def __contains__(self, keycode: Keycode) -> bool:
+        return keycode in self._allow_list
+
+    def __eq__(self, other) -> bool:
+        return self._allow_list == other
+
+    def __hash__(self) -> int:
+        return hash(self._allow_list)
+
+    def __repr__(self) -> str:
+        return f"DisallowKeys({list(self._disallowed)})"
 
-        # Convert to set for efficient lookup
-        disallowed_set = set(disallowed_expanded)
+    def __or__(self, other: "AllowKeys | DisallowKeys") -> AllowKeys:
+        return self._allow_list | other
 
-        # Build allowed list from all keys minus disallowed
-        allowed = [key for key in AllKeys if key not in disallowed_set]
+    def __and__(self, other: "AllowKeys | DisallowKeys") -> AllowKeys:
+        return self._allow_list & other
 
-        return AllowKeys(allowed)
+    def __sub__(self, other: "AllowKeys | DisallowKeys") -> AllowKeys:
+        return self._allow_list - other
@@ -16,6 +16,7 @@ from bounce_rl.input.keys import (
     FnKeys,
     KEY_F1,
     KEY_F12,
+    AllKeys,
 )
 
 
@@ -124,5 +125,61 @@ class TestDisallowKeys(unittest.TestCase):
         self.assertIn(KEY_Z, keys)
 
 
+class TestKeySetValues(unittest.TestCase):
+    """Tests for AllowKeys and DisallowKeys as immutable set values."""
+
+    def test_membership(self):
+        allow_list = AllowKeys([KEY_A, Symbols])
+        self.assertIn(KEY_A, allow_list)
+        self.assertNotIn(KEY_B, allow_list)
+        self.assertNotIn(-1, allow_list)
+
+        deny_list = DisallowKeys([KEY_A])
+        self.assertNotIn(KEY_A, deny_list)
+        self.assertIn(KEY_B, deny_list)
+
+    def test_immutable(self):
+        allow_list = AllowKeys([KEY_A])
+        with self.assertRaises(AttributeError):
+            allow_list._keycodes = (KEY_B,)
+        with self.assertRaises(AttributeError):
+            DisallowKeys([KEY_A])._allow_list = allow_list
+
+    def test_equal_sets_are_equal_and_hash_equal(self):
+        self.assertEqual(AllowKeys([KEY_A, KEY_B]), AllowKeys([KEY_B, KEY_A, KEY_B]))
+        self.assertNotEqual(AllowKeys([KEY_A]), AllowKeys([KEY_B]))
+
+        everything_but_a = AllowKeys([k for k in AllKeys if k != KEY_A])
+        self.assertEqual(DisallowKeys([KEY_A]), everything_but_a)
+        self.assertEqual(hash(DisallowKeys([KEY_A])), hash(everything_but_a))
+        self.assertEqual(len({DisallowKeys([KEY_A]), everything_but_a}), 1)
+
+    def test_keycodes_is_cached_but_returns_a_copy(self):
+        allow_list = AllowKeys([KEY_A, KEY_B])
+        allow_list.keycodes().append(KEY_C)
+        self.assertEqual(allow_list.keycodes(), [KEY_A, KEY_B])
+
+        deny_list = DisallowKeys([KEY_A])
+        self.assertIs(deny_list.to_allow_list(), deny_list.to_allow_list())
+
+    def test_set_algebra(self):
+        ab = AllowKeys([KEY_A, KEY_B])
+        bc = AllowKeys([KEY_B, KEY_C])
+
+        self.assertEqual((ab | bc).keycodes(), [KEY_A, KEY_B, KEY_C])
+        self.assertEqual((ab & bc).keycodes(), [KEY_B])
+        self.assertEqual((ab - bc).keycodes(), [KEY_A])
+
+    def test_set_algebra_with_deny_lists(self):
+        ab = AllowKeys([KEY_A, KEY_B])
+        no_b = DisallowKeys([KEY_B])
+
+        self.assertEqual((ab & no_b).keycodes(), [KEY_A])
+        self.assertEqual((ab - no_b).keycodes(), [KEY_B])
+        self.assertEqual(ab | no_b, AllowKeys([AllKeys]))
+        self.assertEqual(no_b - ab, DisallowKeys([KEY_A, KEY_B]))
+        self.assertEqual(no_b & DisallowKeys([KEY_A]), DisallowKeys([KEY_A, KEY_B]))
+
+
 if __name__ == "__main__":
     unittest.main()
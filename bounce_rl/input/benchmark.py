@@ -5,16 +5,17 @@ This module benchmarks the end-to-end performance of processing Gym actions
 through the input system and dispatching events to a desktop backend.
 """
 
-import copy
 import time
 
 import numpy as np
 
-from bounce_rl.input.event_dispatch import apply_events_to_desktop
+from bounce_rl.input.event_buffer import EventBuffer
+from bounce_rl.input.event_dispatch import Dispatcher, apply_events_to_desktop
 from bounce_rl.input.gym_input import (
     ACTION_KEYCODES,
     no_op_gym_action,
     process_gym_action,
+    process_gym_action_into,
 )
 from bounce_rl.input.input_processor import InputProcessor
 from bounce_rl.input.input_types import KeyActionKind, MouseActionKind
@@ -96,7 +97,7 @@ def benchmark_input_system(loop_iters: int = 100_000) -> float:
         else:
             action = benchmark_action_b
 
-        input_actions = process_gym_action(copy.deepcopy(action), 800, 600)
+        input_actions = process_gym_action(action, 800, 600)
         immediate_events, delayed_events = input_processor.process_input_actions(
             input_actions
         )
@@ -109,7 +110,44 @@ def benchmark_input_system(loop_iters: int = 100_000) -> float:
     return total_loop_time / loop_iters
 
 
+def benchmark_event_buffer_input_system(loop_iters: int = 100_000) -> float:
+    """
+    Runs the end-to-end input system benchmark using reused EventBuffers instead
+    of input action dataclasses and a non-validating Dispatcher, and returns the average time in seconds to process
+    and dispatch a new input.
+    """
+    input_processor = InputProcessor(800, 600)
+    dispatcher = Dispatcher(FakeDesktop(), validate=False)
+    actions, immediate_events, delayed_events = (
+        EventBuffer(),
+        EventBuffer(),
+        EventBuffer(),
+    )
+
+    start_time = time.perf_counter()
+
+    for i in range(loop_iters):
+        if i % 2 == 0:
+            action = benchmark_action_a
+        else:
+            action = benchmark_action_b
+
+        process_gym_action_into(action, 800, 600, actions)
+        input_processor.process_event_buffer(actions, immediate_events, delayed_events)
+        dispatcher.dispatch_buffer(immediate_events)
+        dispatcher.dispatch_buffer(delayed_events)
+
+    end_time = time.perf_counter()
+    total_loop_time = end_time - start_time
+
+    return total_loop_time / loop_iters
+
+
 if __name__ == "__main__":
     print(
         f"Action input handling takes {benchmark_input_system() * 1_000_000} microseconds"
     )
+    print(
+        "Action input handling with event buffers takes "
+        f"{benchmark_event_buffer_input_system() * 1_000_000} microseconds"
+    )
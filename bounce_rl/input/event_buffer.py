@@ -0,0 +1,190 @@
+"""
+Struct-of-arrays event buffers for the BounceRL input system.
+
+This module provides EventBuffer, a compact alternative to lists of InputAction
+dataclasses. Each stage of the input pipeline (gym_input, InputProcessor and
+event_dispatch) can fill and consume EventBuffers, which are reused across steps,
+instead of allocating a dataclass per action and event.
+"""
+
+from enum import IntEnum
+from typing import Iterator
+
+import numpy as np
+
+from bounce_rl.input.input_types import (
+    InputAction,
+    KeyAction,
+    KeyActionKind,
+    KeyDirection,
+    MouseActionKind,
+    MouseButtonAction,
+    MouseDragAction,
+    MouseMoveAction,
+    ScrollAction,
+)
+
+
+class EventKind(IntEnum):
+    """The kind of an EventBuffer entry.
+
+    Key kinds share their values with KeyActionKind, and the button kinds are
+    MouseActionKind's button kinds offset by BUTTON_OFFSET, so that Gym actions
+    convert to event kinds without a lookup.
+    """
+
+    NONE = 0
+    KEY_PRESS = 1  # Compound: press and release
+    KEY_DOWN = 2
+    KEY_UP = 3
+    BUTTON_PRESS = 4  # Compound: press and release
+    BUTTON_DOWN = 5
+    BUTTON_UP = 6
+    MOUSE_MOVE = 7
+    # Compound: press the button at the current mouse position, move to (x, y), and
+    # release. MouseDragActions are stored as a MOUSE_MOVE to the drag's start
+    # followed by a MOUSE_DRAG.
+    MOUSE_DRAG = 8
+    SCROLL = 9  # code holds the KeyDirection
+
+
+BUTTON_OFFSET = EventKind.BUTTON_PRESS - MouseActionKind.BTN_PRESS
+
+# Kinds that InputProcessor expands into raw events.
+COMPOUND_KINDS = (EventKind.KEY_PRESS, EventKind.BUTTON_PRESS, EventKind.MOUSE_DRAG)
+
+
+class EventBuffer:
+    """A growable buffer of (kind, code, x, y) input events stored as NumPy arrays.
+
+    `code` holds the keycode, mouse button or scroll direction of the event and
+    (x, y) holds mouse positions. Only the first len(buffer) entries are valid.
+    Buffers grow as needed and never shrink, so a buffer reused across steps stops
+    allocating once it has grown to fit a step's events.
+    """
+
+    __slots__ = ("kinds", "codes", "xs", "ys", "_size")
+
+    def __init__(self, capacity: int = 32):
+        self.kinds = np.zeros(capacity, dtype=np.int32)
+        self.codes = np.zeros(capacity, dtype=np.int32)
+        self.xs = np.zeros(capacity, dtype=np.int32)
+        self.ys = np.zeros(capacity, dtype=np.int32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._size = 0
+
+    def truncate(self, size: int) -> None:
+        """Drops all but the first `size` events."""
+        self._size = min(size, self._size)
+
+    def _reserve(self, n: int) -> None:
+        capacity = len(self.kinds)
+        if self._size + n <= capacity:
+            return
+        while capacity < self._size + n:
+            capacity *= 2
+        for name in ("kinds", "codes", "xs", "ys"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+
+    def append(self, kind: int, code: int = 0, x: int = 0, y: int = 0) -> None:
+        self._reserve(1)
+        i = self._size
+        self.kinds[i] = kind
+        self.codes[i] = code
+        self.xs[i] = x
+        self.ys[i] = y
+        self._size = i + 1
+
+    def append_arrays(
+        self,
+        kinds: np.ndarray,
+        codes: np.ndarray,
+        xs: np.ndarray | int = 0,
+        ys: np.ndarray | int = 0,
+    ) -> None:
+        """Appends one event per element of kinds and codes, with positions xs and ys,
+        which default to no position."""
+        n = len(kinds)
+        self._reserve(n)
+        end = self._size + n
+        self.kinds[self._size : end] = kinds
+        self.codes[self._size : end] = codes
+        self.xs[self._size : end] = xs
+        self.ys[self._size : end] = ys
+        self._size = end
+
+    def events(self) -> Iterator[tuple[int, int, int, int]]:
+        """Iterates over the buffer's events as (kind, code, x, y) tuples."""
+        n = self._size
+        return zip(
+            self.kinds[:n].tolist(),
+            self.codes[:n].tolist(),
+            self.xs[:n].tolist(),
+            self.ys[:n].tolist(),
+        )
+
+    @staticmethod
+    def from_input_actions(
+        actions: list[InputAction], out: "EventBuffer | None" = None
+    ) -> "EventBuffer":
+        """Converts input action dataclasses into an EventBuffer.
+
+        Args:
+            actions: The input actions to convert.
+            out: Optional buffer to clear and write the events to.
+        """
+        if out is None:
+            out = EventBuffer(max(len(actions), 1))
+        out.clear()
+        for action in actions:
+            if isinstance(action, KeyAction):
+                if action.action != KeyActionKind.KEY_ACTION_NONE:
+                    out.append(int(action.action), action.keycode)
+            elif isinstance(action, MouseButtonAction):
+                if action.action != MouseActionKind.NONE:
+                    out.append(int(action.action) + BUTTON_OFFSET, action.button)
+            elif isinstance(action, MouseMoveAction):
+                out.append(EventKind.MOUSE_MOVE, 0, *action.position)
+            elif isinstance(action, MouseDragAction):
+                out.append(EventKind.MOUSE_MOVE, 0, *action.start)
+                out.append(EventKind.MOUSE_DRAG, action.button, *action.end)
+            elif isinstance(action, ScrollAction):
+                out.append(EventKind.SCROLL, int(action.direction))
+            else:
+                assert False
+        return out
+
+    def to_input_actions(self) -> list[InputAction]:
+        """Converts the buffer's events back into input action dataclasses."""
+        out: list[InputAction] = []
+        for kind, code, x, y in self.events():
+            if kind in (EventKind.KEY_PRESS, EventKind.KEY_DOWN, EventKind.KEY_UP):
+                out.append(KeyAction(action=KeyActionKind(kind), keycode=code))
+            elif kind in (
+                EventKind.BUTTON_PRESS,
+                EventKind.BUTTON_DOWN,
+                EventKind.BUTTON_UP,
+            ):
+                out.append(
+                    MouseButtonAction(
+                        action=MouseActionKind(kind - BUTTON_OFFSET), button=code
+                    )
+                )
+            elif kind == EventKind.MOUSE_MOVE:
+                out.append(MouseMoveAction((x, y)))
+            elif kind == EventKind.MOUSE_DRAG:
+                start = out.pop().position
+                out.append(MouseDragAction(start, (x, y), code))
+            elif kind == EventKind.SCROLL:
+                out.append(ScrollAction(direction=KeyDirection(code)))
+            else:
+                assert False
+        return out
@@ -0,0 +1,58 @@
+"""Tests for event_buffer.py"""
+
+import unittest
+
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.input_types import (
+    KeyAction,
+    KeyDirection,
+    MouseButtonAction,
+    MouseDragAction,
+    MouseMoveAction,
+    ScrollAction,
+)
+from bounce_rl.input.keys import BTN_LEFT, KEY_A, KEY_B
+
+
+class TestEventBuffer(unittest.TestCase):
+    def test_append_and_iterate_events(self):
+        events = EventBuffer()
+        events.append(EventKind.KEY_DOWN, KEY_A)
+        events.append(EventKind.MOUSE_MOVE, 0, 10, 20)
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(
+            list(events.events()),
+            [(EventKind.KEY_DOWN, KEY_A, 0, 0), (EventKind.MOUSE_MOVE, 0, 10, 20)],
+        )
+
+    def test_buffer_grows_past_capacity(self):
+        events = EventBuffer(capacity=1)
+        for i in range(5):
+            events.append(EventKind.KEY_DOWN, i)
+
+        self.assertEqual([code for _, code, _, _ in events.events()], list(range(5)))
+
+    def test_clear_empties_buffer(self):
+        events = EventBuffer()
+        events.append(EventKind.KEY_DOWN, KEY_A)
+        events.clear()
+        self.assertEqual(list(events.events()), [])
+
+    def test_input_actions_round_trip(self):
+        actions = [
+            KeyAction.press(KEY_A),
+            KeyAction.up(KEY_B),
+            MouseButtonAction.down(BTN_LEFT),
+            MouseMoveAction((1, 2)),
+            MouseDragAction((3, 4), (5, 6), BTN_LEFT),
+            ScrollAction(KeyDirection.KEY_UP),
+        ]
+
+        events = EventBuffer.from_input_actions(actions)
+
+        self.assertEqual(events.to_input_actions(), actions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,16 @@ Event dispatch for the BounceRL input system.
 This module dispatches low-level input events to desktop backends.
 """
 
-from typing import List
+from typing import Callable, List
 
+import numpy as np
+
+from bounce_rl.input.event_buffer import (
+    BUTTON_OFFSET,
+    COMPOUND_KINDS,
+    EventBuffer,
+    EventKind,
+)
 from bounce_rl.input.input_types import (
     InputAction,
     KeyAction,
@@ -21,82 +29,194 @@ from bounce_rl.input.keys import MouseButtons
 from bounce_desktop import Desktop
 
 
-def apply_events_to_desktop(events: List[InputAction], desktop) -> None:
-    """Dispatch input events to a Desktop backend."""
-    for event in events:
-        if isinstance(event, MouseDragAction):
-            raise ValueError(
-                "apply_events_to_desktop should only receive raw event actions. "
-                "Not compound actions like MouseDragAction."
-            )
-        if isinstance(event, KeyAction) and event.action == KeyActionKind.KEY_PRESS:
-            raise ValueError(
-                "apply_events_to_desktop should only receive raw event actions. "
-                "Not compound actions like KeyActionKind.KEY_PRESS."
-            )
-        if (
-            isinstance(event, MouseButtonAction)
-            and event.action == MouseActionKind.BTN_PRESS
-        ):
-            raise ValueError(
-                "apply_events_to_desktop should only receive raw event actions. "
-                "Not compound actions like MouseActionKind.BTN_PRESS."
-            )
-
-        if isinstance(event, KeyAction):
-            _dispatch_key_action(event, desktop)
-        elif isinstance(event, MouseButtonAction):
-            _dispatch_mouse_button_action(event, desktop)
-        elif isinstance(event, MouseMoveAction):
-            desktop.move_mouse_to(event.position[0], event.position[1])
-        elif isinstance(event, ScrollAction):
-            _dispatch_scroll_action(event, desktop)
-        else:
-            assert False
-
-
-def _dispatch_key_action(event: KeyAction, desktop: Desktop) -> None:
-    if event.keycode in MouseButtons:
-        _dispatch_mouse_button_action(
-            MouseButtonAction(
-                action=_mouse_action_kind_from_key_action_kind(event.action),
-                button=event.keycode,
+# Handles an event given its (code, x, y).
+_EventHandler = Callable[[int, int, int], None]
+
+_COMPOUND_KINDS_ARRAY = np.array(COMPOUND_KINDS)
+_MAX_EVENT_KIND = max(EventKind)
+_MOUSE_BUTTONS_ARRAY = np.array(MouseButtons)
+# Offset from a key kind to the button kind of the same direction.
+_KEY_TO_BUTTON_KIND = EventKind.BUTTON_DOWN - EventKind.KEY_DOWN
+
+
+class Dispatcher:
+    """
+    Dispatches raw input events to one Desktop backend.
+
+    The desktop's methods and scroll capabilities are resolved once, when the
+    dispatcher is created, and each event is dispatched through a table indexed
+    by its EventKind.
+
+    Desktops that implement `submit_events(events)` are instead sent each list or
+    buffer of events in a single call. `events` is an (N, 4) int32 array with one
+    (kind, code, x, y) row per event, where kind is one of EventKind's raw kinds
+    and key events for mouse buttons have already been converted to button events.
+    The array is reused across calls, so desktops that keep it must copy it.
+    """
+
+    def __init__(self, desktop: Desktop, validate: bool = True):
+        """
+        Create a dispatcher for the given desktop.
+
+        Args:
+            desktop: The desktop backend to dispatch events to.
+            validate: Whether to check that all events are raw events before
+                dispatching any of them. Trusted callers whose events come from
+                InputProcessor can turn this off to skip the check.
+        """
+        self.desktop = desktop
+        self._validate = validate
+        self._submit_events = getattr(desktop, "submit_events", None)
+        self._packed = np.zeros((32, 4), dtype=np.int32)
+        self._scratch = EventBuffer()
+
+        keycode_down = desktop.keycode_down
+        keycode_up = desktop.keycode_up
+        mouse_press = desktop.mouse_press
+        mouse_release = desktop.mouse_release
+        move_mouse_to = desktop.move_mouse_to
+        scroll = _resolve_scroll(desktop)
+        mouse_buttons = frozenset(MouseButtons)
+
+        def key_down(code: int, x: int, y: int) -> None:
+            if code in mouse_buttons:
+                mouse_press(code)
+            else:
+                keycode_down(code)
+
+        def key_up(code: int, x: int, y: int) -> None:
+            if code in mouse_buttons:
+                mouse_release(code)
+            else:
+                keycode_up(code)
+
+        def reject(kind: EventKind) -> _EventHandler:
+            def handler(code: int, x: int, y: int) -> None:
+                raise ValueError(
+                    "Dispatcher should only receive raw events. "
+                    f"Not compound or empty events like {kind.name}."
+                )
+
+            return handler
+
+        handlers: list[_EventHandler] = [reject(kind) for kind in EventKind]
+        handlers[EventKind.KEY_DOWN] = key_down
+        handlers[EventKind.KEY_UP] = key_up
+        handlers[EventKind.BUTTON_DOWN] = lambda code, x, y: mouse_press(code)
+        handlers[EventKind.BUTTON_UP] = lambda code, x, y: mouse_release(code)
+        handlers[EventKind.MOUSE_MOVE] = lambda code, x, y: move_mouse_to(x, y)
+        handlers[EventKind.SCROLL] = lambda code, x, y: scroll(code)
+        self._handlers = handlers
+
+        self._action_handlers: dict[type, Callable[[InputAction], None]] = {
+            KeyAction: lambda a: handlers[a.action](a.keycode, 0, 0),
+            MouseButtonAction: lambda a: handlers[a.action + BUTTON_OFFSET](
+                a.button, 0, 0
             ),
-            desktop,
-        )
-        return
+            MouseMoveAction: lambda a: move_mouse_to(a.position[0], a.position[1]),
+            ScrollAction: lambda a: scroll(a.direction),
+            MouseDragAction: lambda a: handlers[EventKind.MOUSE_DRAG](0, 0, 0),
+        }
+
+    def dispatch(self, events: List[InputAction]) -> None:
+        """Dispatch a list of raw input event actions."""
+        if self._validate:
+            for event in events:
+                _check_raw_event(event)
+        if self._submit_events is not None:
+            self._submit(EventBuffer.from_input_actions(events, self._scratch))
+            return
+        action_handlers = self._action_handlers
+        for event in events:
+            action_handlers[type(event)](event)
+
+    def dispatch_buffer(self, events: EventBuffer) -> None:
+        """Dispatch an EventBuffer of raw input events."""
+        if self._validate and len(events):
+            kinds = events.kinds[: len(events)]
+            if (
+                np.isin(kinds, _COMPOUND_KINDS_ARRAY).any()
+                or kinds.min() <= EventKind.NONE
+                or kinds.max() > _MAX_EVENT_KIND
+            ):
+                raise ValueError(
+                    "Dispatcher should only receive raw events. "
+                    "Not compound or empty events."
+                )
+        if self._submit_events is not None:
+            self._submit(events)
+            return
+        handlers = self._handlers
+        for kind, code, x, y in events.events():
+            handlers[kind](code, x, y)
+
+    def _submit(self, events: EventBuffer) -> None:
+        """Packs the events into one array and submits them in a single call."""
+        n = len(events)
+        if n == 0:
+            return
+        if n > len(self._packed):
+            self._packed = np.zeros((max(n, 2 * len(self._packed)), 4), np.int32)
+        packed = self._packed[:n]
+        kinds = packed[:, 0]
+        kinds[:] = events.kinds[:n]
+        packed[:, 1] = events.codes[:n]
+        packed[:, 2] = events.xs[:n]
+        packed[:, 3] = events.ys[:n]
+
+        key_kinds = (kinds == EventKind.KEY_DOWN) | (kinds == EventKind.KEY_UP)
+        mouse_button_keys = key_kinds & np.isin(packed[:, 1], _MOUSE_BUTTONS_ARRAY)
+        kinds[mouse_button_keys] += _KEY_TO_BUTTON_KIND
+        self._submit_events(packed)
+
+
+def apply_events_to_desktop(events: List[InputAction], desktop) -> None:
+    """Dispatch input events to a Desktop backend.
+
+    Callers dispatching to the same desktop repeatedly should create a Dispatcher
+    instead."""
+    Dispatcher(desktop).dispatch(events)
 
-    if event.action == KeyActionKind.KEY_DOWN:
-        desktop.keycode_down(event.keycode)
-    elif event.action == KeyActionKind.KEY_UP:
-        desktop.keycode_up(event.keycode)
-    else:
-        assert False
 
+def apply_event_buffer_to_desktop(events: EventBuffer, desktop) -> None:
+    """Dispatch an EventBuffer of raw input events to a Desktop backend.
 
-def _dispatch_mouse_button_action(event: MouseButtonAction, desktop) -> None:
-    if event.action == MouseActionKind.BTN_DOWN:
-        desktop.mouse_press(event.button)
-    elif event.action == MouseActionKind.BTN_UP:
-        desktop.mouse_release(event.button)
-    else:
-        assert False
+    Callers dispatching to the same desktop repeatedly should create a Dispatcher
+    instead."""
+    Dispatcher(desktop).dispatch_buffer(events)
 
 
-def _dispatch_scroll_action(event: ScrollAction, desktop) -> None:
+def _check_raw_event(event: InputAction) -> None:
+    if isinstance(event, MouseDragAction):
+        raise ValueError(
+            "apply_events_to_desktop should only receive raw event actions. "
+            "Not compound actions like MouseDragAction."
+        )
+    if isinstance(event, KeyAction) and event.action == KeyActionKind.KEY_PRESS:
+        raise ValueError(
+            "apply_events_to_desktop should only receive raw event actions. "
+            "Not compound actions like KeyActionKind.KEY_PRESS."
+        )
+    if isinstance(event, MouseButtonAction) and event.action == MouseActionKind.BTN_PRESS:
+        raise ValueError(
+            "apply_events_to_desktop should only receive raw event actions. "
+            "Not compound actions like MouseActionKind.BTN_PRESS."
+        )
+
+
+def _resolve_scroll(desktop) -> Callable[[int], None]:
+    """Returns a function that scrolls the desktop in a KeyDirection, using
+    whichever scroll methods the desktop has."""
     if hasattr(desktop, "scroll"):
-        desktop.scroll(event.direction)
-    elif event.direction == KeyDirection.KEY_DOWN and hasattr(desktop, "scroll_down"):
-        desktop.scroll_down()
-    elif event.direction == KeyDirection.KEY_UP and hasattr(desktop, "scroll_up"):
-        desktop.scroll_up()
-
-
-def _mouse_action_kind_from_key_action_kind(action: KeyActionKind) -> MouseActionKind:
-    if action == KeyActionKind.KEY_DOWN:
-        return MouseActionKind.BTN_DOWN
-    if action == KeyActionKind.KEY_UP:
-        return MouseActionKind.BTN_UP
-    if action == KeyActionKind.KEY_PRESS:
-        return MouseActionKind.BTN_PRESS
-    return MouseActionKind.NONE
+        return desktop.scroll
+
+    scroll_down = getattr(desktop, "scroll_down", None)
+    scroll_up = getattr(desktop, "scroll_up", None)
+
+    def scroll(direction: int) -> None:
+        if direction == KeyDirection.KEY_DOWN and scroll_down is not None:
+            scroll_down()
+        elif direction == KeyDirection.KEY_UP and scroll_up is not None:
+            scroll_up()
+
+    return scroll
@@ -2,7 +2,14 @@
 
 import unittest
 
-from bounce_rl.input.event_dispatch import apply_events_to_desktop
+import numpy as np
+
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.event_dispatch import (
+    Dispatcher,
+    apply_event_buffer_to_desktop,
+    apply_events_to_desktop,
+)
 from bounce_rl.input.input_types import (
     KeyAction,
     KeyActionKind,
@@ -28,8 +35,8 @@ class MockDesktop:
     def keycode_up(self, keycode: int):
         self.events.append(("keycode_up", keycode))
 
-    def move_mouse(self, x: int, y: int):
-        self.events.append(("move_mouse", x, y))
+    def move_mouse_to(self, x: int, y: int):
+        self.events.append(("move_mouse_to", x, y))
 
     def mouse_press(self, button: int):
         self.events.append(("mouse_press", button))
@@ -41,6 +48,13 @@ class MockDesktop:
         self.events.append(("scroll", direction))
 
 
+class BatchMockDesktop(MockDesktop):
+    """Mock desktop that also accepts batched event submissions."""
+
+    def submit_events(self, events: np.ndarray):
+        self.events.append(("submit_events", events.tolist()))
+
+
 class TestEventDispatch(unittest.TestCase):
     """Tests for apply_events_to_desktop."""
 
@@ -59,14 +73,15 @@ class TestEventDispatch(unittest.TestCase):
         )
 
     def test_mouse_move_events(self):
-        """Mouse move actions invoke move_mouse with coordinates passed through."""
+        """Mouse move actions invoke move_mouse_to with coordinates passed through."""
         desktop = MockDesktop()
         events = [MouseMoveAction((100, 200)), MouseMoveAction((300, 400))]
 
         apply_events_to_desktop(events, desktop)
 
         self.assertEqual(
-            desktop.events, [("move_mouse", 100, 200), ("move_mouse", 300, 400)]
+            desktop.events,
+            [("move_mouse_to", 100, 200), ("move_mouse_to", 300, 400)],
         )
 
     def test_mouse_button_events(self):
@@ -143,7 +158,7 @@ class TestEventDispatch(unittest.TestCase):
             desktop.events,
             [
                 ("keycode_down", KEY_A),
-                ("move_mouse", 50, 75),
+                ("move_mouse_to", 50, 75),
                 ("mouse_press", BTN_LEFT),
                 ("keycode_up", KEY_A),
                 ("mouse_release", BTN_LEFT),
@@ -151,5 +166,104 @@ class TestEventDispatch(unittest.TestCase):
         )
 
 
+class TestEventBufferDispatch(unittest.TestCase):
+    """Tests for apply_event_buffer_to_desktop."""
+
+    def test_event_buffer_dispatches_like_input_actions(self):
+        events = [
+            KeyAction.down(KEY_A),
+            KeyAction.down(BTN_RIGHT),
+            MouseButtonAction.down(BTN_LEFT),
+            ScrollAction(KeyDirection.KEY_DOWN),
+            KeyAction.up(KEY_A),
+            MouseButtonAction.up(BTN_LEFT),
+        ]
+        expected, actual = MockDesktop(), MockDesktop()
+
+        apply_events_to_desktop(events, expected)
+        apply_event_buffer_to_desktop(EventBuffer.from_input_actions(events), actual)
+
+        self.assertEqual(actual.events, expected.events)
+
+    def test_event_buffer_rejects_compound_events(self):
+        events = EventBuffer.from_input_actions([KeyAction.press(KEY_A)])
+        with self.assertRaises(ValueError):
+            apply_event_buffer_to_desktop(events, MockDesktop())
+
+
+class TestDispatcher(unittest.TestCase):
+    """Tests for Dispatcher."""
+
+    def test_dispatcher_falls_back_to_directional_scroll(self):
+        class DirectionalScrollDesktop:
+            def __init__(self):
+                self.events = []
+
+            keycode_down = keycode_up = mouse_press = mouse_release = None
+            move_mouse_to = None
+
+            def scroll_down(self):
+                self.events.append(("scroll_down",))
+
+        desktop = DirectionalScrollDesktop()
+
+        Dispatcher(desktop).dispatch([ScrollAction(KeyDirection.KEY_DOWN)])
+
+        self.assertEqual(desktop.events, [("scroll_down",)])
+
+    def test_validating_dispatcher_rejects_before_dispatching(self):
+        desktop = MockDesktop()
+        events = [KeyAction.down(KEY_A), KeyAction.press(KEY_B)]
+
+        with self.assertRaises(ValueError):
+            Dispatcher(desktop).dispatch(events)
+        with self.assertRaises(ValueError):
+            Dispatcher(desktop).dispatch_buffer(EventBuffer.from_input_actions(events))
+
+        self.assertEqual(desktop.events, [])
+
+    def test_fast_dispatcher_dispatches_raw_events(self):
+        desktop = MockDesktop()
+        dispatcher = Dispatcher(desktop, validate=False)
+
+        dispatcher.dispatch([KeyAction.down(KEY_A), MouseMoveAction((1, 2))])
+        dispatcher.dispatch_buffer(
+            EventBuffer.from_input_actions([MouseButtonAction.up(BTN_LEFT)])
+        )
+
+        self.assertEqual(
+            desktop.events,
+            [
+                ("keycode_down", KEY_A),
+                ("move_mouse_to", 1, 2),
+                ("mouse_release", BTN_LEFT),
+            ],
+        )
+
+
+    def test_batch_desktop_receives_events_in_one_call(self):
+        desktop = BatchMockDesktop()
+        events = [
+            KeyAction.down(KEY_A),
+            KeyAction.down(BTN_RIGHT),
+            MouseMoveAction((1, 2)),
+            ScrollAction(KeyDirection.KEY_UP),
+        ]
+
+        Dispatcher(desktop).dispatch(events)
+        Dispatcher(desktop).dispatch_buffer(EventBuffer.from_input_actions(events))
+        Dispatcher(desktop).dispatch([])
+
+        packed = [
+            [EventKind.KEY_DOWN, KEY_A, 0, 0],
+            [EventKind.BUTTON_DOWN, BTN_RIGHT, 0, 0],
+            [EventKind.MOUSE_MOVE, 0, 1, 2],
+            [EventKind.SCROLL, KeyDirection.KEY_UP, 0, 0],
+        ]
+        self.assertEqual(
+            desktop.events, [("submit_events", packed), ("submit_events", packed)]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+"""
+Timed event schedules for the BounceRL input system.
+
+This module provides ScheduledEvents, an EventBuffer whose events each have a time
+offset within a step, so that environments can fire a step's events over the course
+of the step instead of all at once.
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+from bounce_rl.input.event_buffer import EventBuffer
+
+
+class ScheduledEvents:
+    """Raw input events with time offsets from the start of a step.
+
+    Offsets are in seconds of game time. Events with equal offsets keep the order
+    they were appended in.
+    """
+
+    __slots__ = ("events", "offsets", "_sorted")
+
+    def __init__(self, capacity: int = 32):
+        self.events = EventBuffer(capacity)
+        self.offsets = np.zeros(capacity, dtype=np.float64)
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def clear(self) -> None:
+        self.events.clear()
+        self._sorted = True
+
+    def append(
+        self, offset: float, kind: int, code: int = 0, x: int = 0, y: int = 0
+    ) -> None:
+        n = len(self.events)
+        if n == len(self.offsets):
+            self.offsets = np.concatenate([self.offsets, np.zeros_like(self.offsets)])
+        if n and offset < self.offsets[n - 1]:
+            self._sorted = False
+        self.offsets[n] = offset
+        self.events.append(kind, code, x, y)
+
+    def sort(self) -> None:
+        """Stably sorts the events by offset."""
+        if self._sorted:
+            return
+        n = len(self.events)
+        order = np.argsort(self.offsets[:n], kind="stable")
+        events = self.events
+        self.offsets[:n] = self.offsets[:n][order]
+        events.kinds[:n] = events.kinds[:n][order]
+        events.codes[:n] = events.codes[:n][order]
+        events.xs[:n] = events.xs[:n][order]
+        events.ys[:n] = events.ys[:n][order]
+        self._sorted = True
+
+    def groups(self) -> Iterator[tuple[float, int, int]]:
+        """Sorts the events and iterates over runs of events with equal offsets as
+        (offset, start, stop) index ranges."""
+        self.sort()
+        n = len(self.events)
+        start = 0
+        offsets = self.offsets[:n].tolist()
+        for i in range(1, n + 1):
+            if i == n or offsets[i] != offsets[start]:
+                yield offsets[start], start, i
+                start = i
+
+    def copy_range(self, start: int, stop: int, out: EventBuffer) -> EventBuffer:
+        """Clears `out` and copies the events in [start, stop) to it."""
+        events = self.events
+        out.clear()
+        out.append_arrays(
+            events.kinds[start:stop],
+            events.codes[start:stop],
+            events.xs[start:stop],
+            events.ys[start:stop],
+        )
+        return out
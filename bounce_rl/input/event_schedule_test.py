@@ -0,0 +1,34 @@
+"""Tests for event_schedule.py"""
+
+import unittest
+
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.event_schedule import ScheduledEvents
+from bounce_rl.input.keys import KEY_A, KEY_B, KEY_C
+
+
+class TestScheduledEvents(unittest.TestCase):
+    def test_groups_are_sorted_by_offset(self):
+        schedule = ScheduledEvents()
+        schedule.append(0.5, EventKind.KEY_UP, KEY_A)
+        schedule.append(0.0, EventKind.KEY_DOWN, KEY_A)
+        schedule.append(0.5, EventKind.KEY_UP, KEY_B)
+        schedule.append(0.0, EventKind.KEY_DOWN, KEY_B)
+
+        self.assertEqual(list(schedule.groups()), [(0.0, 0, 2), (0.5, 2, 4)])
+        self.assertEqual(
+            list(schedule.copy_range(2, 4, EventBuffer()).events()),
+            [(EventKind.KEY_UP, KEY_A, 0, 0), (EventKind.KEY_UP, KEY_B, 0, 0)],
+        )
+
+    def test_schedule_grows_past_capacity(self):
+        schedule = ScheduledEvents(capacity=1)
+        for i, key in enumerate((KEY_A, KEY_B, KEY_C)):
+            schedule.append(float(i), EventKind.KEY_DOWN, key)
+
+        self.assertEqual(len(schedule), 3)
+        self.assertEqual([offset for offset, _, _ in schedule.groups()], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
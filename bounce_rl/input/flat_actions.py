@@ -0,0 +1,178 @@
+"""
+Flat discrete action space for the BounceRL input system.
+
+This module provides an alternative to gym_input's Dict action space: a single
+MultiDiscrete space whose indices map through precomputed tables directly to
+input events, so that actions are cheap to sample, need no flattening by policy
+libraries, and convert to an EventBuffer without building or parsing a dict.
+
+A flat action is an integer array of MAX_BUTTON_ACTIONS + 2 indices:
+- MAX_BUTTON_ACTIONS key indices. 0 is a no-op and 1 + 3 * i + (kind - 1) is the
+  KeyActionKind `kind` on ACTION_KEYCODES[i].
+- A mouse index. 0 is a no-op. The screen is divided into a grid of cells, and
+  1 + cell * (1 + 3 * len(MouseButtons)) + j moves the mouse to the center of the
+  cell when j is 0, and otherwise also applies the mouse button action
+  (j - 1) // len(MouseButtons) + 1, i.e. BTN_PRESS, BTN_DOWN or BTN_UP, to
+  MouseButtons[(j - 1) % len(MouseButtons)]. Cells are numbered row by row.
+- A scroll index, which is a KeyDirection.
+
+Drags aren't representable in the flat space.
+"""
+
+import numpy as np
+from gymnasium import spaces
+
+from bounce_rl.input.event_buffer import BUTTON_OFFSET, EventBuffer, EventKind
+from bounce_rl.input.gym_input import (
+    ACTION_KEYCODES,
+    MAX_BUTTON_ACTIONS,
+    _screen_positions,
+)
+from bounce_rl.input.input_types import KeyActionKind, KeyDirection, MouseActionKind
+from bounce_rl.input.keys import MouseButtons
+
+_KEY_KINDS = (KeyActionKind.KEY_PRESS, KeyActionKind.KEY_DOWN, KeyActionKind.KEY_UP)
+_BUTTON_KINDS = (
+    MouseActionKind.BTN_PRESS,
+    MouseActionKind.BTN_DOWN,
+    MouseActionKind.BTN_UP,
+)
+
+# Index of each part of a flat action.
+MOUSE_INDEX = MAX_BUTTON_ACTIONS
+SCROLL_INDEX = MAX_BUTTON_ACTIONS + 1
+
+
+class FlatActionTable:
+    """Precomputed tables from flat action indices to input events, for one screen
+    resolution, mouse grid and action mask."""
+
+    def __init__(
+        self,
+        screen_width: int,
+        screen_height: int,
+        grid: tuple[int, int] = (16, 9),
+        action_mask: np.ndarray | None = None,
+    ):
+        """
+        Build the tables for a screen and mouse grid.
+
+        Args:
+            screen_width: The width of the environment's screen.
+            screen_height: The height of the environment's screen.
+            grid: The number of (columns, rows) of cells to divide the screen into
+                  for mouse actions.
+            action_mask: An optional mask from gym_input.compile_action_mask().
+                         Key indices of disallowed keys are compiled into no-ops.
+        """
+        self.grid = grid
+        if action_mask is None:
+            action_mask = np.ones(len(ACTION_KEYCODES), dtype=bool)
+
+        # Key tables, with index 0 as the no-op.
+        key_kinds = [EventKind.NONE]
+        key_codes = [0]
+        for i, keycode in enumerate(ACTION_KEYCODES):
+            for kind in _KEY_KINDS:
+                key_kinds.append(kind if action_mask[i] else EventKind.NONE)
+                key_codes.append(keycode)
+        self._key_kinds = np.array(key_kinds, dtype=np.int32)
+        self._key_codes = np.array(key_codes, dtype=np.int32)
+        self.key_mask = self._key_kinds != EventKind.NONE
+        self.key_mask[0] = True
+
+        # Mouse tables, with index 0 as the no-op.
+        cols, rows = grid
+        col_centers = (2 * np.arange(cols) + 1) / cols - 1
+        row_centers = (2 * np.arange(rows) + 1) / rows - 1
+        centers = np.stack(np.meshgrid(col_centers, row_centers), axis=-1)
+        cells = _screen_positions(centers.reshape(-1, 2), screen_width, screen_height)
+        mouse_xs = [0]
+        mouse_ys = [0]
+        mouse_kinds = [EventKind.NONE]
+        mouse_buttons = [0]
+        for x, y in cells.tolist():
+            mouse_xs.append(x)
+            mouse_ys.append(y)
+            mouse_kinds.append(EventKind.NONE)
+            mouse_buttons.append(0)
+            for kind in _BUTTON_KINDS:
+                for button in MouseButtons:
+                    mouse_xs.append(x)
+                    mouse_ys.append(y)
+                    mouse_kinds.append(int(kind) + BUTTON_OFFSET)
+                    mouse_buttons.append(button)
+        # Looked up one scalar at a time, so kept as lists.
+        self._mouse_xs = mouse_xs
+        self._mouse_ys = mouse_ys
+        self._mouse_kinds = mouse_kinds
+        self._mouse_buttons = mouse_buttons
+
+        self.nvec = np.array(
+            [len(key_kinds)] * MAX_BUTTON_ACTIONS
+            + [len(mouse_kinds), len(KeyDirection)]
+        )
+
+    def action_space(self) -> spaces.MultiDiscrete:
+        return spaces.MultiDiscrete(self.nvec)
+
+    def no_op(self) -> np.ndarray:
+        """Returns a flat action that does nothing."""
+        return np.zeros(len(self.nvec), dtype=np.int64)
+
+    def to_event_buffer(self, action: np.ndarray, out: EventBuffer) -> EventBuffer:
+        """Converts a flat action to its input actions, written to an EventBuffer.
+
+        Produces the input actions process_gym_action_into() would for the
+        equivalent Dict action.
+
+        Args:
+            action: The flat action to convert.
+            out: The buffer to clear and write the input actions to.
+        """
+        action = np.asarray(action)
+        out.clear()
+
+        keys = action[:MAX_BUTTON_ACTIONS]
+        kinds = self._key_kinds[keys]
+        pressed = kinds != EventKind.NONE
+        if pressed.any():
+            out.append_arrays(kinds[pressed], self._key_codes[keys[pressed]])
+
+        mouse = int(action[MOUSE_INDEX])
+        if mouse:
+            out.append(
+                EventKind.MOUSE_MOVE, 0, self._mouse_xs[mouse], self._mouse_ys[mouse]
+            )
+            kind = self._mouse_kinds[mouse]
+            if kind != EventKind.NONE:
+                out.append(kind, self._mouse_buttons[mouse])
+
+        scroll = int(action[SCROLL_INDEX])
+        if scroll != KeyDirection.KEY_NO_DIRECTION:
+            out.append(EventKind.SCROLL, scroll)
+        return out
+
+
+def key_index(keycode: int, kind: KeyActionKind) -> int:
+    """Returns the flat key index of a key action."""
+    return 1 + 3 * ACTION_KEYCODES.index(keycode) + (int(kind) - 1)
+
+
+def mouse_index(
+    grid: tuple[int, int],
+    col: int,
+    row: int,
+    kind: MouseActionKind = MouseActionKind.MOVE,
+    button: int = MouseButtons[0],
+) -> int:
+    """Returns the flat mouse index of a mouse move or button action in a cell."""
+    per_cell = 1 + len(_BUTTON_KINDS) * len(MouseButtons)
+    base = 1 + (row * grid[0] + col) * per_cell
+    if kind == MouseActionKind.MOVE:
+        return base
+    if kind not in _BUTTON_KINDS:
+        raise ValueError(f"Flat actions don't support mouse action {kind!r}.")
+    return (
+        base + 1 + (int(kind) - 1) * len(MouseButtons) + MouseButtons.index(button)
+    )
@@ -0,0 +1,92 @@
+"""Tests for flat_actions.py"""
+
+import unittest
+
+import numpy as np
+
+from bounce_rl.input.allowed_inputs import AllowKeys
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.flat_actions import (
+    MOUSE_INDEX,
+    SCROLL_INDEX,
+    FlatActionTable,
+    key_index,
+    mouse_index,
+)
+from bounce_rl.input.gym_input import (
+    ACTION_KEYCODES,
+    compile_action_mask,
+    no_op_gym_action,
+    process_gym_action_into,
+)
+from bounce_rl.input.input_types import KeyActionKind, KeyDirection, MouseActionKind
+from bounce_rl.input.keys import BTN_RIGHT, KEY_A, KEY_B
+
+
+class TestFlatActionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = FlatActionTable(800, 600, grid=(4, 2))
+
+    def test_no_op_is_in_action_space_and_has_no_events(self):
+        no_op = self.table.no_op()
+        self.assertTrue(self.table.action_space().contains(no_op))
+        self.assertEqual(len(self.table.to_event_buffer(no_op, EventBuffer())), 0)
+
+    def test_sampled_actions_convert(self):
+        space = self.table.action_space()
+        space.seed(0)
+        out = EventBuffer()
+        for _ in range(100):
+            self.table.to_event_buffer(space.sample(), out)
+
+    def test_matches_dict_actions(self):
+        flat = self.table.no_op()
+        flat[0] = key_index(KEY_A, KeyActionKind.KEY_PRESS)
+        flat[1] = key_index(KEY_B, KeyActionKind.KEY_UP)
+        flat[MOUSE_INDEX] = mouse_index(
+            (4, 2), 1, 1, MouseActionKind.BTN_DOWN, BTN_RIGHT
+        )
+        flat[SCROLL_INDEX] = KeyDirection.KEY_UP
+
+        action = no_op_gym_action()
+        action["keys"][0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_PRESS]
+        action["keys"][1] = [ACTION_KEYCODES.index(KEY_B), KeyActionKind.KEY_UP]
+        action["mouse_action"]["action"] = MouseActionKind.BTN_DOWN
+        action["mouse_action"]["button"] = 1
+        # The center of column 1 of 4 and row 1 of 2.
+        action["mouse_action"]["target"] = np.array([-0.25, 0.5])
+        action["scroll"] = KeyDirection.KEY_UP
+
+        self.assertEqual(
+            list(self.table.to_event_buffer(flat, EventBuffer()).events()),
+            list(process_gym_action_into(action, 800, 600, EventBuffer()).events()),
+        )
+
+    def test_mouse_move(self):
+        flat = self.table.no_op()
+        flat[MOUSE_INDEX] = mouse_index((4, 2), 0, 0)
+        events = self.table.to_event_buffer(flat, EventBuffer())
+        self.assertEqual(list(events.events()), [(EventKind.MOUSE_MOVE, 0, 100, 150)])
+
+    def test_action_mask_disables_keys(self):
+        table = FlatActionTable(
+            800, 600, action_mask=compile_action_mask(AllowKeys([KEY_B]))
+        )
+        flat = table.no_op()
+        flat[0] = key_index(KEY_A, KeyActionKind.KEY_PRESS)
+        flat[1] = key_index(KEY_B, KeyActionKind.KEY_PRESS)
+
+        events = table.to_event_buffer(flat, EventBuffer())
+
+        self.assertEqual(events.codes[: len(events)].tolist(), [KEY_B])
+        self.assertFalse(table.key_mask[key_index(KEY_A, KeyActionKind.KEY_DOWN)])
+        self.assertTrue(table.key_mask[key_index(KEY_B, KeyActionKind.KEY_DOWN)])
+        self.assertTrue(table.key_mask[0])
+
+    def test_drags_are_unsupported(self):
+        with self.assertRaises(ValueError):
+            mouse_index((4, 2), 0, 0, MouseActionKind.DRAG)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,14 @@ This module exposes the BounceRL input system through the Gym API, providing
 a fixed-layout action space that can be masked for per-environment input restrictions.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
+
 import numpy as np
 from gymnasium import spaces
-import copy
 
-from bounce_rl.input.allowed_inputs import AllowKeys
+from bounce_rl.input.allowed_inputs import AllowKeys, DisallowKeys
+from bounce_rl.input.event_buffer import BUTTON_OFFSET, EventBuffer, EventKind
 from bounce_rl.input.input_types import (
     InputAction,
     KeyAction,
@@ -40,6 +43,31 @@ MAX_BUTTON_ACTIONS = 8
 _keys_shape = (MAX_BUTTON_ACTIONS, 2)
 _mouse_pos_shape = (2,)
 
+# Lookup tables from action space indices to keycodes and mouse buttons.
+_ACTION_KEYCODE_TABLE = np.array(ACTION_KEYCODES, dtype=np.int64)
+_MOUSE_BUTTON_TABLE = np.array(MouseButtons, dtype=np.int64)
+
+# A structured record holding one action, with the same fields as the Dict action
+# space. Policies can preallocate records with action_buffer() and fill them in place
+# each step instead of building Dict actions.
+ACTION_DTYPE = np.dtype(
+    [
+        ("keys", np.int64, _keys_shape),
+        ("mouse_button", np.int64),
+        ("mouse_action", np.int64),
+        ("drag_start", np.float32, _mouse_pos_shape),
+        ("target", np.float32, _mouse_pos_shape),
+        ("scroll", np.int64),
+    ]
+)
+
+# Mouse action kinds that move the mouse to the target before acting.
+_MOUSE_BUTTON_KINDS = (
+    MouseActionKind.BTN_PRESS,
+    MouseActionKind.BTN_DOWN,
+    MouseActionKind.BTN_UP,
+)
+
 
 def action_space(
     screen_width: int | None = None, screen_height: int | None = None
@@ -72,15 +100,56 @@ def action_space(
     )
 
 
-def mask_action(action: dict, allowed_inputs: AllowKeys) -> dict:
-    """Masks the given Gym action to only allowed inputs."""
-    action = copy.deepcopy(action)
-    allowed_keycodes = set(allowed_inputs.keycodes())
-    for act in action["keys"]:  # type: ignore
-        key_idx, _ = act
-        keycode = ACTION_KEYCODES[int(key_idx)]
-        if keycode not in allowed_keycodes:
-            act[1] = KeyActionKind.KEY_ACTION_NONE
+def compile_action_mask(allowed_inputs: AllowKeys | DisallowKeys) -> np.ndarray:
+    """Compiles the allowed inputs into a boolean mask over ACTION_KEYCODES.
+
+    mask[i] is True if ACTION_KEYCODES[i] is allowed. Environments compile their
+    mask once, and policies can use it for invalid action masking."""
+    return np.array([k in allowed_inputs for k in ACTION_KEYCODES], dtype=bool)
+
+
+@lru_cache(maxsize=32)
+def _cached_action_mask(allowed_inputs: AllowKeys | DisallowKeys) -> np.ndarray:
+    mask = compile_action_mask(allowed_inputs)
+    mask.flags.writeable = False
+    return mask
+
+
+def mask_keys(
+    keys: np.ndarray, action_mask: np.ndarray, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Sets the action kind of disallowed key rows to KEY_ACTION_NONE.
+
+    Args:
+        keys: Key rows of shape (..., MAX_BUTTON_ACTIONS, 2), e.g. a single
+              action's keys or a batch of N actions' keys.
+        action_mask: A mask from compile_action_mask().
+        out: Optional array to write the masked keys to. May be `keys` itself to
+             mask in place. If not given, a new array is returned.
+    """
+    if out is None:
+        out = np.array(keys)
+    elif out is not keys:
+        np.copyto(out, keys)
+    kinds = out[..., 1]
+    np.multiply(kinds, action_mask[out[..., 0]], out=kinds, casting="unsafe")
+    return out
+
+
+def mask_action(
+    action: dict, allowed_inputs: AllowKeys | DisallowKeys | np.ndarray
+) -> dict:
+    """Masks the given Gym action to only allowed inputs.
+
+    Args:
+        action: The Gym action to mask. It isn't modified.
+        allowed_inputs: The allowed inputs, or a mask precompiled from them with
+                        compile_action_mask(). Masks of allowed inputs are cached.
+    """
+    if not isinstance(allowed_inputs, np.ndarray):
+        allowed_inputs = _cached_action_mask(allowed_inputs)
+    action = dict(action)
+    action["keys"] = mask_keys(action["keys"], allowed_inputs)
     return action
 
 
@@ -98,6 +167,41 @@ def no_op_gym_action() -> dict:
     }
 
 
+def action_buffer(n: int | None = None) -> np.ndarray:
+    """Creates a no-op action record, or an array of n of them for n environments.
+
+    The records can be filled in place and passed to AppEnvironment.step() or
+    VectorAppEnvironment.step() in place of Dict actions, which then read them
+    without copying. Since a step's actions are converted to events before step()
+    or step_async() returns, the records can be refilled right after.
+    """
+    return np.zeros(() if n is None else (n,), dtype=ACTION_DTYPE)
+
+
+def is_action_record(action) -> bool:
+    """Returns whether the action is an ACTION_DTYPE record or array of records."""
+    return getattr(action, "dtype", None) == ACTION_DTYPE
+
+
+def to_action_record(action: dict, out: np.ndarray | None = None) -> np.ndarray:
+    """Converts a Dict action to an action record.
+
+    Args:
+        action: The Dict action to convert.
+        out: Optional record to write the action to.
+    """
+    if out is None:
+        out = action_buffer()
+    mouse_action = action["mouse_action"]
+    out["keys"] = action["keys"]
+    out["mouse_button"] = mouse_action["button"]
+    out["mouse_action"] = mouse_action["action"]
+    out["drag_start"] = mouse_action["drag_start"]
+    out["target"] = mouse_action["target"]
+    out["scroll"] = action["scroll"]
+    return out
+
+
 def _screen_position(
     normalized_position: np.ndarray | tuple[float, float] | list[float],
     screen_width: int,
@@ -141,11 +245,7 @@ def process_gym_action(
             )
         )
 
-    elif mouse_action in (
-        MouseActionKind.BTN_PRESS,
-        MouseActionKind.BTN_DOWN,
-        MouseActionKind.BTN_UP,
-    ):
+    elif mouse_action in _MOUSE_BUTTON_KINDS:
         out.append(MouseMoveAction(pos(target)))
         out.append(MouseButtonAction(mouse_action, MouseButtons[mouse_button_idx]))
 
@@ -161,3 +261,244 @@ def process_gym_action(
         out.append(ScrollAction(direction=scroll_direction))
 
     return out
+
+
+def process_gym_action_into(
+    action: dict, screen_width: int, screen_height: int, out: EventBuffer
+) -> EventBuffer:
+    """Converts a Gym action to its input actions, written to an EventBuffer.
+
+    Produces the same input actions as process_gym_action(), without allocating
+    an input action dataclass per action.
+
+    Args:
+        action: The Gym action to convert.
+        screen_width: The width of the environment's screen.
+        screen_height: The height of the environment's screen.
+        out: The buffer to clear and write the input actions to.
+    """
+    out.clear()
+
+    # keys
+    keys = action["keys"]
+    pressed = keys[:, 1] != KeyActionKind.KEY_ACTION_NONE
+    if pressed.any():
+        out.append_arrays(keys[pressed, 1], _ACTION_KEYCODE_TABLE[keys[pressed, 0]])
+
+    # mouse_action
+    _append_mouse_action(
+        out,
+        action["mouse_action"]["action"],
+        MouseButtons[action["mouse_action"]["button"]],
+        action["mouse_action"]["target"],
+        action["mouse_action"]["drag_start"],
+        screen_width,
+        screen_height,
+    )
+
+    # scroll
+    scroll_direction = action["scroll"]
+    if scroll_direction != KeyDirection.KEY_NO_DIRECTION:
+        out.append(EventKind.SCROLL, int(scroll_direction))
+
+    return out
+
+
+def process_action_record_into(
+    action: np.ndarray,
+    screen_width: int,
+    screen_height: int,
+    out: EventBuffer,
+    action_mask: np.ndarray | None = None,
+) -> EventBuffer:
+    """Converts an action record to its input actions, written to an EventBuffer.
+
+    Produces the same input actions as process_gym_action_into() does for the
+    equivalent Dict action, masked like mask_action() when given a mask, without
+    copying the record.
+
+    Args:
+        action: The action record to convert.
+        screen_width: The width of the environment's screen.
+        screen_height: The height of the environment's screen.
+        out: The buffer to clear and write the input actions to.
+        action_mask: An optional mask from compile_action_mask(). Key rows of
+                     disallowed keys are skipped.
+    """
+    out.clear()
+
+    # keys
+    keys = action["keys"]
+    pressed = keys[:, 1] != KeyActionKind.KEY_ACTION_NONE
+    if action_mask is not None:
+        pressed &= action_mask[keys[:, 0]]
+    if pressed.any():
+        out.append_arrays(keys[pressed, 1], _ACTION_KEYCODE_TABLE[keys[pressed, 0]])
+
+    # mouse_action
+    _append_mouse_action(
+        out,
+        int(action["mouse_action"]),
+        MouseButtons[int(action["mouse_button"])],
+        action["target"],
+        action["drag_start"],
+        screen_width,
+        screen_height,
+    )
+
+    # scroll
+    scroll_direction = int(action["scroll"])
+    if scroll_direction != KeyDirection.KEY_NO_DIRECTION:
+        out.append(EventKind.SCROLL, scroll_direction)
+
+    return out
+
+
+def _append_mouse_action(
+    out: EventBuffer,
+    mouse_action: int,
+    button: int,
+    target,
+    drag_start,
+    screen_width: int,
+    screen_height: int,
+) -> None:
+    if mouse_action == MouseActionKind.NONE:
+        return
+    if mouse_action == MouseActionKind.DRAG:
+        out.append(
+            EventKind.MOUSE_MOVE,
+            0,
+            *_screen_position(drag_start, screen_width, screen_height),
+        )
+        out.append(
+            EventKind.MOUSE_DRAG,
+            button,
+            *_screen_position(target, screen_width, screen_height),
+        )
+        return
+    out.append(
+        EventKind.MOUSE_MOVE, 0, *_screen_position(target, screen_width, screen_height)
+    )
+    if mouse_action in _MOUSE_BUTTON_KINDS:
+        out.append(int(mouse_action) + BUTTON_OFFSET, button)
+    elif mouse_action != MouseActionKind.MOVE:
+        assert False
+
+
+def _screen_positions(
+    normalized_positions: np.ndarray, screen_width: int, screen_height: int
+) -> np.ndarray:
+    """Vectorized _screen_position() over an (N, 2) array of positions."""
+    positions = np.clip(np.asarray(normalized_positions, dtype=np.float64), -1, 1)
+    positions += 1
+    positions *= np.array([screen_width / 2, screen_height / 2])
+    return positions.astype(np.int64)
+
+
+@dataclass
+class BatchedInputActions:
+    """The input actions of a batch of N Gym actions, stored as arrays.
+
+    Attributes:
+        key_kinds: (N, MAX_BUTTON_ACTIONS) KeyActionKinds of each key row.
+        keycodes: (N, MAX_BUTTON_ACTIONS) keycodes of each key row.
+        mouse_kinds: (N,) MouseActionKinds.
+        mouse_buttons: (N,) mouse buttons of the mouse actions.
+        targets: (N, 2) screen positions of the mouse actions' targets.
+        drag_starts: (N, 2) screen positions of the mouse actions' drag starts.
+        scrolls: (N,) KeyDirections of the scroll actions.
+    """
+
+    key_kinds: np.ndarray
+    keycodes: np.ndarray
+    mouse_kinds: np.ndarray
+    mouse_buttons: np.ndarray
+    targets: np.ndarray
+    drag_starts: np.ndarray
+    scrolls: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.mouse_kinds)
+
+    def to_input_actions(self, i: int) -> list[InputAction]:
+        """Returns the i-th action's input actions, as process_gym_action() would."""
+        out: list[InputAction] = []
+        kinds = self.key_kinds[i]
+        for j in np.flatnonzero(kinds):
+            out.append(
+                KeyAction(
+                    action=KeyActionKind(kinds[j]), keycode=int(self.keycodes[i, j])
+                )
+            )
+
+        mouse_action = self.mouse_kinds[i]
+        button = int(self.mouse_buttons[i])
+        target = (int(self.targets[i, 0]), int(self.targets[i, 1]))
+        if mouse_action == MouseActionKind.MOVE:
+            out.append(MouseMoveAction(target))
+        elif mouse_action == MouseActionKind.DRAG:
+            start = (int(self.drag_starts[i, 0]), int(self.drag_starts[i, 1]))
+            out.append(MouseDragAction(start, target, button))
+        elif mouse_action in _MOUSE_BUTTON_KINDS:
+            out.append(MouseMoveAction(target))
+            out.append(MouseButtonAction(MouseActionKind(mouse_action), button))
+        elif mouse_action != MouseActionKind.NONE:
+            assert False
+
+        if self.scrolls[i] != KeyDirection.KEY_NO_DIRECTION:
+            out.append(ScrollAction(direction=KeyDirection(self.scrolls[i])))
+        return out
+
+    def to_event_buffer(self, i: int, out: EventBuffer) -> EventBuffer:
+        """Writes the i-th action's input actions to an EventBuffer, as
+        process_gym_action_into() would."""
+        out.clear()
+        kinds = self.key_kinds[i]
+        pressed = kinds != KeyActionKind.KEY_ACTION_NONE
+        if pressed.any():
+            out.append_arrays(kinds[pressed], self.keycodes[i, pressed])
+
+        mouse_action = self.mouse_kinds[i]
+        if mouse_action == MouseActionKind.DRAG:
+            out.append(EventKind.MOUSE_MOVE, 0, *self.drag_starts[i].tolist())
+            out.append(
+                EventKind.MOUSE_DRAG, self.mouse_buttons[i], *self.targets[i].tolist()
+            )
+        elif mouse_action != MouseActionKind.NONE:
+            out.append(EventKind.MOUSE_MOVE, 0, *self.targets[i].tolist())
+            if mouse_action in _MOUSE_BUTTON_KINDS:
+                out.append(int(mouse_action) + BUTTON_OFFSET, self.mouse_buttons[i])
+            elif mouse_action != MouseActionKind.MOVE:
+                assert False
+
+        if self.scrolls[i] != KeyDirection.KEY_NO_DIRECTION:
+            out.append(EventKind.SCROLL, self.scrolls[i])
+        return out
+
+
+def process_gym_actions(
+    actions: dict, screen_width: int, screen_height: int
+) -> BatchedInputActions:
+    """Converts a batch of N Gym actions to their input actions.
+
+    Args:
+        actions: Gym actions stacked along a leading batch axis, as sampled from
+                 gymnasium.vector.utils.batch_space(action_space(), N), e.g. keys of
+                 shape (N, MAX_BUTTON_ACTIONS, 2).
+        screen_width: The width of the environments' screens.
+        screen_height: The height of the environments' screens.
+    """
+    keys = np.asarray(actions["keys"])
+    mouse_action = actions["mouse_action"]
+    return BatchedInputActions(
+        key_kinds=keys[..., 1],
+        keycodes=_ACTION_KEYCODE_TABLE[keys[..., 0]],
+        mouse_kinds=np.asarray(mouse_action["action"]),
+        mouse_buttons=_MOUSE_BUTTON_TABLE[mouse_action["button"]],
+        targets=_screen_positions(mouse_action["target"], screen_width, screen_height),
+        drag_starts=_screen_positions(
+            mouse_action["drag_start"], screen_width, screen_height
+        ),
+        scrolls=np.asarray(actions["scroll"]),
+    )
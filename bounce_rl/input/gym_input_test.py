@@ -4,16 +4,25 @@ import unittest
 
 import numpy as np
 from gymnasium import spaces
+from gymnasium.vector.utils import batch_space, iterate
 
 from bounce_rl.input.allowed_inputs import AllowKeys
 from bounce_rl.input.gym_input import (
     ACTION_KEYCODES,
     MAX_BUTTON_ACTIONS,
+    action_buffer,
     action_space,
+    compile_action_mask,
     mask_action,
+    mask_keys,
     no_op_gym_action,
+    process_action_record_into,
     process_gym_action,
+    process_gym_action_into,
+    process_gym_actions,
+    to_action_record,
 )
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
 from bounce_rl.input.input_types import (
     KeyAction,
     KeyActionKind,
@@ -51,6 +60,35 @@ class TestMaskAction(unittest.TestCase):
 
         self.assertEqual(action["keys"][0][1], KeyActionKind.KEY_PRESS)
 
+    def test_mask_action_accepts_compiled_mask(self):
+        action = no_op_gym_action()
+        action["keys"][0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_PRESS]
+
+        masked_action = mask_action(action, compile_action_mask(AllowKeys([KEY_B])))
+
+        self.assertEqual(masked_action["keys"][0][1], KeyActionKind.KEY_ACTION_NONE)
+
+
+class TestCompileActionMask(unittest.TestCase):
+    def test_mask_marks_allowed_keys(self):
+        mask = compile_action_mask(AllowKeys([KEY_A]))
+
+        self.assertEqual(mask.shape, (len(ACTION_KEYCODES),))
+        self.assertEqual(mask.dtype, bool)
+        self.assertEqual(list(np.flatnonzero(mask)), [ACTION_KEYCODES.index(KEY_A)])
+
+    def test_mask_keys_masks_batched_keys_in_place(self):
+        mask = compile_action_mask(AllowKeys([KEY_B]))
+        keys = np.zeros((3, MAX_BUTTON_ACTIONS, 2), dtype=int)
+        keys[:, 0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_DOWN]
+        keys[:, 1] = [ACTION_KEYCODES.index(KEY_B), KeyActionKind.KEY_DOWN]
+
+        out = mask_keys(keys, mask, out=keys)
+
+        self.assertIs(out, keys)
+        np.testing.assert_array_equal(keys[:, 0, 1], KeyActionKind.KEY_ACTION_NONE)
+        np.testing.assert_array_equal(keys[:, 1, 1], KeyActionKind.KEY_DOWN)
+
 
 class TestProcessGymAction(unittest.TestCase):
     def test_process_gym_action_generates_key_actions(self):
@@ -131,5 +169,107 @@ class TestProcessGymAction(unittest.TestCase):
         self.assertEqual(process_gym_action(action, 800, 600), [])
 
 
+class TestActionRecords(unittest.TestCase):
+    def _action(self) -> dict:
+        action = no_op_gym_action()
+        action["keys"][0] = [ACTION_KEYCODES.index(KEY_A), KeyActionKind.KEY_PRESS]
+        action["keys"][1] = [ACTION_KEYCODES.index(KEY_B), KeyActionKind.KEY_DOWN]
+        action["mouse_action"]["action"] = MouseActionKind.DRAG
+        action["mouse_action"]["button"] = 1
+        action["mouse_action"]["drag_start"] = np.array([-0.5, 0.5], np.float32)
+        action["mouse_action"]["target"] = np.array([0.25, -0.25], np.float32)
+        action["scroll"] = KeyDirection.KEY_DOWN
+        return action
+
+    def test_action_buffer_is_a_no_op(self):
+        events = process_action_record_into(action_buffer(), 800, 600, EventBuffer())
+        self.assertEqual(len(events), 0)
+        self.assertEqual(action_buffer(4).shape, (4,))
+
+    def test_record_matches_dict_action(self):
+        action = self._action()
+        record = to_action_record(action)
+
+        self.assertEqual(
+            list(process_action_record_into(record, 800, 600, EventBuffer()).events()),
+            list(process_gym_action_into(action, 800, 600, EventBuffer()).events()),
+        )
+
+    def test_records_in_an_array_match_dict_actions(self):
+        records = action_buffer(2)
+        to_action_record(self._action(), records[1])
+
+        events = process_action_record_into(records[1], 800, 600, EventBuffer())
+
+        self.assertEqual(
+            list(events.events()),
+            list(
+                process_gym_action_into(self._action(), 800, 600, EventBuffer()).events()
+            ),
+        )
+
+    def test_action_mask_skips_disallowed_keys_without_modifying_record(self):
+        record = to_action_record(self._action())
+        mask = compile_action_mask(AllowKeys([KEY_B]))
+
+        events = process_action_record_into(record, 800, 600, EventBuffer(), mask)
+
+        self.assertEqual(events.codes[:1].tolist(), [KEY_B])
+        self.assertEqual(events.kinds[1], EventKind.MOUSE_MOVE)
+        self.assertEqual(record["keys"][0, 1], KeyActionKind.KEY_PRESS)
+
+
+class TestProcessGymActions(unittest.TestCase):
+    def test_batched_actions_match_process_gym_action(self):
+        space = batch_space(action_space(801, 601), 64)
+        space.seed(0)
+        actions = space.sample()
+
+        batched = process_gym_actions(actions, 801, 601)
+
+        self.assertEqual(len(batched), 64)
+        for i, action in enumerate(iterate(space, actions)):
+            self.assertEqual(
+                batched.to_input_actions(i), process_gym_action(action, 801, 601)
+            )
+
+    def test_event_buffers_match_process_gym_action(self):
+        space = batch_space(action_space(800, 600), 64)
+        space.seed(1)
+        actions = space.sample()
+        batched = process_gym_actions(actions, 800, 600)
+        events = EventBuffer()
+
+        for i, action in enumerate(iterate(space, actions)):
+            expected = process_gym_action(action, 800, 600)
+            process_gym_action_into(action, 800, 600, events)
+            self.assertEqual(events.to_input_actions(), expected)
+            batched.to_event_buffer(i, events)
+            self.assertEqual(events.to_input_actions(), expected)
+
+    def test_batched_actions_look_up_keycodes(self):
+        actions = {
+            "keys": np.zeros((2, MAX_BUTTON_ACTIONS, 2), dtype=int),
+            "mouse_action": {
+                "button": np.zeros(2, dtype=int),
+                "action": np.zeros(2, dtype=int),
+                "drag_start": np.zeros((2, 2), dtype=np.float32),
+                "target": np.array([[2, -2], [0, 0]], dtype=np.float32),
+            },
+            "scroll": np.zeros(2, dtype=int),
+        }
+        actions["keys"][1, 0] = [ACTION_KEYCODES.index(KEY_B), KeyActionKind.KEY_UP]
+
+        batched = process_gym_actions(actions, 800, 600)
+
+        self.assertEqual(batched.keycodes[1, 0], KEY_B)
+        np.testing.assert_array_equal(batched.targets, [[800, 0], [400, 300]])
+        self.assertEqual(batched.to_input_actions(0), [])
+        self.assertEqual(
+            batched.to_input_actions(1),
+            [KeyAction(action=KeyActionKind.KEY_UP, keycode=KEY_B)],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,8 @@ into low-level input events, handling state transitions and casing logic.
 
 from typing import List
 
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.event_schedule import ScheduledEvents
 from bounce_rl.input.input_types import (
     InputAction,
     KeyAction,
@@ -26,13 +28,30 @@ class InputProcessor:
 
     Manages keyboard state (which keys are pressed, shift state for casing) and
     mouse state (current position) to generate correct event sequences.
+
+    With coalescing on, each list of events is also optimized against the
+    desktop's input state as of the previously returned events:
+      - Downs of buttons that are already down and ups of buttons that are
+        already up are dropped.
+      - Moves to the cursor's current position are dropped, and consecutive moves
+        are merged into the last one.
+      - A button's down immediately followed by its up in the same list is
+        dropped. Polling-based apps can't observe such a tap, but event-driven
+        apps can, which is why coalescing is opt-in.
     """
 
-    def __init__(self, screen_x: int, screen_y: int):
+    def __init__(self, screen_x: int, screen_y: int, coalesce: bool = False):
         self._screen_x = screen_x
         self._screen_y = screen_y
         self._pressed_buttons: set[ButtonCode] = set()
 
+        self._coalesce = coalesce
+        # The desktop's input state after the events returned so far, used for
+        # coalescing and drag interpolation.
+        self._down_buttons: set[ButtonCode] = set()
+        self._cursor: tuple[int, int] | None = None
+        self._coalesce_scratch = EventBuffer()
+
     def process_input_actions(
         self, actions: List[InputAction]
     ) -> tuple[List[InputAction], List[InputAction]]:
@@ -59,6 +78,18 @@ class InputProcessor:
         Returns:
             Tuple of (immediate_events, delayed_events)
         """
+        if self._coalesce:
+            immediate_events, delayed_events = EventBuffer(), EventBuffer()
+            self.process_event_buffer(
+                EventBuffer.from_input_actions(actions),
+                immediate_events,
+                delayed_events,
+            )
+            return (
+                immediate_events.to_input_actions(),
+                delayed_events.to_input_actions(),
+            )
+
         immediate = []
         delayed = []
 
@@ -75,6 +106,161 @@ class InputProcessor:
                 immediate.append(action)
         return immediate, delayed
 
+    def process_event_buffer(
+        self, actions: EventBuffer, immediate: EventBuffer, delayed: EventBuffer
+    ) -> None:
+        """
+        Convert input actions to input events, like process_input_actions(), but
+        reading and writing EventBuffers.
+
+        Args:
+            actions: The input actions to process
+            immediate: Buffer to clear and write the immediate events to
+            delayed: Buffer to clear and write the delayed events to
+        """
+        immediate.clear()
+        delayed.clear()
+        pressed_buttons = self._pressed_buttons
+
+        for kind, code, x, y in actions.events():
+            if kind == EventKind.KEY_PRESS or kind == EventKind.BUTTON_PRESS:
+                # The press kinds are followed by their down and up kinds.
+                immediate.append(kind + 1, code)
+                delayed.append(kind + 2, code)
+            elif kind == EventKind.KEY_DOWN or kind == EventKind.BUTTON_DOWN:
+                pressed_buttons.add(code)
+                immediate.append(kind, code)
+            elif kind == EventKind.KEY_UP or kind == EventKind.BUTTON_UP:
+                pressed_buttons.discard(code)
+                immediate.append(kind, code)
+            elif kind == EventKind.MOUSE_DRAG:
+                immediate.append(EventKind.BUTTON_DOWN, code)
+                immediate.append(EventKind.MOUSE_MOVE, 0, x, y)
+                delayed.append(EventKind.BUTTON_UP, code)
+            else:
+                immediate.append(kind, code, x, y)
+
+        if self._coalesce:
+            self._coalesce_events(immediate)
+            self._coalesce_events(delayed)
+
+    def schedule_event_buffer(
+        self,
+        actions: EventBuffer,
+        schedule: ScheduledEvents,
+        release_delay: float,
+        drag_moves: int = 1,
+    ) -> None:
+        """
+        Convert input actions to input events with time offsets within a step.
+
+        Raw events are scheduled at offset 0. Compound actions are spread over the
+        step so that polling-based apps see their intermediate states:
+          KeyPress -> KeyDown at 0, KeyUp at release_delay
+          MouseDrag -> ButtonDown at 0, drag_moves moves evenly spaced before
+                       release_delay and interpolated to the drag's end, ButtonUp
+                       at release_delay
+
+        Args:
+            actions: The input actions to process
+            schedule: Schedule to clear and write the events to
+            release_delay: Offset in seconds of game time to release pressed
+                buttons at
+            drag_moves: Number of moves to interpolate drags over
+        """
+        if drag_moves < 1:
+            raise ValueError(f"drag_moves must be at least 1, got {drag_moves}")
+        schedule.clear()
+        pressed_buttons = self._pressed_buttons
+        cursor = self._cursor
+
+        for kind, code, x, y in actions.events():
+            if kind == EventKind.KEY_PRESS or kind == EventKind.BUTTON_PRESS:
+                schedule.append(0.0, kind + 1, code)
+                schedule.append(release_delay, kind + 2, code)
+            elif kind == EventKind.KEY_DOWN or kind == EventKind.BUTTON_DOWN:
+                pressed_buttons.add(code)
+                schedule.append(0.0, kind, code)
+            elif kind == EventKind.KEY_UP or kind == EventKind.BUTTON_UP:
+                pressed_buttons.discard(code)
+                schedule.append(0.0, kind, code)
+            elif kind == EventKind.MOUSE_DRAG:
+                start_x, start_y = cursor if cursor is not None else (x, y)
+                schedule.append(0.0, EventKind.BUTTON_DOWN, code)
+                for i in range(1, drag_moves + 1):
+                    t = i / drag_moves
+                    schedule.append(
+                        release_delay * i / (drag_moves + 1),
+                        EventKind.MOUSE_MOVE,
+                        0,
+                        round(start_x + (x - start_x) * t),
+                        round(start_y + (y - start_y) * t),
+                    )
+                schedule.append(release_delay, EventKind.BUTTON_UP, code)
+                cursor = (x, y)
+            else:
+                if kind == EventKind.MOUSE_MOVE:
+                    cursor = (x, y)
+                schedule.append(0.0, kind, code, x, y)
+
+        if self._coalesce:
+            self._coalesce_schedule(schedule)
+        else:
+            self._cursor = cursor
+
+    def _coalesce_schedule(self, schedule: ScheduledEvents) -> None:
+        """Coalesces each group of a schedule's events with equal offsets, in
+        order, in place."""
+        events = schedule.events
+        scratch = self._coalesce_scratch
+        kept = 0
+        # Groups only shrink, so kept events never overwrite unread groups.
+        for offset, start, stop in list(schedule.groups()):
+            self._coalesce_events(schedule.copy_range(start, stop, scratch))
+            n = len(scratch)
+            end = kept + n
+            events.kinds[kept:end] = scratch.kinds[:n]
+            events.codes[kept:end] = scratch.codes[:n]
+            events.xs[kept:end] = scratch.xs[:n]
+            events.ys[kept:end] = scratch.ys[:n]
+            schedule.offsets[kept:end] = offset
+            kept = end
+        events.truncate(kept)
+
+    def _coalesce_events(self, events: EventBuffer) -> None:
+        """Drops the redundant events from a list of raw events, in place."""
+        down_buttons = self._down_buttons
+        # The cursor position before the trailing run of kept moves.
+        cursor_before_moves = self._cursor
+        events_in = events.events()
+        events.clear()
+
+        for kind, code, x, y in events_in:
+            n = len(events)
+            last_kind = events.kinds[n - 1] if n else EventKind.NONE
+            if kind == EventKind.MOUSE_MOVE:
+                if last_kind != EventKind.MOUSE_MOVE:
+                    cursor_before_moves = self._cursor
+                else:
+                    events.truncate(n - 1)
+                self._cursor = (x, y)
+                if (x, y) != cursor_before_moves:
+                    events.append(kind, code, x, y)
+            elif kind == EventKind.KEY_DOWN or kind == EventKind.BUTTON_DOWN:
+                if code not in down_buttons:
+                    down_buttons.add(code)
+                    events.append(kind, code, x, y)
+            elif kind == EventKind.KEY_UP or kind == EventKind.BUTTON_UP:
+                if code in down_buttons:
+                    down_buttons.remove(code)
+                    # The up's down kind is one less than it.
+                    if last_kind == kind - 1 and events.codes[n - 1] == code:
+                        events.truncate(n - 1)
+                    else:
+                        events.append(kind, code, x, y)
+            else:
+                events.append(kind, code, x, y)
+
     def release_buttons(self) -> List[KeyAction]:
         """Release all currently held buttons.
 
@@ -86,6 +272,7 @@ class InputProcessor:
             else:
                 out.append(KeyAction.up(button))
         self._pressed_buttons = set()
+        self._down_buttons = set()
         return out
 
     def _process_button_action(
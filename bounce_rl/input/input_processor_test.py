@@ -2,6 +2,8 @@
 
 import unittest
 
+from bounce_rl.input.event_buffer import EventBuffer, EventKind
+from bounce_rl.input.event_schedule import ScheduledEvents
 from bounce_rl.input.input_processor import InputProcessor
 from bounce_rl.input.input_types import (
     KeyAction,
@@ -104,5 +106,177 @@ class TestReleaseButtons(unittest.TestCase):
         self.assertEqual(result, [MouseButtonAction.up(BTN_LEFT)])
 
 
+class TestProcessEventBuffer(unittest.TestCase):
+    """Tests for process_event_buffer()."""
+
+    def test_event_buffer_matches_input_actions(self):
+        """Processing an EventBuffer gives the same events as input actions."""
+        actions = [
+            KeyAction.press(KEY_A),
+            KeyAction.down(KEY_B),
+            MouseButtonAction.press(BTN_LEFT),
+            MouseDragAction((0, 0), (10, 20), BTN_LEFT),
+            KeyAction.up(KEY_B),
+        ]
+        immediate, delayed = EventBuffer(), EventBuffer()
+
+        InputProcessor(800, 600).process_event_buffer(
+            EventBuffer.from_input_actions(actions), immediate, delayed
+        )
+
+        self.assertEqual(
+            (immediate.to_input_actions(), delayed.to_input_actions()),
+            InputProcessor(800, 600).process_input_actions(actions),
+        )
+
+    def test_event_buffer_tracks_held_buttons(self):
+        processor = InputProcessor(800, 600)
+        processor.process_event_buffer(
+            EventBuffer.from_input_actions([KeyAction.down(KEY_C)]),
+            EventBuffer(),
+            EventBuffer(),
+        )
+        self.assertEqual(processor.release_buttons(), [KeyAction.up(KEY_C)])
+
+
+def scheduled(schedule: ScheduledEvents) -> list[tuple]:
+    """Returns a schedule's events as (offset, kind, code, x, y) tuples, with
+    offsets rounded to microseconds."""
+    out = []
+    for offset, start, stop in schedule.groups():
+        for event in schedule.copy_range(start, stop, EventBuffer()).events():
+            out.append((round(offset, 6), *event))
+    return out
+
+
+class TestScheduleEventBuffer(unittest.TestCase):
+    """Tests for schedule_event_buffer()."""
+
+    def test_press_releases_after_delay(self):
+        processor = InputProcessor(800, 600)
+        schedule = ScheduledEvents()
+
+        processor.schedule_event_buffer(
+            EventBuffer.from_input_actions([KeyAction.press(KEY_A)]), schedule, 0.05
+        )
+
+        self.assertEqual(
+            scheduled(schedule),
+            [
+                (0.0, EventKind.KEY_DOWN, KEY_A, 0, 0),
+                (0.05, EventKind.KEY_UP, KEY_A, 0, 0),
+            ],
+        )
+
+    def test_drag_moves_are_interpolated(self):
+        processor = InputProcessor(800, 600)
+        schedule = ScheduledEvents()
+        drag = MouseDragAction((0, 0), (30, 60), BTN_LEFT)
+
+        processor.schedule_event_buffer(
+            EventBuffer.from_input_actions([drag]), schedule, 0.4, drag_moves=3
+        )
+
+        self.assertEqual(
+            scheduled(schedule),
+            [
+                (0.0, EventKind.MOUSE_MOVE, 0, 0, 0),
+                (0.0, EventKind.BUTTON_DOWN, BTN_LEFT, 0, 0),
+                (0.1, EventKind.MOUSE_MOVE, 0, 10, 20),
+                (0.2, EventKind.MOUSE_MOVE, 0, 20, 40),
+                (0.3, EventKind.MOUSE_MOVE, 0, 30, 60),
+                (0.4, EventKind.BUTTON_UP, BTN_LEFT, 0, 0),
+            ],
+        )
+
+    def test_schedule_is_coalesced(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+        schedule = ScheduledEvents()
+        processor.process_input_actions([KeyAction.down(KEY_B)])
+
+        processor.schedule_event_buffer(
+            EventBuffer.from_input_actions(
+                [KeyAction.down(KEY_B), KeyAction.press(KEY_A)]
+            ),
+            schedule,
+            0.05,
+        )
+
+        self.assertEqual(
+            scheduled(schedule),
+            [
+                (0.0, EventKind.KEY_DOWN, KEY_A, 0, 0),
+                (0.05, EventKind.KEY_UP, KEY_A, 0, 0),
+            ],
+        )
+
+
+class TestCoalescing(unittest.TestCase):
+    """Tests for InputProcessor's optional event coalescing."""
+
+    def test_drops_down_of_held_key(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+        processor.process_input_actions([KeyAction.down(KEY_A)])
+
+        immediate, delayed = processor.process_input_actions([KeyAction.down(KEY_A)])
+
+        self.assertEqual((immediate, delayed), ([], []))
+
+    def test_drops_move_to_current_position(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+        processor.process_input_actions([MouseMoveAction((10, 20))])
+
+        immediate, _ = processor.process_input_actions(
+            [
+                MouseMoveAction((10, 20)),
+                MouseButtonAction.press(BTN_LEFT),
+            ]
+        )
+
+        self.assertEqual(immediate, [MouseButtonAction.down(BTN_LEFT)])
+
+    def test_merges_consecutive_moves(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+
+        immediate, _ = processor.process_input_actions(
+            [MouseMoveAction((1, 1)), MouseMoveAction((2, 2))]
+        )
+
+        self.assertEqual(immediate, [MouseMoveAction((2, 2))])
+
+    def test_drops_drag_start_at_current_position(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+        processor.process_input_actions([MouseMoveAction((0, 0))])
+
+        immediate, delayed = processor.process_input_actions(
+            [MouseDragAction((0, 0), (10, 20), BTN_LEFT)]
+        )
+
+        self.assertEqual(
+            immediate,
+            [MouseButtonAction.down(BTN_LEFT), MouseMoveAction((10, 20))],
+        )
+        self.assertEqual(delayed, [MouseButtonAction.up(BTN_LEFT)])
+
+    def test_collapses_down_up_pair_within_a_phase(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+
+        immediate, _ = processor.process_input_actions(
+            [KeyAction.down(KEY_A), KeyAction.up(KEY_A), KeyAction.down(KEY_B)]
+        )
+
+        self.assertEqual(immediate, [KeyAction.down(KEY_B)])
+
+    def test_keeps_press_split_across_phases(self):
+        processor = InputProcessor(800, 600, coalesce=True)
+
+        for _ in range(2):
+            immediate, delayed = processor.process_input_actions(
+                [KeyAction.press(KEY_A)]
+            )
+            self.assertEqual(immediate, [KeyAction.down(KEY_A)])
+            self.assertEqual(delayed, [KeyAction.up(KEY_A)])
+
+
 if __name__ == "__main__":
     unittest.main()
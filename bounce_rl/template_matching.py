@@ -1,23 +1,372 @@
+# Template matching of app screens against reference screenshots.
+
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
 import numpy as np
+from PIL import Image
+
+# Pixel values within this distance of the template's are considered to match.
+_TOLERANCE = 3
+
+# Bump when compile_template()'s output changes, to invalidate compiled templates.
+_CACHE_VERSION = 1
+
+
+@dataclass
+class CompiledTemplate:
+    """A template precomputed from a screen's reference images.
+
+    Attributes:
+        target: The mean of the reference images.
+        target_mask: The mask of the target's values that are stable across all of
+                     the reference images.
+        pixels: The (H * W) pixel indices of the masked values that are compared.
+        channels: The channel indices of the masked values that are compared.
+        values: The target's values at (pixels, channels).
+    """
+
+    target: np.ndarray
+    target_mask: np.ndarray
+    pixels: np.ndarray
+    channels: np.ndarray
+    values: np.ndarray
+
+
+def compile_template(
+    images: np.ndarray, roi: tuple[int, int, int, int] | None = None, scale: int = 1
+) -> CompiledTemplate:
+    """Compiles a screen's reference images into a template.
+
+    Args:
+        images: (N, H, W, C) reference images of the screen.
+        roi: An optional (x, y, width, height) region of the screen to restrict the
+             template's compared values to.
+        scale: Only compare every scale-th pixel along each axis, as if matching at
+               a downscaled level of an image pyramid.
+    """
+    target = np.mean(images, axis=0)
+    close = np.abs(target - images) < _TOLERANCE
+    target_mask = np.all(close, axis=0)
+
+    mask = np.zeros_like(target_mask)
+    if roi is None:
+        roi = (0, 0, target.shape[1], target.shape[0])
+    x, y, w, h = roi
+    mask[y : y + h : scale, x : x + w : scale] = target_mask[
+        y : y + h : scale, x : x + w : scale
+    ]
+    num_pixels = target.shape[0] * target.shape[1]
+    pixels, channels = np.nonzero(mask.reshape(num_pixels, -1))
+    values = target.reshape(num_pixels, -1)[pixels, channels]
+    return CompiledTemplate(target, target_mask, pixels, channels, values)
+
+
+def _check_image_shape(image: np.ndarray, shape: tuple[int, ...]) -> None:
+    channels_missing = len(shape) == 3 and image.shape[-1] < shape[-1]
+    if image.shape[:2] != shape[:2] or channels_missing:
+        raise ValueError(
+            f"Image of shape {image.shape} can't be matched against a template "
+            f"of shape {shape}."
+        )
+
+
+class _PackedPixels:
+    """The masked pixels of one or more templates packed into flat arrays of their
+    (pixel, channel) indices and the bounds that matching values fall within."""
+
+    def __init__(self, pixels: np.ndarray, channels: np.ndarray, values: np.ndarray):
+        self.pixels = pixels
+        self.channels = channels
+        self.values = values
+        self.low = values - _TOLERANCE
+        self.high = values + _TOLERANCE
+        # The same bounds for integer images, as inclusive integer bounds that
+        # compare without converting the image's values to floats.
+        self.int_low = (np.floor(self.low) + 1).astype(np.int16)
+        self.int_high = (np.ceil(self.high) - 1).astype(np.int16)
+        # Indices of the pixels' values in raveled images, by image channels.
+        self._flat_indices: dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.pixels)
+
+    @staticmethod
+    def concatenate(templates: list[CompiledTemplate]) -> "_PackedPixels":
+        return _PackedPixels(
+            np.concatenate([t.pixels for t in templates]),
+            np.concatenate([t.channels for t in templates]),
+            np.concatenate([t.values for t in templates]),
+        )
+
+    def close(
+        self, image: np.ndarray, start: int = 0, stop: int | None = None
+    ) -> np.ndarray:
+        """Returns whether the image's values at the packed pixels in [start, stop)
+        are within tolerance of the templates'."""
+        channels = image.shape[2] if image.ndim == 3 else 1
+        indices = self._flat_indices.get(channels)
+        if indices is None:
+            indices = self.pixels * channels + self.channels
+            self._flat_indices[channels] = indices
+
+        values = image.ravel().take(indices[start:stop])
+        if np.issubdtype(image.dtype, np.integer):
+            return (values >= self.int_low[start:stop]) & (
+                values <= self.int_high[start:stop]
+            )
+        return (values > self.low[start:stop]) & (values < self.high[start:stop])
+
+
+def default_template_cache_dir() -> Path:
+    """Get the compiled template cache location in user's home directory."""
+    return Path.home() / ".cache" / "bounce_rl" / "templates"
+
+
+def _template_files(template_dir: str | Path) -> dict[str, list[Path]]:
+    """Returns the PNGs of each screen in a template directory, by label."""
+    files = {}
+    for screen_dir in sorted(Path(template_dir).iterdir()):
+        paths = sorted(screen_dir.glob("**/*.png")) if screen_dir.is_dir() else []
+        if paths:
+            files[screen_dir.name] = paths
+    return files
+
+
+def _load_images(paths: list[Path], mode: str) -> np.ndarray:
+    return np.array([np.array(Image.open(p).convert(mode)) for p in paths])
+
+
+def load_templates(
+    template_dir: str | Path, mode: str = "RGB"
+) -> dict[str, np.ndarray]:
+    """Loads the reference images of each screen in a template directory.
+
+    Each subdirectory of template_dir is a screen, labeled with the subdirectory's
+    name, whose reference images are the PNGs under it.
+
+    Args:
+        template_dir: The directory of screens' template directories, e.g.
+                      environments/<app>/templates.
+        mode: The PIL mode to load images in. Should match the mode of the images
+              that will be matched against them.
+    """
+    return {
+        label: _load_images(paths, mode)
+        for label, paths in _template_files(template_dir).items()
+    }
+
+
+def load_compiled_templates(
+    template_dir: str | Path,
+    mode: str = "RGB",
+    scale: int = 1,
+    cache_dir: str | Path | None = None,
+) -> dict[str, CompiledTemplate]:
+    """Loads the compiled template of each screen in a template directory.
+
+    Templates are compiled once and cached as .npy files keyed on a hash of the
+    template images' contents, mode and scale. Cached templates are memory-mapped,
+    so loading them skips decoding the images and compiling the templates.
+
+    Args:
+        template_dir: The directory of screens' template directories. See
+                      load_templates().
+        mode: The PIL mode to load images in. See load_templates().
+        scale: The scale to compile the templates at. See compile_template().
+        cache_dir: An optional alternative cache location.
+    """
+    files = _template_files(template_dir)
+    key = hashlib.sha256(f"{_CACHE_VERSION}:{mode}:{scale}".encode())
+    for label, paths in files.items():
+        for path in paths:
+            key.update(f"{label}/{path.name}".encode())
+            key.update(path.read_bytes())
+
+    cache_dir = Path(cache_dir or default_template_cache_dir())
+    entry = cache_dir / key.hexdigest()[:32]
+    fields = [field.name for field in dataclasses.fields(CompiledTemplate)]
+    if not entry.is_dir():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Compile into a temporary directory that's renamed into place, so that
+        # concurrent loaders never see a partially written entry.
+        partial = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".partial-"))
+        for label, paths in files.items():
+            template = compile_template(_load_images(paths, mode), scale=scale)
+            for field in fields:
+                np.save(partial / f"{label}.{field}.npy", getattr(template, field))
+        try:
+            os.rename(partial, entry)
+        except OSError:
+            # Another process cached the same templates first.
+            shutil.rmtree(partial)
+
+    return {
+        label: CompiledTemplate(
+            **{
+                field: np.load(entry / f"{label}.{field}.npy", mmap_mode="r")
+                for field in fields
+            }
+        )
+        for label in files
+    }
 
 
 class TemplateMatcher:
-    def __init__(self, images: np.ndarray):
-        self.target = np.mean(images, axis=0)
-        close = np.abs(self.target - images) < 3
-        self.target_mask = np.all(close, axis=0)
+    """Checks whether images match a template built from reference images.
 
-    def matches(self, image: np.ndarray, threshold=0.9, verbose=False) -> bool:
-        close = np.abs(self.target - image) < 3
-        print(close.shape, self.target_mask.shape)
-        match = np.all(
-            np.stack([close, self.target_mask], axis=0),
-            axis=0,
+    The template is the mean of the reference images, masked to the pixels that
+    are stable across all of them. Only the masked pixels' indices and value
+    ranges are stored, and matches() compares just those pixels of an image,
+    in chunks, stopping as soon as the result is decided.
+    """
+
+    def __init__(
+        self,
+        images: np.ndarray | CompiledTemplate,
+        roi: tuple[int, int, int, int] | None = None,
+        scale: int = 1,
+        chunk_size: int = 16384,
+    ):
+        """
+        Build a template from reference images.
+
+        Args:
+            images: (N, H, W, C) reference images of the screen to match, or a
+                    template already compiled from them.
+            roi: An optional (x, y, width, height) region of the screen to restrict
+                 the template to. Only applies to images. See compile_template().
+            scale: Only compare every scale-th pixel along each axis. Only applies
+                   to images. See compile_template().
+            chunk_size: How many pixels to compare between early exit checks.
+        """
+        if not isinstance(images, CompiledTemplate):
+            images = compile_template(images, roi, scale)
+        self.target = images.target
+        self.target_mask = images.target_mask
+        self.shape = self.target.shape
+        self._chunk_size = chunk_size
+
+        # Interleave the pixels so that each chunk is an evenly strided sample of
+        # the whole region, which lets early exits happen after as few chunks as
+        # possible, while each chunk still reads the image in order.
+        total = len(images.pixels)
+        num_chunks = max(1, -(-total // chunk_size))
+        chunks = [np.arange(i, total, num_chunks) for i in range(num_chunks)]
+        order = np.concatenate(chunks)
+        self._packed = _PackedPixels(
+            images.pixels[order], images.channels[order], images.values[order]
         )
 
+    def match_fraction(self, image: np.ndarray) -> float:
+        """Returns the fraction of the template's pixels that the image matches."""
+        total = len(self._packed)
+        if total == 0:
+            return 0.0
+        return self._count_matches(image, None) / total
+
+    def matches(self, image: np.ndarray, threshold=0.9, verbose=False) -> bool:
+        """Returns whether more than `threshold` of the template's pixels match.
+
+        Image should be (H, W, C) with the template's height and width and at least
+        its number of channels. Extra channels, e.g. alpha, are ignored."""
+        needed = threshold * len(self._packed)
         if verbose:
-            print(
-                f"Template matcher match amnt: {np.sum(match) / np.sum(self.target_mask)}"
+            print(f"Template matcher match amnt: {self.match_fraction(image)}")
+            return self._count_matches(image, None) > needed
+        return self._count_matches(image, needed) > needed
+
+    def _count_matches(self, image: np.ndarray, needed: float | None) -> int:
+        """Counts the image's matching template pixels. When `needed` is given,
+        returns early once the count is known to be above or at most `needed`."""
+        _check_image_shape(image, self.shape)
+        total = len(self._packed)
+        matched = 0
+        for start in range(0, total, self._chunk_size):
+            stop = min(start + self._chunk_size, total)
+            matched += np.count_nonzero(self._packed.close(image, start, stop))
+            if needed is not None and (
+                matched > needed or matched + total - stop <= needed
+            ):
+                break
+        return matched
+
+
+class TemplateBank:
+    """Classifies images as one of several screens, each with its own template.
+
+    The masked pixels of every screen's template are packed into one array, so
+    scoring an image against all of the screens takes a single vectorized pass.
+    """
+
+    def __init__(
+        self,
+        templates: dict[str, np.ndarray | CompiledTemplate],
+        roi: tuple[int, int, int, int] | None = None,
+        scale: int = 1,
+    ):
+        """
+        Build a template for each screen.
+
+        Args:
+            templates: (N, H, W, C) reference images of each screen, or templates
+                       already compiled from them, by label. All screens' images
+                       must have the same shape.
+            roi: An optional (x, y, width, height) region of the screen to restrict
+                 the templates to. Only applies to images.
+            scale: Only compare every scale-th pixel along each axis. Only applies
+                   to images.
+        """
+        self.labels = list(templates)
+        compiled = [
+            t if isinstance(t, CompiledTemplate) else compile_template(t, roi, scale)
+            for t in templates.values()
+        ]
+        shapes = {t.target.shape for t in compiled}
+        if len(shapes) != 1:
+            raise ValueError(f"Template images have different shapes: {shapes}.")
+        self.shape = shapes.pop()
+
+        self._packed = _PackedPixels.concatenate(compiled)
+        self._totals = np.array([len(t.pixels) for t in compiled])
+        self._starts = np.concatenate([[0], np.cumsum(self._totals)[:-1]])
+
+    @staticmethod
+    def from_directory(
+        template_dir: str | Path, scale: int = 1, mode: str = "RGB"
+    ) -> "TemplateBank":
+        """Loads a bank of the screens in template_dir. See load_templates()."""
+        return TemplateBank(load_templates(template_dir, mode), scale=scale)
+
+    def scores(self, image: np.ndarray) -> dict[str, float]:
+        """Returns the fraction of each screen's template pixels that the image
+        matches."""
+        _check_image_shape(image, self.shape)
+        close = self._packed.close(image).view(np.uint8)
+        matched = np.zeros(len(self.labels), dtype=np.int64)
+        # reduceat() sums each screen's segment of the packed pixels. It returns
+        # the next segment's first value for empty segments, so those are skipped.
+        nonempty = self._totals > 0
+        if nonempty.any():
+            matched[nonempty] = np.add.reduceat(
+                close, self._starts[nonempty], dtype=np.int64
             )
+        fractions = matched / np.maximum(self._totals, 1)
+        return dict(zip(self.labels, fractions.tolist()))
+
+    def classify(
+        self, image: np.ndarray, threshold: float = 0.9
+    ) -> tuple[str | None, dict[str, float]]:
+        """Returns the label of the best matching screen and every screen's score.
 
-        return np.sum(match) > threshold * np.sum(self.target_mask)
+        The label is None if no screen's score is above the threshold."""
+        scores = self.scores(image)
+        best = max(scores, key=scores.__getitem__, default=None)
+        if best is None or scores[best] <= threshold:
+            return None, scores
+        return best, scores
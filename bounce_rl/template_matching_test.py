@@ -0,0 +1,170 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bounce_rl.template_matching import (
+    TemplateBank,
+    TemplateMatcher,
+    load_compiled_templates,
+    load_templates,
+)
+
+
+def _reference_matches(matcher, image, threshold):
+    """The full-frame matching TemplateMatcher's sparse matching should agree with."""
+    close = np.abs(matcher.target - image) < 3
+    return np.sum(close & matcher.target_mask) > threshold * np.sum(matcher.target_mask)
+
+
+class TestTemplateMatcher(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.screen = rng.integers(0, 256, (60, 100, 3))
+        # Reference images that agree everywhere except a noisy band.
+        self.templates = np.repeat(self.screen[None], 3, axis=0)
+        self.templates[:, :10] = rng.integers(0, 256, (3, 10, 100, 3))
+
+    def test_matches_agree_with_full_frame_matching(self):
+        matcher = TemplateMatcher(self.templates, chunk_size=64)
+        rng = np.random.default_rng(1)
+        for corrupted_rows in (0, 5, 20, 30, 40, 60):
+            image = self.screen.copy()
+            image[:corrupted_rows] = rng.integers(0, 256, (corrupted_rows, 100, 3))
+            for threshold in (0.5, 0.7, 0.9):
+                for typed_image in (image.astype(np.uint8), image + 0.5):
+                    self.assertEqual(
+                        matcher.matches(typed_image, threshold),
+                        _reference_matches(matcher, typed_image, threshold),
+                        (corrupted_rows, threshold, typed_image.dtype),
+                    )
+
+    def test_match_fraction(self):
+        matcher = TemplateMatcher(self.templates)
+        self.assertGreater(matcher.match_fraction(self.screen), 0.99)
+        self.assertLess(matcher.match_fraction(255 - self.screen), 0.1)
+
+    def test_ignores_extra_channels(self):
+        matcher = TemplateMatcher(self.templates)
+        alpha = np.full((60, 100, 1), 255)
+        self.assertTrue(matcher.matches(np.concatenate([self.screen, alpha], -1)))
+
+    def test_roi_restricts_template(self):
+        matcher = TemplateMatcher(self.templates, roi=(0, 30, 100, 30))
+        image = self.screen.copy()
+        image[10:30] = 255 - image[10:30]
+
+        self.assertTrue(matcher.matches(image))
+        self.assertFalse(TemplateMatcher(self.templates).matches(image))
+
+    def test_scale_matches_downscaled_pixels(self):
+        matcher = TemplateMatcher(self.templates, scale=4)
+        self.assertTrue(matcher.matches(self.screen))
+        self.assertFalse(matcher.matches(255 - self.screen))
+
+    def test_rejects_images_of_other_shapes(self):
+        matcher = TemplateMatcher(self.templates)
+        with self.assertRaises(ValueError):
+            matcher.matches(self.screen[:30])
+
+
+class TestTemplateBank(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.screens = {
+            label: rng.integers(0, 256, (60, 100, 3)) for label in ("a", "b", "c")
+        }
+        self.bank = TemplateBank(
+            {label: screen[None] for label, screen in self.screens.items()}
+        )
+
+    def test_scores_agree_with_template_matchers(self):
+        image = self.screens["b"].copy()
+        image[:20] = self.screens["a"][:20]
+
+        scores = self.bank.scores(image)
+
+        for label, screen in self.screens.items():
+            matcher = TemplateMatcher(screen[None])
+            self.assertAlmostEqual(scores[label], matcher.match_fraction(image))
+
+    def test_classify_returns_best_screen(self):
+        label, scores = self.bank.classify(self.screens["c"])
+        self.assertEqual(label, "c")
+        self.assertEqual(set(scores), {"a", "b", "c"})
+
+    def test_classify_returns_none_below_threshold(self):
+        image = self.screens["a"].copy()
+        image[:30] = 255 - image[:30]
+
+        label, scores = self.bank.classify(image, threshold=0.9)
+
+        self.assertIsNone(label)
+        self.assertGreater(scores["a"], 0.4)
+
+    def test_from_directory_loads_a_screen_per_subdirectory(self):
+        with tempfile.TemporaryDirectory() as template_dir:
+            for label, screen in self.screens.items():
+                screen_dir = Path(template_dir) / label
+                screen_dir.mkdir()
+                rgba = np.concatenate([screen, np.full((60, 100, 1), 255)], axis=-1)
+                Image.fromarray(rgba.astype(np.uint8)).save(screen_dir / "0.png")
+
+            self.assertEqual(list(load_templates(template_dir)), ["a", "b", "c"])
+            bank = TemplateBank.from_directory(template_dir)
+
+        self.assertEqual(bank.classify(self.screens["b"].astype(np.uint8))[0], "b")
+
+
+class TestCompiledTemplates(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.template_dir = Path(self._dir.name) / "templates"
+        self.cache_dir = Path(self._dir.name) / "cache"
+        rng = np.random.default_rng(0)
+        self.screens = {}
+        for label in ("a", "b"):
+            self.screens[label] = rng.integers(0, 256, (20, 30, 3)).astype(np.uint8)
+            screen_dir = self.template_dir / label
+            screen_dir.mkdir(parents=True)
+            Image.fromarray(self.screens[label]).save(screen_dir / "0.png")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_compiled_templates_match_like_images(self):
+        compiled = load_compiled_templates(self.template_dir, cache_dir=self.cache_dir)
+        images = load_templates(self.template_dir)
+
+        image = self.screens["a"].copy()
+        image[:10] = self.screens["b"][:10]
+        for label in ("a", "b"):
+            self.assertEqual(
+                TemplateMatcher(compiled[label]).match_fraction(image),
+                TemplateMatcher(images[label]).match_fraction(image),
+            )
+        self.assertEqual(
+            TemplateBank(compiled).scores(image), TemplateBank(images).scores(image)
+        )
+
+    def test_cached_templates_are_memory_mapped(self):
+        load_compiled_templates(self.template_dir, cache_dir=self.cache_dir)
+        compiled = load_compiled_templates(self.template_dir, cache_dir=self.cache_dir)
+
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+        self.assertIsInstance(compiled["a"].pixels, np.memmap)
+
+    def test_cache_is_keyed_on_contents_and_scale(self):
+        load_compiled_templates(self.template_dir, cache_dir=self.cache_dir)
+        load_compiled_templates(self.template_dir, scale=2, cache_dir=self.cache_dir)
+        Image.fromarray(255 - self.screens["a"]).save(self.template_dir / "a" / "0.png")
+        compiled = load_compiled_templates(self.template_dir, cache_dir=self.cache_dir)
+
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 3)
+        self.assertTrue(TemplateMatcher(compiled["a"]).matches(255 - self.screens["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()